@@ -0,0 +1,132 @@
+# Claude Status Overlay - hook path benchmark
+#
+# Events/second through scripts/claude-hook.sh (one bash fork per event,
+# as claude-dispatch.sh does it today) versus the resident hook daemon
+# (hook_daemon.py) fed over its Unix socket:
+#
+#   python bench/bench_hook.py
+#   python bench/bench_hook.py --events 2000 --projects 8 --bash-events 200
+#
+# The stream mimics a tool-heavy turn per project: UserPromptSubmit, then
+# PreToolUse/PostToolUse pairs, then Stop. Both paths write to a temp dir,
+# never the real /tmp, so a running overlay, `state_reader serve` or hookd
+# (and HistoryStore behind them) never sees the throwaway "bench-hook-*"
+# projects: the bash path through CLAUDE_TMP_DIR, with the status table
+# off; removing the dir afterwards also stops its watchdog subshells. The
+# daemon runs in-process on a temp dir and socket. With socat installed, the daemon is
+# also timed with one socat fork per event, which is what the dispatcher
+# pays.
+
+import argparse
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+
+from synth import OVERLAY_DIR
+
+import hook_daemon
+
+HOOK_SH = os.path.join(os.path.dirname(OVERLAY_DIR), "scripts", "claude-hook.sh")
+TOOLS = ["Bash", "Read", "Edit", "Grep"]
+
+
+def make_stream(events, projects, tools_per_turn=20):
+    """[(event, matcher, project), ...] of length `events`."""
+    turn = [("UserPromptSubmit", "")]
+    for n in range(tools_per_turn):
+        tool = TOOLS[n % len(TOOLS)]
+        turn += [("PreToolUse", tool), ("PostToolUse", tool)]
+    turn.append(("Stop", ""))
+    names = [f"bench-hook-{os.getpid()}-{n}" for n in range(projects)]
+    return [turn[(i // projects) % len(turn)] + (names[i % projects],)
+            for i in range(events)]
+
+
+def bench_bash(stream):
+    tmp_dir = tempfile.mkdtemp(prefix="bench-hook-")
+    env = dict(os.environ, CLAUDE_TMP_DIR=tmp_dir)
+    env.pop("CLAUDE_STATUS_TABLE", None)
+    try:
+        start = time.perf_counter()
+        for event, matcher, project in stream:
+            subprocess.run([HOOK_SH, event, matcher, project, ""], env=env,
+                           stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL)
+        return time.perf_counter() - start
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _run_daemon(stream, send):
+    tmp_dir = tempfile.mkdtemp(prefix="bench-hookd-")
+    path = os.path.join(tmp_dir, "hookd.sock")
+    daemon = hook_daemon.HookDaemon(path, hook_daemon.HookStateMachine(tmp_dir, tmux=False))
+    daemon.start()
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    machine = daemon.machine
+    try:
+        start = time.perf_counter()
+        send(path, stream)
+        while machine.stats["events"] < len(stream):
+            time.sleep(0.0005)
+        elapsed = time.perf_counter() - start
+    finally:
+        daemon.stop()
+        hook_daemon.send_event("", path=path)  # wake the loop
+        thread.join(1)
+        daemon.close()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return elapsed, dict(machine.stats)
+
+
+def _send_socket(path, stream):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+        sock.connect(path)
+        for event, matcher, project in stream:
+            sock.send(f"{event}\t{matcher}\t{project}\t\t\n".encode())
+
+
+def _send_socat(path, stream):
+    for event, matcher, project in stream:
+        subprocess.run(["socat", "-u", "-", f"UNIX-SENDTO:{path}"],
+                       input=f"{event}\t{matcher}\t{project}\t\t\n".encode(),
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def report(label, events, elapsed):
+    print(f"{label:<28}{events:>7} events {elapsed * 1000:>9.1f} ms "
+          f"{events / elapsed:>10.0f} ev/s {elapsed / events * 1e6:>9.1f} us/ev")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="claude-hook.sh vs hook daemon throughput")
+    ap.add_argument("--events", type=int, default=5000, help="daemon stream length")
+    ap.add_argument("--bash-events", type=int, default=300,
+                    help="bash stream length (each one is a fork)")
+    ap.add_argument("--projects", type=int, default=4)
+    args = ap.parse_args()
+
+    if os.path.exists(HOOK_SH):
+        stream = make_stream(args.bash_events, args.projects)
+        report("claude-hook.sh (fork/event)", len(stream), bench_bash(stream))
+    else:
+        print(f"{HOOK_SH} not found; skipping the bash path")
+
+    stream = make_stream(args.events, args.projects)
+    elapsed, stats = _run_daemon(stream, _send_socket)
+    report("hookd (socket)", len(stream), elapsed)
+    if shutil.which("socat"):
+        stream = make_stream(args.bash_events, args.projects)
+        elapsed, _ = _run_daemon(stream, _send_socat)
+        report("hookd (socat fork/event)", len(stream), elapsed)
+    print(f"daemon: {stats['transitions']} transitions, {stats['deduped']} deduped, "
+          f"{stats['suppressed']} suppressed")
+
+
+if __name__ == "__main__":
+    main()
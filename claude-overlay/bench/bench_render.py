@@ -0,0 +1,107 @@
+# Claude Status Overlay - render loop benchmark
+#
+# Drives StatusOverlay._poll (the scheduler's poll tick: source read +
+# reconcile + geometry) with a synthetic in-memory source and reports
+# per-tick render time. Needs a display; on Linux run it under Xvfb:
+#
+#   xvfb-run -a python bench/bench_render.py
+#   xvfb-run -a python bench/bench_render.py --renderer canvas --sizes 10 100
+#
+# Each tick flips the state of --changes random projects, then times
+# _poll(True) plus root.update() (so Tk's idle redraw is included).
+
+import argparse
+import json
+import random
+import time
+
+from synth import STATES, config, summarize
+
+import overlay
+import sources
+from state_reader import ProjectRecord, sort_projects
+
+
+class SyntheticSource:
+    """In-memory source: `changes` random state flips per refresh()."""
+
+    def __init__(self, projects, changes, seed=0):
+        self._rng = random.Random(seed)
+        self._states = {f"proj-{n:05d}": self._rng.choice(STATES)
+                        for n in range(projects)}
+        self._changes = changes
+        self._snapshot = self._build()
+
+    def _build(self):
+        return sort_projects([ProjectRecord(p, s) for p, s in self._states.items()])
+
+    def refresh(self):
+        if not self._changes:
+            return
+        for project in self._rng.sample(list(self._states), self._changes):
+            self._states[project] = self._rng.choice(STATES)
+        self._snapshot = self._build()
+
+    def read(self):
+        return self._snapshot
+
+    def notice(self):
+        return None
+
+    def take_timings(self):
+        return None
+
+    def pending_ms(self):
+        return None
+
+    def close(self):
+        pass
+
+
+def bench(renderer, projects, changes, ticks):
+    config.RENDERER = renderer
+    # Synthetic proj-* transitions must not reach the user's history/trace files
+    config.HISTORY_FILE = config.TRACE_FILE = config.PERF_DUMP_FILE = None
+    sources.make_source = lambda name=None: SyntheticSource(projects, changes)
+    app = overlay.StatusOverlay()
+    app.scheduler.stop()  # ticks are driven by hand below
+    app.settings.flush = app.settings.maybe_flush = lambda: None
+    app._save_last_state = lambda projects: None
+    app.root.update()
+
+    samples = []
+    for _ in range(ticks):
+        t0 = time.perf_counter()
+        app._poll(True)
+        app.root.update()
+        samples.append((time.perf_counter() - t0) * 1000)
+
+    app._close()
+    return {"renderer": renderer, "projects": projects, "changes": changes,
+            **summarize(samples)}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="benchmark the overlay render loop")
+    ap.add_argument("--renderer", choices=["labels", "canvas", "all"], default="all")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    ap.add_argument("--changes", type=int, default=2, help="state flips per tick")
+    ap.add_argument("--ticks", type=int, default=100)
+    ap.add_argument("--json", action="store_true", help="print JSON lines")
+    args = ap.parse_args()
+
+    renderers = ["labels", "canvas"] if args.renderer == "all" else [args.renderer]
+    if not args.json:
+        print(f"{'renderer':>8} {'projects':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for renderer in renderers:
+        for size in args.sizes:
+            r = bench(renderer, size, min(args.changes, size), args.ticks)
+            if args.json:
+                print(json.dumps(r))
+            else:
+                print(f"{renderer:>8} {size:>8} {r['p50']:>8.2f} {r['p99']:>8.2f} "
+                      f"{r['max']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
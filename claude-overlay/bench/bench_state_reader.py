@@ -0,0 +1,157 @@
+# Claude Status Overlay - state_reader benchmark
+#
+# Builds synthetic claude-led-state-* / claude-activity-* trees in a temp
+# dir, points config.WSL_TMP_DIR at it and times read_projects().
+#
+#   python bench/bench_state_reader.py
+#   python bench/bench_state_reader.py --sizes 100 1000 --noise 5000
+#   python bench/bench_state_reader.py --open-latency-ms 2   # fake 9P/UNC
+#
+# Per size it reports p50/p99/max latency of a cold tick (empty cache) and
+# of warm ticks (a few files touched between ticks), filesystem calls per
+# tick (scandir/open; plus read syscalls from /proc/self/io on Linux) and
+# allocations per tick via tracemalloc.
+
+import argparse
+import builtins
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from synth import config, make_tree, summarize, touch_projects
+
+import state_reader
+
+
+class FsCounter:
+    """Wrap os.scandir and state_reader's open() to count (and optionally
+    slow down) filesystem round trips."""
+
+    def __init__(self, latency_ms=0.0):
+        self.latency = latency_ms / 1000
+        self.scandir = 0
+        self.open = 0
+        self._orig_scandir = os.scandir
+
+    def __enter__(self):
+        def scandir(path="."):
+            self.scandir += 1
+            if self.latency:
+                time.sleep(self.latency)
+            return self._orig_scandir(path)
+
+        def counted_open(*args, **kwargs):
+            self.open += 1
+            if self.latency:
+                time.sleep(self.latency)
+            return builtins.open(*args, **kwargs)
+
+        os.scandir = scandir
+        state_reader.open = counted_open  # shadows the builtin in that module
+        return self
+
+    def __exit__(self, *exc):
+        os.scandir = self._orig_scandir
+        del state_reader.open
+
+    def reset(self):
+        self.scandir = self.open = 0
+
+
+def read_syscalls():
+    """Cumulative read-type syscalls of this process (Linux only)."""
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("syscr:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def bench_size(root, projects, noise, ticks, touch, latency_ms):
+    make_tree(root, projects, noise)
+    config.WSL_TMP_DIR = root
+    scanner = state_reader.StateScanner()
+
+    with FsCounter(latency_ms) as fs:
+        t0 = time.perf_counter()
+        scanner.scan()
+        cold_ms = (time.perf_counter() - t0) * 1000
+        cold = {"ms": cold_ms, "open": fs.open, **scanner.stats}
+
+        samples, opens, scandirs, syscalls = [], [], [], []
+        for n in range(ticks):
+            touch_projects(root, touch, seed=n)
+            fs.reset()
+            sys0 = read_syscalls()
+            t0 = time.perf_counter()
+            scanner.scan()
+            samples.append((time.perf_counter() - t0) * 1000)
+            sys1 = read_syscalls()
+            if sys0 is not None and sys1 is not None:
+                syscalls.append(sys1 - sys0)
+            opens.append(fs.open)
+            scandirs.append(fs.scandir)
+
+        # Allocations in a separate pass: tracemalloc would skew the timings
+        blocks, peaks = [], []
+        for n in range(min(ticks, 10)):
+            touch_projects(root, touch, seed=ticks + n)
+            tracemalloc.start()
+            scanner.scan()
+            snapshot = tracemalloc.take_snapshot()
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            blocks.append(sum(s.count for s in snapshot.statistics("filename")))
+
+    return {
+        "projects": projects,
+        "noise": noise,
+        "cold": cold,
+        "warm_ms": summarize(samples),
+        "open_per_tick": sum(opens) / len(opens),
+        "scandir_per_tick": sum(scandirs) / len(scandirs),
+        "read_syscalls_per_tick": sum(syscalls) / len(syscalls) if syscalls else None,
+        "alloc_blocks_per_tick": sum(blocks) / len(blocks),
+        "alloc_peak_kb": max(peaks) / 1024,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="benchmark state_reader.read_projects")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    ap.add_argument("--noise", type=int, default=1000, help="unrelated files in tmp")
+    ap.add_argument("--ticks", type=int, default=50)
+    ap.add_argument("--touch", type=int, default=2, help="state files rewritten per tick")
+    ap.add_argument("--open-latency-ms", type=float, default=0.0,
+                    help="sleep per scandir/open to simulate the UNC/9P bridge")
+    ap.add_argument("--json", action="store_true", help="print JSON lines")
+    args = ap.parse_args()
+
+    if not args.json:
+        print(f"{'projects':>8} {'cold ms':>9} {'p50 ms':>8} {'p99 ms':>8} "
+              f"{'open/t':>7} {'syscr/t':>8} {'allocs/t':>9} {'peak KB':>8}")
+    for size in args.sizes:
+        root = tempfile.mkdtemp(prefix="overlay-bench-")
+        try:
+            r = bench_size(root, size, args.noise, args.ticks, args.touch,
+                           args.open_latency_ms)
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+        if args.json:
+            print(json.dumps(r))
+            continue
+        syscr = r["read_syscalls_per_tick"]
+        print(f"{size:>8} {r['cold']['ms']:>9.2f} {r['warm_ms']['p50']:>8.2f} "
+              f"{r['warm_ms']['p99']:>8.2f} {r['open_per_tick']:>7.1f} "
+              f"{'-' if syscr is None else f'{syscr:.0f}':>8} "
+              f"{r['alloc_blocks_per_tick']:>9.0f} {r['alloc_peak_kb']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
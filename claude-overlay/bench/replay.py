@@ -0,0 +1,227 @@
+# Claude Status Overlay - hook event replay / load generator
+#
+# Records real claude-hook.sh event streams, synthesizes new ones, replays
+# them into the state/activity files at any rate and fan-out, and turns the
+# overlay's --trace log (latency_trace.py) into a latency histogram.
+#
+#   python bench/replay.py record events.jsonl                  # Ctrl-C stops
+#   python bench/replay.py synth events.jsonl --projects 50 --rate 5 --duration 60
+#   python bench/replay.py play events.jsonl --speed 2 --fanout 10 --clean
+#   python bench/replay.py report a.jsonl b.jsonl
+#
+# Event stream: one JSON line per hook write, {"t": s since start, "project",
+# "state"}. play writes the activity file, then the state file, like the
+# hook does. To compare a change: run the overlay with `main.py --trace
+# a.jsonl`, play a stream, change POLL_* / SOURCE / RENDERER, repeat into
+# b.jsonl, then `report a.jsonl b.jsonl`.
+
+import argparse
+import json
+import os
+import random
+import select
+import sys
+import time
+
+from synth import config, percentile
+
+from state_reader import read_state_file
+
+# Hook state machine, roughly: next state -> weight
+TRANSITIONS = {
+    "IDLE": {"RUNNING": 1.0},
+    "RUNNING": {"WAITING": 0.3, "COMPLETED": 0.5, "IDLE": 0.2},
+    "WAITING": {"RUNNING": 1.0},
+    "COMPLETED": {"RUNNING": 0.6, "IDLE": 0.4},
+}
+BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+
+def _write_events(path, events):
+    with open(path, "w") as f:
+        for event in events:
+            f.write(json.dumps(event) + "\n")
+
+
+def _read_jsonl(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def synth_events(projects, rate, duration, seed=0):
+    """Poisson stream of `rate` transitions/s over `projects` projects."""
+    rng = random.Random(seed)
+    names = [f"replay-{n:04d}" for n in range(projects)]
+    states = dict.fromkeys(names, "IDLE")
+    events = [{"t": 0.0, "project": name, "state": "IDLE"} for name in names]
+    t = 0.0
+    while True:
+        t += rng.expovariate(rate)
+        if t >= duration:
+            return events
+        project = rng.choice(names)
+        choices = TRANSITIONS[states[project]]
+        state = rng.choices(list(choices), weights=list(choices.values()))[0]
+        states[project] = state
+        events.append({"t": round(t, 4), "project": project, "state": state})
+
+
+def record(out, tmp_dir):
+    """Log every state file write in tmp_dir (inotify, else 50 ms polling)."""
+    prefix = config.STATE_FILE_PREFIX
+    try:
+        from state_watcher import IN_CLOSE_WRITE, IN_MOVED_TO, Inotify
+        inotify = Inotify()
+        inotify.add_watch(tmp_dir, IN_CLOSE_WRITE | IN_MOVED_TO)
+    except OSError:
+        inotify = None
+    print(f"recording {tmp_dir} ({'inotify' if inotify else 'polling'}), "
+          "Ctrl-C to stop", file=sys.stderr)
+
+    mtimes = {}
+    start = time.time()
+    count = 0
+    with open(out, "w") as f:
+        try:
+            while True:
+                if inotify is not None:
+                    select.select([inotify.fd], [], [])
+                    names = [name for _, name in inotify.read_events()
+                             if name.startswith(prefix)]
+                else:
+                    time.sleep(0.05)
+                    names = []
+                    with os.scandir(tmp_dir) as it:
+                        for entry in it:
+                            if entry.name.startswith(prefix):
+                                mtime = entry.stat().st_mtime_ns
+                                if mtimes.get(entry.name) != mtime:
+                                    mtimes[entry.name] = mtime
+                                    names.append(entry.name)
+                for name in names:
+                    try:
+                        state = read_state_file(os.path.join(tmp_dir, name))
+                    except OSError:
+                        continue
+                    f.write(json.dumps({"t": round(time.time() - start, 4),
+                                        "project": name[len(prefix):],
+                                        "state": state}) + "\n")
+                    f.flush()
+                    count += 1
+        except KeyboardInterrupt:
+            pass
+    print(f"{count} events -> {out}", file=sys.stderr)
+
+
+def play(events, tmp_dir, speed=1.0, fanout=1, clean=False):
+    """Write the stream into tmp_dir on its schedule; fanout=K copies every
+    event to K projects (name-k) to multiply the load."""
+    events = sorted(events, key=lambda e: e["t"])
+    written = set()
+    lags = []
+    start = time.monotonic() + 0.2
+    for event in events:
+        due = start + event["t"] / speed
+        delay = due - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        lags.append(max(0.0, time.monotonic() - due) * 1000)
+        for k in range(fanout):
+            project = event["project"] if fanout == 1 else f"{event['project']}-{k:03d}"
+            activity = os.path.join(tmp_dir, config.ACTIVITY_FILE_PREFIX + project)
+            state = os.path.join(tmp_dir, config.STATE_FILE_PREFIX + project)
+            with open(activity, "w") as f:
+                f.write(f"{int(time.time())}\n")
+            with open(state, "w") as f:
+                f.write(event["state"] + "\n")
+            written.update((activity, state))
+    elapsed = time.monotonic() - start
+    writes = len(events) * fanout
+    print(f"{writes} transitions in {elapsed:.1f}s ({writes / max(elapsed, 1e-9):.1f}/s); "
+          f"schedule lag p50 {percentile(lags, 50):.2f} ms, "
+          f"p99 {percentile(lags, 99):.2f} ms, max {max(lags, default=0):.2f} ms")
+    if clean:
+        for path in written:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def histogram(samples):
+    """[(label, count), ...] over BUCKETS_MS."""
+    counts = [0] * (len(BUCKETS_MS) + 1)
+    for ms in samples:
+        n = 0
+        while n < len(BUCKETS_MS) and ms >= BUCKETS_MS[n]:
+            n += 1
+        counts[n] += 1
+    labels = ([f"< {BUCKETS_MS[0]}"]
+              + [f"{lo}-{hi}" for lo, hi in zip(BUCKETS_MS, BUCKETS_MS[1:])]
+              + [f">= {BUCKETS_MS[-1]}"])
+    return list(zip(labels, counts))
+
+
+def report(paths, width=40):
+    summary = []
+    for path in paths:
+        samples = [r["latency_ms"] for r in _read_jsonl(path)]
+        print(f"{path}: {len(samples)} transitions")
+        if not samples:
+            continue
+        rows = histogram(samples)
+        peak = max(count for _, count in rows)
+        for label, count in rows:
+            bar = "#" * round(width * count / peak) if peak else ""
+            print(f"  {label:>11} ms {count:>6}  {bar}")
+        summary.append((path, percentile(samples, 50), percentile(samples, 90),
+                        percentile(samples, 99), max(samples)))
+    if len(summary) > 1:
+        print(f"\n{'trace':<30}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}  ms")
+        for path, p50, p90, p99, peak in summary:
+            print(f"{os.path.basename(path):<30}{p50:>9.1f}{p90:>9.1f}{p99:>9.1f}{peak:>9.1f}")
+    elif summary:
+        _, p50, p90, p99, peak = summary[0]
+        print(f"  p50 {p50:.1f}  p90 {p90:.1f}  p99 {p99:.1f}  max {peak:.1f} ms")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="hook event record / replay / latency report")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("record", help="log real state file writes")
+    p.add_argument("out")
+    p.add_argument("--dir", default=config.WATCH_TMP_DIR)
+
+    p = sub.add_parser("synth", help="generate a synthetic stream")
+    p.add_argument("out")
+    p.add_argument("--projects", type=int, default=20)
+    p.add_argument("--rate", type=float, default=2.0, help="transitions per second")
+    p.add_argument("--duration", type=float, default=60.0, help="seconds")
+    p.add_argument("--seed", type=int, default=0)
+
+    p = sub.add_parser("play", help="replay a stream into the state files")
+    p.add_argument("events")
+    p.add_argument("--dir", default=config.WATCH_TMP_DIR)
+    p.add_argument("--speed", type=float, default=1.0, help="time compression")
+    p.add_argument("--fanout", type=int, default=1, help="copies per event")
+    p.add_argument("--clean", action="store_true", help="remove written files after")
+
+    p = sub.add_parser("report", help="latency histogram of overlay --trace logs")
+    p.add_argument("traces", nargs="+")
+
+    args = ap.parse_args()
+    if args.command == "record":
+        record(args.out, args.dir)
+    elif args.command == "synth":
+        events = synth_events(args.projects, args.rate, args.duration, args.seed)
+        _write_events(args.out, events)
+        print(f"{len(events)} events -> {args.out}", file=sys.stderr)
+    elif args.command == "play":
+        play(_read_jsonl(args.events), args.dir, args.speed, args.fanout, args.clean)
+    else:
+        report(args.traces)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# Claude Status Overlay - Benchmark helpers
+#
+# Synthetic /tmp trees and small stats helpers shared by the benchmarks.
+
+import os
+import random
+import sys
+import time
+
+OVERLAY_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if OVERLAY_DIR not in sys.path:
+    sys.path.insert(0, OVERLAY_DIR)
+
+import config  # noqa: E402
+
+STATES = ["RUNNING", "WAITING", "COMPLETED", "IDLE"]
+
+
+def make_tree(root, projects, noise=0, stale_ratio=0.1, seed=0):
+    """Populate `root` like /tmp: state + activity file per project, plus
+    `noise` unrelated files (sockets dirs, editor swap files, ...)."""
+    rng = random.Random(seed)
+    now = int(time.time())
+    for n in range(projects):
+        project = f"proj-{n:05d}"
+        path = os.path.join(root, config.STATE_FILE_PREFIX + project)
+        with open(path, "w") as f:
+            f.write(rng.choice(STATES) + "\n")
+        # Older than STAT_RACY_NS, so warm ticks may serve it from cache
+        os.utime(path, (now - 60, now - 60))
+        ts = now - (3600 if rng.random() < stale_ratio else rng.randint(0, 30))
+        path = os.path.join(root, config.ACTIVITY_FILE_PREFIX + project)
+        with open(path, "w") as f:
+            f.write(f"{ts}\n")
+        os.utime(path, (ts, ts))
+    for n in range(noise):
+        with open(os.path.join(root, f"noise-{n:06d}.tmp"), "w") as f:
+            f.write("x")
+
+
+def touch_projects(root, count, seed=1):
+    """Rewrite `count` random state files (simulates hook activity)."""
+    rng = random.Random(seed)
+    names = [n for n in os.listdir(root) if n.startswith(config.STATE_FILE_PREFIX)]
+    for name in rng.sample(names, min(count, len(names))):
+        with open(os.path.join(root, name), "w") as f:
+            f.write(rng.choice(STATES) + "\n")
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def summarize(samples_ms):
+    return {
+        "p50": percentile(samples_ms, 50),
+        "p99": percentile(samples_ms, 99),
+        "max": max(samples_ms) if samples_ms else 0.0,
+    }
@@ -0,0 +1,262 @@
+# Claude Status Overlay - Codex Session Watch
+#
+# Python replacement for scripts/codex-session-watch.sh (which execs this
+# when python3 is available): find the Codex session log for a cwd, then
+# turn its appended JSONL lines into claude-dispatch.sh events.
+#
+# The script re-ran `find | sort | head` plus grep/jq/date per candidate
+# every half second. Here:
+#   - SessionIndex caches each directory's listing by mtime, so a poll
+#     stats the date directories and lists only the ones that changed;
+#     session_meta (cwd, timestamp) is read once per new file
+#   - JsonlTailer keeps a byte offset and parses only appended lines
+# so discovery and tail cost follow new files / new bytes, not the size
+# of ~/.codex/sessions.
+#
+#   python codex_watch.py <cwd> <project_key> [start_epoch]
+
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import config
+
+META_MARK = "session_meta"
+
+
+def parse_timestamp(value):
+    """ISO 8601 (as in session_meta) → epoch seconds, 0 if unparsable."""
+    try:
+        return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp())
+    except (AttributeError, ValueError):
+        return 0
+
+
+def read_session_meta(path):
+    """(cwd, epoch) from the first session_meta line, or None if absent."""
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if META_MARK not in line:
+                    continue
+                try:
+                    record = json.loads(line)
+                    if record.get("type") != "session_meta":
+                        continue
+                    payload = record.get("payload") or {}
+                    return payload.get("cwd"), parse_timestamp(payload.get("timestamp"))
+                except (ValueError, AttributeError):
+                    return None
+    except OSError:
+        pass
+    return None
+
+
+class _Session:
+    __slots__ = ("path", "meta", "size")
+
+    def __init__(self, path):
+        self.path = path
+        self.meta = None  # (cwd, epoch) once read
+        self.size = -1    # size when meta was last looked for
+
+
+class SessionIndex:
+    """*.jsonl files under the sessions dir with their session_meta.
+
+    refresh() lists only directories whose mtime changed since the last
+    call; files older than min_mtime when first seen are never opened.
+    """
+
+    def __init__(self, root, min_mtime=0):
+        self.root = root
+        self.min_mtime = min_mtime
+        self._dirs = {}      # dir -> (mtime_ns, [subdirs])
+        self._sessions = {}  # path -> _Session (None: too old, ignored)
+        self.stats = {"listed": 0, "opened": 0}
+
+    def refresh(self):
+        self._walk(self.root)
+        for session in self._sessions.values():
+            if session is None or session.meta is not None:
+                continue
+            try:
+                size = os.stat(session.path).st_size
+            except OSError:
+                continue
+            if size != session.size:  # session_meta may have been written since
+                session.size = size
+                session.meta = read_session_meta(session.path)
+                self.stats["opened"] += 1
+
+    def _walk(self, path):
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            self._dirs.pop(path, None)
+            return
+        cached = self._dirs.get(path)
+        if cached is None or cached[0] != mtime:
+            subdirs = []
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.name.endswith(".jsonl") and entry.path not in self._sessions:
+                            try:
+                                old = entry.stat().st_mtime < self.min_mtime
+                            except OSError:
+                                continue
+                            self._sessions[entry.path] = None if old else _Session(entry.path)
+            except OSError:
+                return
+            self.stats["listed"] += 1
+            # A change in the same mtime tick as this listing would go
+            # unnoticed: leave a just-modified dir uncached so it is relisted
+            if time.time_ns() - mtime < 1_000_000_000:
+                mtime = None
+            self._dirs[path] = cached = (mtime, subdirs)
+        for sub in cached[1]:
+            self._walk(sub)
+
+    def find(self, cwd, start_epoch):
+        """Newest session for `cwd` started at or after start_epoch, or None."""
+        best, best_epoch = None, -1
+        for session in self._sessions.values():
+            if session is None or session.meta is None:
+                continue
+            meta_cwd, epoch = session.meta
+            if meta_cwd == cwd and epoch >= start_epoch and epoch >= best_epoch:
+                best, best_epoch = session.path, epoch
+        return best
+
+
+class JsonlTailer:
+    """Complete lines appended to one file since the last read_lines()."""
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self._partial = b""
+        self._ino = None
+
+    def read_lines(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return []
+        if st.st_ino != self._ino or st.st_size < self.offset:
+            # First read, replaced or truncated (tail -F): start over
+            self._ino, self.offset, self._partial = st.st_ino, 0, b""
+        if st.st_size == self.offset:
+            return []
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                data = f.read()
+        except OSError:
+            return []
+        self.offset += len(data)
+        *lines, self._partial = (self._partial + data).split(b"\n")
+        return [line for line in lines if line.strip()]
+
+
+def line_events(line):
+    """codex-session-watch.sh handle_line(): [(event, matcher), ...]."""
+    try:
+        record = json.loads(line)
+        payload = record.get("payload") or {}
+        kind, payload_type = record.get("type"), payload.get("type")
+    except (ValueError, AttributeError):
+        return []
+    if kind == "event_msg":
+        if payload_type in ("task_started", "user_message"):
+            return [("UserPromptSubmit", "")]
+        if payload_type == "task_complete":
+            return [("Stop", "")]
+    elif kind == "response_item":
+        if payload_type == "function_call":
+            try:
+                args = json.loads(payload.get("arguments") or "{}")
+            except (TypeError, ValueError):
+                return []
+            if isinstance(args, dict) and args.get("sandbox_permissions") == "require_escalated":
+                return [("PermissionRequest", "")]
+        elif payload_type == "function_call_output":
+            return [("PostToolUse", "AskUserQuestion")]
+    return []
+
+
+def make_dispatch(project_key, script_dir=None):
+    script = os.path.join(
+        script_dir or os.path.join(os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__))), "scripts"),
+        "claude-dispatch.sh")
+    env = dict(os.environ, AI_LABEL="Codex", PROJECT_KEY=project_key,
+               WINDOW_NAME=project_key)
+
+    def dispatch(event, matcher=""):
+        subprocess.run([script, event, matcher], env=env, stdin=subprocess.DEVNULL)
+    return dispatch
+
+
+def _wait_for_change(path):
+    """Callable that blocks until `path` may have grown (inotify, else a
+    CODEX_TAIL_POLL_MS sleep)."""
+    try:
+        from state_watcher import IN_MODIFY, Inotify
+        inotify = Inotify()
+        inotify.add_watch(path, IN_MODIFY)
+    except (ImportError, OSError):
+        return lambda: time.sleep(config.CODEX_TAIL_POLL_MS / 1000)
+
+    import select
+
+    def wait():
+        # Timeout as a safety net for a replaced file (new inode, old watch)
+        select.select([inotify.fd], [], [], 5)
+        inotify.read_events()
+    return wait
+
+
+def watch(cwd, project_key, start_epoch, sessions_dir=None, dispatch=None):
+    sessions_dir = sessions_dir or os.path.join(
+        os.environ.get("CODEX_HOME") or os.path.expanduser("~/.codex"), "sessions")
+    window = int(os.environ.get("CODEX_DISCOVERY_WINDOW", config.CODEX_DISCOVERY_WINDOW_SEC))
+    timeout = int(os.environ.get("CODEX_DISCOVERY_TIMEOUT", config.CODEX_DISCOVERY_TIMEOUT_SEC))
+    dispatch = dispatch or make_dispatch(project_key)
+    if not os.path.isdir(sessions_dir):
+        return 0
+
+    index = SessionIndex(sessions_dir, min_mtime=start_epoch - window)
+    while True:
+        index.refresh()
+        path = index.find(cwd, start_epoch)
+        if path is not None:
+            break
+        if time.time() - start_epoch >= timeout:
+            return 0
+        time.sleep(config.CODEX_DISCOVERY_POLL_MS / 1000)
+
+    tailer = JsonlTailer(path)
+    wait = _wait_for_change(path)
+    while True:
+        for line in tailer.read_lines():
+            for event in line_events(line):
+                dispatch(*event)
+        wait()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("usage: codex_watch.py <cwd> <project_key> [start_epoch]", file=sys.stderr)
+        sys.exit(2)
+    start = int(sys.argv[3]) if len(sys.argv) > 3 else int(time.time())
+    try:
+        sys.exit(watch(sys.argv[1], sys.argv[2], start))
+    except KeyboardInterrupt:
+        pass
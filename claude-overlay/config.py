@@ -10,8 +10,105 @@ WSL_TMP_DIR = r"\\wsl$\Ubuntu\tmp"
 STATE_FILE_PREFIX = "claude-led-state-"
 ACTIVITY_FILE_PREFIX = "claude-activity-"
 
+# ============ Source ============
+# "file":     poll the state files above
+# "snapshot": read the Stream Deck sidecar's state.json, files as fallback
+# "mqtt":     subscribe to claude/led/+ (needs paho-mqtt), files as fallback
+# "watch":    inotify on the state files (Linux/WSL side), polling as fallback
+# "multi":    every entry of SOURCES below, concurrently, merged
+# "table":    the mmap'd status table (status_table.py), files as fallback
+SOURCE = "file"
+SOURCE_CHOICES = ("file", "snapshot", "mqtt", "watch", "table", "multi")  # right-click menu
+SNAPSHOT_FILE = os.path.join(
+    os.environ.get("LOCALAPPDATA", ""),
+    "claude-monitor",
+    "state.json",
+)
+SNAPSHOT_STALE_SEC = 60  # sidecar heartbeats every 30 s; older → fall back
+MQTT_HOST = "192.168.88.10"  # same broker as wsl/claude-hooks.json
+MQTT_PORT = 1883
+MQTT_TOPIC = "claude/led/+"
+MQTT_DRAIN_MS = 50  # how often the Tk loop drains pushed updates
+
+# ============ Watcher (SOURCE = "watch") ============
+# inotify only exists on the Linux side; from Windows (\\wsl$) the watch
+# source always degrades to polling WSL_TMP_DIR.
+WATCH_TMP_DIR = "/tmp" if os.name == "posix" else WSL_TMP_DIR
+WATCH_COALESCE_MS = 30       # a burst ends after this much quiet
+WATCH_COALESCE_MAX_MS = 200  # ...or this long after its first event
+WATCH_WHEEL_TICK_MS = 1000   # staleness timer resolution
+WATCH_DRAIN_MS = 100         # how often the Tk loop picks up new snapshots
+
+# ============ Fan-out Service (python -m state_reader serve) ============
+# One scan/watch, change-only JSON-lines deltas to any number of local
+# subscribers (status_server.py).
+SERVE_HOST = "127.0.0.1"
+SERVE_PORT = 47650
+SERVE_MAX_PENDING_BYTES = 256 * 1024  # per subscriber; beyond → resync
+
+# ============ Hook Daemon (python -m state_reader hookd) ============
+# Resident claude-hook.sh state machine (hook_daemon.py); claude-dispatch.sh
+# sends it one datagram per event while the socket exists.
+HOOK_SOCKET = "/tmp/claude-hookd.sock"
+HOOK_DEDUP_SEC = 2            # same state again within this → ignored
+HOOK_RUNNING_TIMEOUT_SEC = 60  # RUNNING with no activity this long → IDLE
+HOOK_STOP_IDLE_SEC = 22       # Stop → IDLE (LED rainbow: 3 × 7 colours × 1 s)
+HOOK_WHEEL_TICK_MS = 500
+
+# ============ Status Table (status_table.py) ============
+# One fixed-slot binary file instead of a state + activity file per
+# project. hookd writes it next to the legacy files; from Windows it is
+# read over \\wsl$ without a mapping (one header read per tick).
+STATUS_TABLE_FILE = os.path.join(WATCH_TMP_DIR, "claude-status.tbl")
+STATUS_TABLE_SLOTS = 64          # 128 bytes each; full → least recently active reused
+STATUS_TABLE_RECHECK_SEC = 5     # re-stat the path (file recreated?) this often
+STATUS_TABLE_DRAIN_MS = 100      # how often the Tk loop checks the generation
+HOOK_STATUS_TABLE = True         # hookd also writes STATUS_TABLE_FILE
+
+# ============ Codex Session Watch (codex_watch.py) ============
+# CODEX_HOME / CODEX_DISCOVERY_WINDOW / CODEX_DISCOVERY_TIMEOUT in the
+# environment override these, as in codex-session-watch.sh.
+CODEX_DISCOVERY_WINDOW_SEC = 180  # ignore session files older than start - this
+CODEX_DISCOVERY_TIMEOUT_SEC = 20  # give up if no session shows up
+CODEX_DISCOVERY_POLL_MS = 500
+CODEX_TAIL_POLL_MS = 250          # only when inotify is unavailable
+
+# ============ Multi-source (SOURCE = "multi") ============
+# Scanned concurrently and merged; rows show "name/project".
+#   "dir":      {"path"}                 state files, UNC or local dir
+#   "snapshot": {"path"}                 a sidecar state.json
+#   "serve":    {"host", "port"}         `python -m state_reader serve`
+#   "mqtt":     {"host", "port", "topic"} retained claude/led/+ (push)
+# Optional "timeout_ms" per entry (default SCAN_TIMEOUT_MS).
+SOURCES = [
+    {"name": "Ubuntu", "kind": "dir", "path": WSL_TMP_DIR},
+    # {"name": "Debian", "kind": "dir", "path": r"\\wsl$\Debian\tmp"},
+    # {"name": "rpi5b", "kind": "serve", "host": "192.168.88.10"},
+]
+MULTI_MAX_WORKERS = 4  # scan threads shared by all blocking entries
+
 # ============ Polling ============
-POLL_INTERVAL_MS = 1000  # 1 second
+# One adaptive timer drives polling and blinking (scheduler.py).
+POLL_INTERVAL_MS = 1000  # baseline; used when the curve below has no match
+POLL_ACTIVE_MS = 250     # while any project is in POLL_ACTIVE_STATES
+POLL_ACTIVE_STATES = {"RUNNING", "WAITING"}
+# Everything idle: (seconds since the last active project, poll interval ms).
+# The last row whose threshold has passed wins.
+POLL_BACKOFF_CURVE = [
+    (0, 1000),
+    (30, 2000),
+    (120, 5000),
+]
+POLL_HIDDEN_MS = 15000   # window hidden/minimized or session locked
+TIMER_COALESCE_MS = 40   # run poll/blink ticks due this close together at once
+
+# ============ Background Scan ============
+# File scans run on a worker thread; the UI keeps the last good snapshot.
+SCAN_TIMEOUT_MS = 2000          # a scan slower than this counts as a failure
+SCAN_CHECK_MS = 100             # how often to check an in-flight scan
+SCAN_FAILURE_THRESHOLD = 3      # consecutive failures before backing off
+SCAN_BACKOFF_BASE_MS = 2000     # first backoff, doubles per further failure
+SCAN_BACKOFF_MAX_MS = 60000
 
 # ============ Blink ============
 BLINK_INTERVAL_MS = 500  # 500ms toggle
@@ -19,6 +116,15 @@ BLINK_STATES = {"WAITING", "IDLE"}  # states that blink (match tmux blink behavi
 
 # ============ Stale Detection ============
 STALE_TIMEOUT_SEC = 60  # activity file older than this → STALE
+ACTIVITY_FROM_MTIME = True  # take last activity from stat mtime (no open)
+# Files modified this close to the scan are re-read instead of cached:
+# 9P (\\wsl$) timestamps can be as coarse as a second
+STAT_RACY_NS = 2_000_000_000
+
+# ============ Renderer ============
+# "labels": one tk.Label per project
+# "canvas": all rows on one tk.Canvas, blink toggles only the dot fill
+RENDERER = "labels"
 
 # ============ Window ============
 WINDOW_ALPHA = 0.85  # 85% opacity
@@ -29,12 +135,58 @@ FONT_FAMILY = "Segoe UI"
 FONT_SIZE = 10
 DOT_CHAR = "\u25cf"  # ●
 
-# ============ Position Persistence ============
+# ============ Perf Instrumentation ============
+PERF_RING_SIZE = 600            # samples kept per stage (~10 min at 1 Hz)
+PERF_FONT_FAMILY = "Consolas"   # stats footer (right-click → Perf stats)
+PERF_FONT_SIZE = 8
+# JSON-lines dump of every poll tick's timings; None disables it. e.g.
+# os.path.join(os.environ.get("LOCALAPPDATA", ""), "claude-overlay", "perf.jsonl")
+PERF_DUMP_FILE = None
+PERF_DUMP_FLUSH_TICKS = 60      # buffered ticks per append
+# Hook-write → render latency per transition (latency_trace.py), JSON lines;
+# None disables it. Also: python main.py --trace FILE
+TRACE_FILE = None
+
+# ============ Viewport ============
+# Bounded window for many projects (viewport.py)
+VIEW_MAX_ROWS = 15                           # visible rows; the rest scroll
+VIEW_PINNED_STATES = {"WAITING", "RUNNING"}  # always on top, never grouped
+VIEW_GROUP_MIN = 4                           # rows of one state → "N × STATE"
+
+# ============ Settings Persistence ============
+# Position, last rendered project list (painted at startup until live data
+# arrives), source and expanded groups in one file (settings.py). Written
+# only when something changed: on drag end, or once changes go quiet.
+SETTINGS_FILE = os.path.join(
+    os.environ.get("LOCALAPPDATA", ""),
+    "claude-overlay",
+    "settings.json",
+)
+SETTINGS_QUIET_SEC = 5       # flush after this long without a further change
+SETTINGS_MAX_DELAY_SEC = 60  # ...or this long after the first unsaved one
+# Older per-item files, read once when SETTINGS_FILE does not exist yet
 POSITION_FILE = os.path.join(
     os.environ.get("LOCALAPPDATA", ""),
     "claude-overlay",
     "position.json",
 )
+LAST_STATE_FILE = os.path.join(
+    os.environ.get("LOCALAPPDATA", ""),
+    "claude-overlay",
+    "last_state.json",
+)
+STARTUP_NOTICE = "Waiting for live data\u2026"
+
+# ============ Transition History ============
+# SQLite log of every state change (history.py); None disables it.
+# Query: python history.py [--days N] [--project NAME]
+HISTORY_FILE = os.path.join(
+    os.environ.get("LOCALAPPDATA", ""),
+    "claude-overlay",
+    "history.sqlite3",
+)
+HISTORY_FLUSH_SEC = 30  # queued transitions are written once per interval
+HISTORY_KEEP_DAYS = 14  # older raw rows are rolled up into per-day totals
 
 # ============ State Colors ============
 STATE_COLORS = {
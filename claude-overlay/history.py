@@ -0,0 +1,282 @@
+# Claude Status Overlay - Transition History
+#
+# Logs every state change the overlay sees to a local SQLite file
+# (config.HISTORY_FILE):
+#   transitions(project, old_state, new_state, ts)
+#       raw rows for the last HISTORY_KEEP_DAYS; old_state NULL = project
+#       appeared, new_state NULL = project went away or the overlay closed
+#       (so its downtime is not counted), old == new = the state carried
+#       over a rollup cutoff
+#   daily(day, project, state, seconds, entries)
+#       per-day time in state, rolled up from older raw rows
+#
+# observe()/record() only queue in memory; flush() writes the queue in one
+# transaction (the overlay calls maybe_flush() on poll ticks, at most every
+# HISTORY_FLUSH_SEC, and flush() on close) and then rolls raw rows older
+# than the keep window into `daily`, so the file stays bounded.
+#
+#   python history.py                          # time in state today
+#   python history.py --days 7 --project dotfiles
+#   python history.py transitions --limit 20
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+import config
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transitions (
+    project   TEXT NOT NULL,
+    old_state TEXT,
+    new_state TEXT,
+    ts        REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_transitions_project_ts ON transitions (project, ts);
+CREATE INDEX IF NOT EXISTS idx_transitions_state ON transitions (new_state);
+CREATE TABLE IF NOT EXISTS daily (
+    day     TEXT NOT NULL,
+    project TEXT NOT NULL,
+    state   TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    entries INTEGER NOT NULL,
+    PRIMARY KEY (day, project, state)
+) WITHOUT ROWID;
+"""
+
+
+def _midnight(day):
+    """Local midnight of `day` as epoch seconds."""
+    return datetime(day.year, day.month, day.day).timestamp()
+
+
+def _split_days(start, end):
+    """Yield (YYYY-MM-DD, seconds) for [start, end) cut at local midnights."""
+    while start < end:
+        day = date.fromtimestamp(start)
+        cut = min(end, _midnight(day + timedelta(days=1)))
+        yield day.isoformat(), cut - start
+        start = cut
+
+
+def _intervals(rows, until):
+    """rows: (old_state, new_state, ts) of one project, ordered by ts.
+
+    Yield (state, start, end, entered) for each span spent in a state;
+    `entered` is False for carry-over markers (old == new).
+    """
+    for n, (old, new, ts) in enumerate(rows):
+        if new is None:
+            continue
+        end = rows[n + 1][2] if n + 1 < len(rows) else until
+        yield new, ts, max(ts, end), old != new
+
+
+class HistoryStore:
+    def __init__(self, path=None, keep_days=None):
+        self.path = path or config.HISTORY_FILE
+        self.keep_days = config.HISTORY_KEEP_DAYS if keep_days is None else keep_days
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")  # WAL: fsync on checkpoint
+        self.db.executescript(_SCHEMA)
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._rolled_to = None  # cutoff of the last rollup
+        self._seen = None       # last list passed to observe()
+        self._current = dict(self.db.execute(
+            "SELECT project, new_state FROM transitions t "
+            "WHERE ts = (SELECT MAX(ts) FROM transitions WHERE project = t.project) "
+            "AND new_state IS NOT NULL"))
+
+    def record(self, project, old_state, new_state, ts=None):
+        self._pending.append((project, old_state, new_state,
+                              time.time() if ts is None else ts))
+
+    def observe(self, projects, ts=None):
+        """Queue a transition for every project whose state differs from
+        the last observed list (appeared / changed / gone)."""
+        if projects is self._seen:
+            return  # same list object: sources reuse it while nothing changed
+        self._seen = projects
+        ts = time.time() if ts is None else ts
+        live = {}
+        for p in projects:
+            live[p.label] = p.state  # "source/project" in multi-source mode
+            old = self._current.get(p.label)
+            if old != p.state:
+                self.record(p.label, old, p.state, ts)
+        for project, old in self._current.items():
+            if project not in live:
+                self.record(project, old, None, ts)
+        self._current = live
+
+    def maybe_flush(self):
+        if self._pending and (time.monotonic() - self._last_flush
+                              >= config.HISTORY_FLUSH_SEC):
+            self.flush()
+
+    def flush(self):
+        """Write queued transitions in one transaction, then roll up."""
+        self._last_flush = time.monotonic()
+        rows, self._pending = self._pending, []
+        if rows:
+            with self.db:
+                self.db.executemany(
+                    "INSERT INTO transitions (project, old_state, new_state, ts) "
+                    "VALUES (?, ?, ?, ?)", rows)
+        cutoff = _midnight(date.today() - timedelta(days=self.keep_days))
+        if self._rolled_to != cutoff:
+            self.rollup(cutoff)
+            self._rolled_to = cutoff
+
+    def rollup(self, cutoff):
+        """Fold raw rows before `cutoff` into `daily`, keeping one carry-over
+        row per project so the state at the cutoff is not lost."""
+        with self.db:
+            projects = [r[0] for r in self.db.execute(
+                "SELECT DISTINCT project FROM transitions WHERE ts < ?", (cutoff,))]
+            for project in projects:
+                rows = self.db.execute(
+                    "SELECT old_state, new_state, ts FROM transitions "
+                    "WHERE project = ? AND ts < ? ORDER BY ts",
+                    (project, cutoff)).fetchall()
+                totals = {}
+                for state, start, end, entered in _intervals(rows, cutoff):
+                    first = True
+                    for day, seconds in _split_days(start, end):
+                        t = totals.setdefault((day, state), [0.0, 0])
+                        t[0] += seconds
+                        t[1] += entered and first
+                        first = False
+                self.db.executemany(
+                    "INSERT INTO daily (day, project, state, seconds, entries) "
+                    "VALUES (?, ?, ?, ?, ?) ON CONFLICT (day, project, state) DO "
+                    "UPDATE SET seconds = seconds + excluded.seconds, "
+                    "entries = entries + excluded.entries",
+                    [(day, project, state, s, n)
+                     for (day, state), (s, n) in totals.items()])
+                self.db.execute(
+                    "DELETE FROM transitions WHERE project = ? AND ts < ?",
+                    (project, cutoff))
+                last = rows[-1][1]
+                if last is not None:
+                    self.db.execute(
+                        "INSERT INTO transitions (project, old_state, new_state, ts) "
+                        "VALUES (?, ?, ?, ?)", (project, last, last, cutoff))
+
+    def time_in_state(self, since, until=None, project=None):
+        """{project: {state: (seconds, entries)}} for [since, until).
+
+        Whole days before the raw window come from `daily`; the rest is
+        computed from raw transitions (the last open state runs to `until`).
+        """
+        until = time.time() if until is None else until
+        totals = {}
+
+        def add(proj, state, seconds, entries):
+            t = totals.setdefault(proj, {}).setdefault(state, [0.0, 0])
+            t[0] += seconds
+            t[1] += entries
+
+        raw_start = self.db.execute("SELECT MIN(ts) FROM transitions").fetchone()[0]
+        if raw_start is None:
+            raw_start = until
+        query = ("SELECT project, state, seconds, entries FROM daily "
+                 "WHERE day >= ? AND day < ?")
+        args = [date.fromtimestamp(since).isoformat(),
+                date.fromtimestamp(min(until, raw_start)).isoformat()]
+        if project is not None:
+            query += " AND project = ?"
+            args.append(project)
+        for row in self.db.execute(query, args):
+            add(*row)
+
+        query = "SELECT project, old_state, new_state, ts FROM transitions WHERE ts < ?"
+        args = [until]
+        if project is not None:
+            query += " AND project = ?"
+            args.append(project)
+        by_project = {}
+        for proj, old, new, ts in self.db.execute(query + " ORDER BY project, ts", args):
+            by_project.setdefault(proj, []).append((old, new, ts))
+        lo = max(since, raw_start)
+        for proj, rows in by_project.items():
+            for state, start, end, entered in _intervals(rows, until):
+                seconds = max(0.0, min(end, until) - max(start, lo))
+                entries = int(entered and lo <= start < until)
+                if seconds or entries:
+                    add(proj, state, seconds, entries)
+        return {proj: {s: tuple(v) for s, v in states.items()}
+                for proj, states in totals.items()}
+
+    def recent(self, limit=50, project=None):
+        query = "SELECT project, old_state, new_state, ts FROM transitions"
+        args = []
+        if project is not None:
+            query += " WHERE project = ?"
+            args.append(project)
+        query += " ORDER BY ts DESC LIMIT ?"
+        args.append(limit)
+        return self.db.execute(query, args).fetchall()
+
+    def close(self, ts=None):
+        """End every open state at `ts` (now), flush and close; the next
+        run starts from "appeared" rows instead of charging the downtime
+        to the last state."""
+        ts = time.time() if ts is None else ts
+        for project, state in self._current.items():
+            self.record(project, state, None, ts)
+        self._current = {}
+        self.flush()
+        self.db.close()
+
+
+def _duration(seconds):
+    minutes = int(seconds // 60)
+    if minutes >= 60:
+        return f"{minutes // 60}h{minutes % 60:02d}m"
+    return f"{minutes}m{int(seconds % 60):02d}s"
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="query the overlay's state history")
+    ap.add_argument("command", nargs="?", choices=["time", "transitions"],
+                    default="time")
+    ap.add_argument("--db", default=config.HISTORY_FILE)
+    ap.add_argument("--project")
+    ap.add_argument("--days", type=int, default=1, help="today plus N-1 days back")
+    ap.add_argument("--limit", type=int, default=50)
+    args = ap.parse_args(argv)
+
+    if not args.db or not os.path.exists(args.db):
+        sys.exit(f"no history at {args.db}")
+    store = HistoryStore(args.db)
+
+    if args.command == "transitions":
+        for project, old, new, ts in store.recent(args.limit, args.project):
+            stamp = datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+            print(f"{stamp}  {project:<24} {old or '-':>9} -> {new or '-'}")
+        return 0
+
+    since = _midnight(date.today() - timedelta(days=args.days - 1))
+    states = sorted(config.STATE_SORT_ORDER, key=config.STATE_SORT_ORDER.get)
+    print(f"{'project':<24}" + "".join(f"{s:>14}" for s in states))
+    result = store.time_in_state(since, project=args.project)
+    for project in sorted(result):
+        cells = []
+        for state in states:
+            seconds, entries = result[project].get(state, (0.0, 0))
+            cells.append(f"{_duration(seconds)} x{entries}" if entries or seconds
+                         else "-")
+        print(f"{project:<24}" + "".join(f"{c:>14}" for c in cells))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
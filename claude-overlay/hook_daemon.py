@@ -0,0 +1,351 @@
+# Claude Status Overlay - Hook State-machine Daemon
+#
+# `python -m state_reader hookd` keeps scripts/claude-hook.sh's 5-state
+# machine in one resident process. claude-dispatch.sh sends one datagram
+# per hook event to HOOK_SOCKET while it exists (and falls back to forking
+# claude-hook.sh when it does not), so a burst of PreToolUse/PostToolUse
+# costs a sendto() each instead of a bash + date/cat/flock/head/tr/tmux
+# fan-out, and no `sleep` watchdog subshells are left behind.
+#
+# Same rules as claude-hook.sh:
+#   - event/matcher → state (UserPromptSubmit → RUNNING, Stop → COMPLETED, ...)
+#   - WAITING is not replaced by COMPLETED
+#   - the same state again within HOOK_DEDUP_SEC is ignored
+#   - RUNNING with no activity for HOOK_RUNNING_TIMEOUT_SEC → IDLE
+#   - Stop → IDLE after HOOK_STOP_IDLE_SEC unless RUNNING comes first
+# and the same outputs: /tmp/claude-led-state-*, /tmp/claude-activity-*
+# and the tmux @claude_state window option, plus the status table
+# (status_table.py) when HOOK_STATUS_TABLE is set. Both timers live on one
+# TimerWheel; the watchdog fires when the deadline passes instead of on
+# the bash loop's 30 s polls.
+#
+# The files stay the shared truth: the script still writes them when the
+# dispatcher falls back to it, and so do watchdog subshells forked before
+# the daemon started. So, like the script, every decision re-reads the
+# state file, dedup goes through claude-led-dedup-*, and Stop → IDLE is
+# armed by claude-idle-pending-* (a RUNNING from either side removes it).
+#
+# Datagram: "event\tmatcher\tproject\twindow_index\t$TMUX\n". $TMUX is
+# passed to `tmux set-window-option` so `-t :N` resolves in the sender's
+# session, as it does when the hook runs inside that session.
+#
+#   python -m state_reader hookd                 # listen on HOOK_SOCKET
+#   python hook_daemon.py send Stop "" myproj    # one event, for testing
+
+import argparse
+import os
+import selectors
+import socket
+import subprocess
+import sys
+import time
+
+import config
+from state_reader import read_activity_file, read_state_file
+from state_watcher import TimerWheel
+
+RUNNING_TIMEOUT = "running-timeout"
+STOP_IDLE = "stop-idle"
+
+# claude-hook.sh's bookkeeping files, next to the state files
+DEDUP_FILE_PREFIX = "claude-led-dedup-"
+IDLE_PENDING_PREFIX = "claude-idle-pending-"
+
+
+def resolve_state(event, matcher):
+    """claude-hook.sh resolve_state(): the state an event moves to, or None."""
+    if event == "UserPromptSubmit":
+        return "RUNNING"
+    if event == "PreToolUse":
+        return "WAITING" if matcher == "AskUserQuestion" else None
+    if event == "PostToolUse":
+        return "RUNNING" if matcher == "AskUserQuestion" else None
+    if event == "Notification":
+        return {"idle_prompt": "IDLE", "permission_prompt": "WAITING"}.get(matcher)
+    if event == "Stop":
+        return "COMPLETED"
+    return None
+
+
+class _Project:
+    __slots__ = ("activity", "activity_written", "window", "tmux")
+
+    def __init__(self):
+        self.activity = 0
+        self.activity_written = None
+        self.window = ""
+        self.tmux = ""
+
+
+class HookStateMachine:
+    """The claude-hook.sh rules, deciding on the same files as the script.
+
+    handle() applies one event, fire_timers() the expired watchdogs;
+    both write the state/activity files and tmux just like the script,
+    and the open StatusTable `table` if given.
+    """
+
+    def __init__(self, tmp_dir=None, tmux=True, clock=time.time, table=None):
+        self.tmp_dir = tmp_dir or config.WATCH_TMP_DIR
+        self.tmux = tmux
+        self.clock = clock
+        self.table = table
+        self.wheel = TimerWheel(config.HOOK_WHEEL_TICK_MS / 1000)
+        self._projects = {}
+        self._children = []
+        self.stats = {"events": 0, "transitions": 0, "suppressed": 0,
+                      "deduped": 0, "timeouts": 0}
+
+    def _path(self, prefix, project):
+        return os.path.join(self.tmp_dir, prefix + project)
+
+    def _project(self, name):
+        p = self._projects.get(name)
+        if p is None:
+            p = self._projects[name] = _Project()
+        return p
+
+    def _read_state(self, project):
+        """Current state file content ("" if none), like the script's cat."""
+        try:
+            return read_state_file(self._path(config.STATE_FILE_PREFIX, project))
+        except OSError:
+            return ""
+
+    def _read_epoch(self, prefix, project):
+        try:
+            return read_activity_file(self._path(prefix, project))
+        except (OSError, ValueError):
+            return None
+
+    def handle(self, event, matcher="", project="default", window="", tmux=""):
+        """Apply one hook event; returns the new state or None."""
+        self.stats["events"] += 1
+        now = self.clock()
+        p = self._project(project or "default")
+        if window:
+            p.window, p.tmux = window, tmux
+
+        # Activity first, like the script (before its lock); the file only
+        # changes once per second, so later writes in that second are skipped
+        p.activity = int(now)
+        if p.activity_written != p.activity:
+            self._write(config.ACTIVITY_FILE_PREFIX, project, f"{p.activity}\n")
+            if self.table is not None:
+                self.table.set(project, activity=p.activity)
+            p.activity_written = p.activity
+
+        new_state = resolve_state(event, matcher)
+        if new_state is None:
+            return None
+        current = self._read_state(project)
+        if current == "WAITING" and new_state == "COMPLETED":
+            self.stats["suppressed"] += 1
+            return None
+        if current == new_state:
+            last = self._read_epoch(DEDUP_FILE_PREFIX, project)
+            if last is not None and int(now) - last < config.HOOK_DEDUP_SEC:
+                self.stats["deduped"] += 1
+                return None
+
+        self._write(DEDUP_FILE_PREFIX, project, f"{int(now)}\n")
+        self._set_state(project, p, new_state)
+        if new_state == "RUNNING":
+            self._remove(IDLE_PENDING_PREFIX, project)  # also disarms the script's
+            self.wheel.cancel((STOP_IDLE, project))
+            self.wheel.schedule((RUNNING_TIMEOUT, project),
+                                p.activity + config.HOOK_RUNNING_TIMEOUT_SEC)
+        if event == "Stop":
+            self._write(IDLE_PENDING_PREFIX, project, "")
+            self.wheel.schedule((STOP_IDLE, project), now + config.HOOK_STOP_IDLE_SEC)
+        return new_state
+
+    def fire_timers(self):
+        now = self.clock()
+        for kind, project in self.wheel.advance(now):
+            p = self._projects.get(project)
+            if p is None:
+                continue
+            if kind == STOP_IDLE:
+                if os.path.exists(self._path(IDLE_PENDING_PREFIX, project)):
+                    self._set_state(project, p, "IDLE")
+            elif self._read_state(project) == "RUNNING":
+                # The script may have logged activity the daemon never saw
+                last = self._read_epoch(config.ACTIVITY_FILE_PREFIX, project)
+                if last is None:
+                    last = p.activity
+                deadline = last + config.HOOK_RUNNING_TIMEOUT_SEC
+                if now >= deadline:
+                    self.stats["timeouts"] += 1
+                    self._set_state(project, p, "IDLE")
+                else:
+                    self.wheel.schedule((RUNNING_TIMEOUT, project), deadline)
+        self._reap()
+
+    def next_timer_in(self):
+        return self.wheel.next_tick_in(self.clock())
+
+    def _set_state(self, project, p, state):
+        self.stats["transitions"] += 1
+        self._write(config.STATE_FILE_PREFIX, project, state + "\n")
+        if self.table is not None:
+            self.table.set(project, state)
+        if self.tmux and p.window:
+            env = dict(os.environ, TMUX=p.tmux) if p.tmux else None
+            try:
+                self._children.append(subprocess.Popen(
+                    ["tmux", "set-window-option", "-t", f":{p.window}",
+                     "@claude_state", state.lower()],
+                    stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL, env=env))
+            except OSError:
+                pass
+
+    def _write(self, prefix, project, text):
+        try:
+            with open(self._path(prefix, project), "w") as f:
+                f.write(text)
+        except OSError:
+            pass
+
+    def _remove(self, prefix, project):
+        try:
+            os.remove(self._path(prefix, project))
+        except OSError:
+            pass
+
+    def _reap(self):
+        if self._children:
+            self._children = [c for c in self._children if c.poll() is None]
+
+
+def parse_event(data):
+    """Datagram → handle() kwargs, or None if malformed."""
+    fields = data.decode("utf-8", "replace").rstrip("\n").split("\t")
+    if not fields[0]:
+        return None
+    fields += [""] * (5 - len(fields))
+    event, matcher, project, window, tmux = fields[:5]
+    return {"event": event, "matcher": matcher, "project": project or "default",
+            "window": window, "tmux": tmux}
+
+
+class HookDaemon:
+    """HookStateMachine behind a Unix datagram socket."""
+
+    def __init__(self, path=None, machine=None):
+        self.path = path or config.HOOK_SOCKET
+        self.machine = machine or HookStateMachine()
+        self._sock = None
+        self._selector = None
+        self._stopping = False
+
+    def start(self):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            probe.connect(self.path)
+        except OSError:
+            pass  # nobody bound: a leftover socket file, or none
+        else:
+            raise OSError(f"hook daemon already running on {self.path}")
+        finally:
+            probe.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.bind(self.path)
+        os.chmod(self.path, 0o600)
+        self._sock.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._sock, selectors.EVENT_READ)
+
+    def serve_forever(self):
+        while not self._stopping:
+            self._selector.select(self.machine.next_timer_in())
+            self._drain()
+            self.machine.fire_timers()
+
+    def stop(self):
+        self._stopping = True
+
+    def _drain(self):
+        while True:
+            try:
+                data = self._sock.recv(4096)
+            except (BlockingIOError, InterruptedError):
+                return
+            event = parse_event(data)
+            if event is not None:
+                self.machine.handle(**event)
+
+    def close(self):
+        if self._selector is not None:
+            self._selector.close()
+        if self._sock is not None:
+            self._sock.close()
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+
+def send_event(event, matcher="", project="default", window="", tmux="", path=None):
+    """Send one event to a running daemon; False if none is listening."""
+    line = "\t".join((event, matcher, project, window, tmux)) + "\n"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+        try:
+            sock.sendto(line.encode(), path or config.HOOK_SOCKET)
+        except OSError:
+            return False
+    return True
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="state_reader hookd",
+                                 description="resident claude-hook.sh state machine")
+    ap.add_argument("--socket", default=config.HOOK_SOCKET)
+    ap.add_argument("--tmp-dir", default=None, help="default: WATCH_TMP_DIR")
+    ap.add_argument("--no-tmux", action="store_true")
+    ap.add_argument("--table", default=config.STATUS_TABLE_FILE,
+                    help="status table file (default: STATUS_TABLE_FILE)")
+    ap.add_argument("--no-table", action="store_true",
+                    help="state files only (default when HOOK_STATUS_TABLE is off)")
+    args = ap.parse_args(argv)
+
+    table = None
+    if config.HOOK_STATUS_TABLE and not args.no_table:
+        from status_table import StatusTable
+        try:
+            table = StatusTable(args.table).open()
+        except OSError as e:
+            print(f"status table disabled: {e}", file=sys.stderr)
+    daemon = HookDaemon(args.socket, HookStateMachine(
+        args.tmp_dir, tmux=not args.no_tmux, table=table))
+    try:
+        daemon.start()
+    except OSError as e:
+        print(e, file=sys.stderr)
+        if table is not None:
+            table.close()
+        return 1
+    print(f"hookd listening on {args.socket}", file=sys.stderr, flush=True)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.close()
+        if table is not None:
+            table.close()
+    return 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "send":
+        # python hook_daemon.py send <event> [matcher] [project] [window_index]
+        args = sys.argv[2:6] + [""] * (6 - len(sys.argv))
+        sys.exit(0 if send_event(args[0], args[1], args[2] or "default", args[3],
+                                 os.environ.get("TMUX", "")) else 1)
+    sys.exit(main(sys.argv[1:]))
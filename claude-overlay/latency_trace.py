@@ -0,0 +1,97 @@
+# Claude Status Overlay - Latency Trace
+#
+# Trace mode (`main.py --trace FILE` or config.TRACE_FILE): for every
+# transition the overlay renders, log how long ago the hook wrote the
+# state file. Latency = render time (after update_idletasks, i.e. the
+# redraw has been issued) minus the claude-led-state-<project> mtime, so it
+# covers the whole hook → poll/watch → reconcile → paint path and works for
+# real hook runs as well as bench/replay.py streams.
+#
+# One JSON line per transition into a hook-written state (STALE comes from
+# activity age, not from a write, so it is not traced):
+#   {"ts", "project", "state", "latency_ms", "source"}
+# "source" is the overlay's active source; the overlay calls set_source()
+# when it is switched from the menu.
+# `python bench/replay.py report FILE` turns it into a histogram.
+#
+# Only trace mode pays for the extra stat() per transition. WSL and
+# Windows share one clock, but after sleep/resume WSL2 can drift; compare
+# runs taken back to back.
+
+import json
+import os
+import time
+
+import config
+
+
+UNTRACED_STATES = {"STALE"}
+
+
+def _state_dirs(source):
+    """source name (None for untagged) -> tmp dir holding its state files."""
+    local = source in ("watch", "table")
+    default = config.WATCH_TMP_DIR if local else config.WSL_TMP_DIR
+    dirs = {None: default}
+    for spec in config.SOURCES:
+        if spec.get("kind", "dir") == "dir":
+            dirs[spec["name"]] = spec["path"]
+    return dirs
+
+
+class LatencyTracer:
+    def __init__(self, path, source=None, flush_lines=50):
+        self.path = path
+        self.source = source or config.SOURCE
+        self._dirs = _state_dirs(self.source)
+        self._seen = None  # label -> state of the last traced list
+        self._lines = []
+        self._flush_lines = flush_lines
+
+    def set_source(self, source):
+        """The overlay switched sources: its first table is not transitions."""
+        self.source = source
+        self._dirs = _state_dirs(source)
+        self._seen = None
+
+    def observe(self, projects):
+        """Call right after the projects were rendered and drawn."""
+        now = time.time()
+        states = {p.label: p.state for p in projects}
+        if self._seen is None:
+            self._seen = states  # initial table: not transitions
+            return
+        for p in projects:
+            if self._seen.get(p.label) == p.state or p.state in UNTRACED_STATES:
+                continue
+            directory = self._dirs.get(p.source)
+            if directory is None:
+                continue  # not a file-backed source
+            try:
+                mtime = os.stat(os.path.join(
+                    directory, config.STATE_FILE_PREFIX + p.project)).st_mtime
+            except OSError:
+                continue
+            self._lines.append(json.dumps({
+                "ts": round(now, 6),
+                "project": p.label,
+                "state": p.state,
+                "latency_ms": round((now - mtime) * 1000, 3),
+                "source": self.source,
+            }))
+        self._seen = states
+        if len(self._lines) >= self._flush_lines:
+            self.flush()
+
+    def flush(self):
+        if not self._lines:
+            return
+        data = "\n".join(self._lines) + "\n"
+        self._lines = []
+        try:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(data)
+        except OSError:
+            pass
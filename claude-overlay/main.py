@@ -2,18 +2,43 @@
 #
 # Launch with pythonw.exe for windowless execution.
 # Usage: pythonw.exe main.py
+#        python.exe main.py --timing      # print the startup timing breakdown
+#        python.exe main.py --trace FILE  # log hook-write → render latency
+#
+# Only what the first paint needs is imported up front; the source (scan
+# worker, state_reader, MQTT) is imported once the window is on screen.
 
-import ctypes
+import sys
 
-from overlay import StatusOverlay
+from startup import StartupTimer
 
 
-if __name__ == "__main__":
+def _set_dpi_awareness():
     # DPI awareness (same pattern as IME_Indicator)
+    import ctypes
     try:
         ctypes.windll.shcore.SetProcessDpiAwareness(2)
     except Exception:
         ctypes.windll.user32.SetProcessDPIAware()
 
-    app = StatusOverlay()
+
+def _option(flag):
+    """Value following `flag` on the command line, or None."""
+    args = sys.argv[1:]
+    if flag in args and args.index(flag) + 1 < len(args):
+        return args[args.index(flag) + 1]
+    return None
+
+
+if __name__ == "__main__":
+    timer = StartupTimer(enabled="--timing" in sys.argv[1:])
+    _set_dpi_awareness()
+
+    import config
+    config.TRACE_FILE = _option("--trace") or config.TRACE_FILE
+
+    from overlay import StatusOverlay
+    timer.mark("imports")
+
+    app = StatusOverlay(startup=timer)
     app.run()
@@ -0,0 +1,191 @@
+# Claude Status Overlay - MQTT Source
+#
+# Push-based source: subscribes to the retained claude/led/<project> topics
+# that tmux-mqtt-colors.sh publishes (payload from lib/mqtt.sh build_payload:
+# {domain, state, project}). The paho network loop runs on its own thread
+# and hands decoded updates to the Tk thread through a queue.Queue; read()
+# drains it. While the broker is unreachable read() falls back to the file
+# source (background UNC scans, see scan_worker).
+#
+# paho-mqtt is optional (pip install paho-mqtt). Without it the source
+# stays permanently in fallback mode.
+#
+# Manual check against a broker:  python mqtt_source.py [host] [port]
+
+import json
+import queue
+import sys
+import threading
+
+import config
+from state_reader import ProjectRecord, normalize_state, sort_projects
+
+try:
+    import paho.mqtt.client as mqtt
+except ImportError:
+    mqtt = None
+
+_RESET = object()  # queued on (re)connect: retained messages rebuild the table
+
+
+def _default_client():
+    try:
+        return mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+    except AttributeError:  # paho-mqtt < 2.0
+        return mqtt.Client()
+
+
+def decode_message(topic, payload):
+    """claude/led/<project> message -> (project, state or None for removed).
+
+    Returns None for topics/payloads that are not a project update.
+    """
+    parts = topic.split("/")
+    if len(parts) != 3 or not parts[2]:
+        return None
+    project = parts[2]
+
+    if not payload:
+        return project, None  # retained message cleared → project gone
+
+    try:
+        data = json.loads(payload)
+        state = normalize_state(str(data.get("state", "")))
+    except (ValueError, AttributeError):
+        return None
+    return project, state
+
+
+class MqttSource:
+    """Overlay source fed by claude/led/+ retained messages.
+
+    client_factory lets tests swap paho for an in-process fake: it must
+    return an object with paho's on_connect/on_disconnect/on_message
+    attributes and connect_async/subscribe/loop_start/loop_stop/disconnect.
+    """
+
+    def __init__(self, host, port, fallback, topic=None, client_factory=None):
+        self.host = host
+        self.port = port
+        self.topic = topic or config.MQTT_TOPIC
+        self.updates = queue.Queue()
+        self.fallback = fallback
+        self._client_factory = client_factory or (_default_client if mqtt else None)
+        self._client = None
+        self._connected = threading.Event()
+        self._projects = {}    # project -> state (Tk thread only)
+        self._snapshot = []
+
+    @property
+    def connected(self):
+        return self._connected.is_set()
+
+    def start(self):
+        if self._client_factory is None:
+            return  # paho-mqtt not installed → file fallback only
+        client = self._client = self._client_factory()
+        client.on_connect = self._on_connect
+        client.on_disconnect = self._on_disconnect
+        client.on_message = self._on_message
+        try:
+            client.reconnect_delay_set(1, 30)
+        except AttributeError:
+            pass
+        client.connect_async(self.host, self.port, keepalive=30)
+        client.loop_start()
+
+    def close(self):
+        self.fallback.close()
+        if self._client is not None:
+            self._client.loop_stop()
+            self._client.disconnect()
+            self._client = None
+        self._connected.clear()
+
+    # ── network thread ──
+
+    def _on_connect(self, client, userdata, flags, rc, properties=None):
+        if rc != 0:
+            return
+        self.updates.put(_RESET)
+        client.subscribe(self.topic)
+        self._connected.set()
+
+    def _on_disconnect(self, client, userdata, *args):
+        self._connected.clear()
+
+    def _on_message(self, client, userdata, msg):
+        update = decode_message(msg.topic, msg.payload)
+        if update is not None:
+            self.updates.put(update)
+
+    # ── Tk thread ──
+
+    def drain(self):
+        """Apply queued updates; return True if the project table changed."""
+        changed = False
+        while True:
+            try:
+                item = self.updates.get_nowait()
+            except queue.Empty:
+                break
+            if item is _RESET:
+                changed = changed or bool(self._projects)
+                self._projects.clear()
+                continue
+            project, state = item
+            if state is None:
+                changed = self._projects.pop(project, None) is not None or changed
+            elif self._projects.get(project) != state:
+                self._projects[project] = state
+                changed = True
+        if changed:
+            self._snapshot = sort_projects(
+                [ProjectRecord(p, s) for p, s in self._projects.items()])
+        return changed
+
+    def refresh(self):
+        if not self.connected:
+            self.fallback.refresh()
+
+    def read(self):
+        self.drain()
+        if not self.connected:
+            return self.fallback.read()
+        return self._snapshot
+
+    def notice(self):
+        if not self.connected:
+            return self.fallback.notice()
+        return None
+
+    def take_timings(self):
+        if not self.connected:
+            return self.fallback.take_timings()
+        return None
+
+    def pending_ms(self):
+        # Pushed updates sit in the queue until drained; keep draining at
+        # MQTT_DRAIN_MS for sub-100 ms latency.
+        if self.connected:
+            return config.MQTT_DRAIN_MS
+        return self.fallback.pending_ms()
+
+
+if __name__ == "__main__":
+    import time
+
+    host = sys.argv[1] if len(sys.argv) > 1 else config.MQTT_HOST
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else config.MQTT_PORT
+    if mqtt is None:
+        sys.exit("paho-mqtt not installed (pip install paho-mqtt)")
+    from sources import make_file_source
+    source = MqttSource(host, port, fallback=make_file_source())
+    source.start()
+    try:
+        while True:
+            if source.drain():
+                print(source.read(), flush=True)
+            time.sleep(config.MQTT_DRAIN_MS / 1000)
+    except KeyboardInterrupt:
+        source.close()
@@ -0,0 +1,203 @@
+# Claude Status Overlay - Multi-source Aggregation
+#
+# config.SOURCE = "multi" merges every entry of config.SOURCES (several WSL
+# distros, local dirs, remote hosts) into one sorted list. Records are
+# tagged with the entry's name and shown as "name/project".
+#
+# Entry kinds (see config.SOURCES):
+#   dir      - claude-led-state-* files in a UNC path or local dir
+#   snapshot - a sidecar state.json (missing/stale counts as a failure)
+#   serve    - a `python -m state_reader serve` instance (e.g. on rpi5b)
+#   mqtt     - retained claude/led/+ messages from a broker (push)
+#
+# The blocking kinds are BackgroundSources sharing ONE bounded pool of
+# daemon threads (MULTI_MAX_WORKERS), each with its own deadline and
+# circuit breaker. refresh() submits all of them at once and read() merges
+# whatever has finished, so a tick costs the slowest healthy source, not
+# the sum; an unreachable source keeps its last good rows and is named in
+# the notice row until it recovers.
+
+import time
+
+import config
+from scan_worker import BackgroundSource, Worker
+from state_reader import ProjectRecord, StateScanner, sort_projects
+
+BLOCKING_KINDS = ("dir", "snapshot", "serve")
+
+
+def _tag(records, name):
+    if not records or records[0].source == name:
+        return records
+    return [ProjectRecord(r.project, r.state, name) for r in records]
+
+
+def _no_fallback():
+    raise OSError("snapshot missing or stale")
+
+
+def _blocking_scan(spec):
+    """(scan_fn, timings_fn) for a dir / snapshot / serve entry. scan_fn
+    raises on failure so the breaker can count it."""
+    kind = spec.get("kind", "dir")
+    name = spec["name"]
+    if kind == "dir":
+        scanner = StateScanner(spec["path"], source=name)
+        return (lambda: scanner.scan(strict=True)), (lambda: dict(scanner.timings))
+    if kind == "snapshot":
+        from snapshot_reader import SnapshotReader
+        reader = SnapshotReader(spec.get("path"), fallback=_no_fallback)
+        return reader.scan, reader.read_timings
+    if kind == "serve":
+        from status_server import fetch_snapshot
+        timeout = spec.get("timeout_ms", config.SCAN_TIMEOUT_MS) / 1000
+        host, port = spec["host"], spec.get("port")
+        return (lambda: fetch_snapshot(host, port, timeout, source=name)), None
+    raise ValueError(f"source {name!r}: unknown kind {kind!r}")
+
+
+class _Offline:
+    """Fallback for an MQTT entry: no rows while its broker is away."""
+
+    def refresh(self):
+        pass
+
+    def read(self):
+        return None
+
+    def notice(self):
+        return None
+
+    def take_timings(self):
+        return None
+
+    def pending_ms(self):
+        return None
+
+    def close(self):
+        pass
+
+
+class _Member:
+    """One named entry; tags its records (cached while the list is reused)."""
+
+    def __init__(self, name, source):
+        self.name = name
+        self.source = source
+        self._raw = None
+        self._tagged = None
+
+    def read(self):
+        raw = self.source.read()
+        if raw is not self._raw:
+            self._raw = raw
+            self._tagged = None if raw is None else _tag(raw, self.name)
+        return self._tagged
+
+    def health(self):
+        connected = getattr(self.source, "connected", None)
+        if connected is not None:
+            return "ok" if connected else "offline"
+        if self.source.unavailable:
+            return "unavailable"
+        return "pending" if self._raw is None else "ok"
+
+
+class MultiSource:
+    """Overlay source over several named sources (see config.SOURCES)."""
+
+    def __init__(self, specs=None, max_workers=None):
+        specs = config.SOURCES if specs is None else specs
+        blocking = sum(spec.get("kind", "dir") in BLOCKING_KINDS for spec in specs)
+        threads = min(blocking, max_workers or config.MULTI_MAX_WORKERS)
+        self._pool = Worker("multi-scan", threads=threads) if threads else None
+        self.members = [_Member(spec["name"], self._make(spec)) for spec in specs]
+        self._inputs = None
+        self._merged = None
+
+    def _make(self, spec):
+        if spec.get("kind", "dir") == "mqtt":
+            from mqtt_source import MqttSource
+            source = MqttSource(spec["host"], spec.get("port", config.MQTT_PORT),
+                                fallback=_Offline(), topic=spec.get("topic"))
+            source.start()
+            return source
+        scan_fn, timings_fn = _blocking_scan(spec)
+        return BackgroundSource(scan_fn, spec.get("timeout_ms"),
+                                timings_fn=timings_fn, worker=self._pool)
+
+    def health(self):
+        """{name: "ok" | "pending" | "unavailable" | "offline"}"""
+        return {m.name: m.health() for m in self.members}
+
+    def refresh(self):
+        for member in self.members:
+            member.source.refresh()
+
+    def read(self):
+        lists = [member.read() for member in self.members]
+        if all(records is None for records in lists):
+            return None
+        if self._inputs is not None and all(
+                a is b for a, b in zip(lists, self._inputs)):
+            return self._merged  # nothing new from any source
+        self._inputs = lists
+        self._merged = sort_projects(
+            [r for records in lists if records for r in records])
+        return self._merged
+
+    def notice(self):
+        down = [name for name, health in self.health().items()
+                if health in ("unavailable", "offline")]
+        if not down:
+            return None
+        return "Unavailable: " + ", ".join(down)
+
+    def take_timings(self):
+        # Sources run side by side: a stage costs as much as its slowest
+        merged = {}
+        for member in self.members:
+            for stage, ms in (member.source.take_timings() or {}).items():
+                merged[stage] = max(merged.get(stage, 0.0), ms)
+        return merged or None
+
+    def pending_ms(self):
+        pending = [ms for ms in (m.source.pending_ms() for m in self.members)
+                   if ms is not None]
+        return min(pending, default=None)
+
+    def close(self):
+        for member in self.members:
+            member.source.close()
+        if self._pool is not None:
+            self._pool.shutdown()
+
+
+def scan_sources(specs, max_workers=None):
+    """Blocking one-shot merge behind read_projects(sources).
+
+    Every blocking entry is scanned concurrently and waited for up to its
+    own timeout; entries that fail or time out are left out. Push (mqtt)
+    entries have no one-shot read and are skipped.
+    """
+    specs = [spec for spec in specs if spec.get("kind", "dir") in BLOCKING_KINDS]
+    if not specs:
+        return []
+    pool = Worker("scan-sources",
+                  threads=min(len(specs), max_workers or config.MULTI_MAX_WORKERS))
+    start = time.monotonic()
+    jobs = []
+    for spec in specs:
+        scan_fn, _ = _blocking_scan(spec)
+        timeout = spec.get("timeout_ms", config.SCAN_TIMEOUT_MS) / 1000
+        jobs.append((spec["name"], pool.submit(scan_fn), start + timeout))
+
+    results = []
+    for name, future, deadline in jobs:
+        try:
+            records = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except Exception:
+            continue  # failed or past its deadline; the daemon thread is left behind
+        results.extend(_tag(records, name))
+    pool.shutdown()
+    return sort_projects(results)
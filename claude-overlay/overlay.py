@@ -1,17 +1,31 @@
 # Claude Status Overlay - Tkinter Window
 #
 # Draggable, semi-transparent, always-on-top overlay showing Claude project states.
+#
+# Rows go through viewport.Viewport: WAITING/RUNNING pinned on top, large
+# state groups collapsed (click to expand), at most VIEW_MAX_ROWS visible
+# (mouse wheel scrolls).
+#
+# Startup paints the last-known table (settings.py) before the source is
+# even imported, then swaps in live data once the first scan lands.
+# Settings are written on drag end or once changes go quiet, never per tick.
 
-import json
-import os
+import time
 import tkinter as tk
+import tkinter.font as tkfont
 
 import config
-from state_reader import read_projects
+from perf import PerfRecorder
+from renderers import make_renderer
+from scheduler import AdaptiveScheduler, session_locked
+from settings import SettingsStore
+from state_reader import ProjectRecord
+from viewport import Viewport, is_group
 
 
 class StatusOverlay:
-    def __init__(self):
+    def __init__(self, startup=None):
+        self.startup = startup
         self.root = tk.Tk()
         self.root.title("Claude Status")
         self.root.overrideredirect(True)  # no title bar
@@ -22,35 +36,127 @@ class StatusOverlay:
         # Drag state
         self._drag_x = 0
         self._drag_y = 0
+        self._press_at = None  # window position at ButtonPress (click vs drag)
+
+        # Position, last table, source, expanded groups: one file, read once
+        self.settings = SettingsStore().load()
+        self._source_name = self.settings.get("source")
+        if self._source_name not in config.SOURCE_CHOICES:
+            self._source_name = config.SOURCE
 
         # Blink state
         self._blink_on = True
-        self._blink_labels = []  # labels that need blinking
 
-        # Content frame
-        self.frame = tk.Frame(self.root, bg=config.BG_COLOR)
+        # Content (Label rows or a single Canvas, see config.RENDERER)
+        font = tkfont.Font(family=config.FONT_FAMILY, size=config.FONT_SIZE)
+        self.renderer = make_renderer(self.root, font, self._bind_row)
+        self.frame = self.renderer.widget
         self.frame.pack(fill=tk.BOTH, expand=True, padx=config.WINDOW_PADDING,
                         pady=config.WINDOW_PADDING)
 
-        # Bind drag events on root
+        # Visible rows: pinned / grouped / scrolled (see viewport.py)
+        self.view = Viewport()
+        expanded = self.settings.get("expanded")
+        if isinstance(expanded, list):
+            self.view.expanded = set(expanded)
+        self._shown = ([], None)  # (projects, notice) last rendered
+
+        # Bind drag events on root; release without a move is a click.
+        # Child widgets carry the toplevel's bindtag, so these fire for rows too.
         self.root.bind("<ButtonPress-1>", self._on_drag_start)
         self.root.bind("<B1-Motion>", self._on_drag_motion)
+        self.root.bind("<ButtonRelease-1>", self._on_click)
+        self.root.bind("<MouseWheel>", self._on_wheel)     # Windows / macOS
+        self.root.bind("<Button-4>", self._on_wheel)       # X11 wheel up
+        self.root.bind("<Button-5>", self._on_wheel)       # X11 wheel down
+
+        # Hot-path timings + optional stats footer
+        self.perf = PerfRecorder(dump_file=config.PERF_DUMP_FILE)
+        self._perf_visible = tk.BooleanVar(value=False)
+        self._perf_footer = tk.Label(
+            self.root,
+            font=(config.PERF_FONT_FAMILY, config.PERF_FONT_SIZE),
+            fg=config.DIM_COLOR,
+            bg=config.BG_COLOR,
+            justify=tk.LEFT,
+            anchor=tk.W,
+        )
+        self._bind_row(self._perf_footer)
 
         # Right-click menu
         self.menu = tk.Menu(self.root, tearoff=0)
-        self.menu.add_command(label="Close", command=self.root.destroy)
+        self.menu.add_checkbutton(label="Perf stats", variable=self._perf_visible,
+                                  command=self._toggle_perf)
+        self._source_var = tk.StringVar(value=self._source_name)
+        source_menu = tk.Menu(self.menu, tearoff=0)
+        for name in config.SOURCE_CHOICES:
+            source_menu.add_radiobutton(label=name, value=name, variable=self._source_var,
+                                        command=self._switch_source)
+        self.menu.add_cascade(label="Source", menu=source_menu)
+        self.menu.add_command(label="Close", command=self._close)
         self.root.bind("<ButtonPress-3>", self._on_right_click)
 
         # Restore position
         self._restore_position()
+        self._mark("tk init")
+
+        # First paint from the cached table; nothing below has run a scan
+        self.scheduler = None
+        self._live = False
+        self._last_state = self._load_last_state()
+        self._saved_state = self._last_state
+        self._render(self._last_state, config.STARTUP_NOTICE)
+        self.root.update()
+        self._mark("first paint")
 
-        # Initial render + start polling
-        self._update()
-        self._blink()
+        # Project state source (file polling, snapshot, watch or MQTT push);
+        # imported here so its modules stay off the first-paint path
+        from sources import make_source
+        self.source = make_source(self._source_name)
+        self.history = self._open_history()
+        self.tracer = None
+        if config.TRACE_FILE:
+            from latency_trace import LatencyTracer
+            self.tracer = LatencyTracer(config.TRACE_FILE, source=self._source_name)
+
+        # Poll + blink ticks share one adaptive timer
+        self.scheduler = AdaptiveScheduler(
+            self.root,
+            on_poll=self._poll,
+            on_blink=self._blink,
+            blinking=lambda: self.renderer.blinking,
+            pending_ms=lambda: self.source.pending_ms(),
+            is_hidden=self._is_hidden,
+            perf=self.perf,
+        )
+        self.root.bind("<Map>", lambda e: self.scheduler.wake())
+        self.scheduler.start()
+
+    def _mark(self, phase):
+        if self.startup is not None:
+            self.startup.mark(phase)
 
     def _on_drag_start(self, event):
         self._drag_x = event.x
         self._drag_y = event.y
+        self._press_at = (self.root.winfo_x(), self.root.winfo_y())
+
+    def _on_click(self, event):
+        if self._press_at != (self.root.winfo_x(), self.root.winfo_y()):
+            # Drag end: the one moment the position is worth saving
+            self.settings.set("position", [self.root.winfo_x(), self.root.winfo_y()])
+            self.settings.flush()
+            return
+        key = self.renderer.key_at(event)
+        if is_group(key):
+            self.view.toggle(key[1])
+            self.settings.set("expanded", sorted(self.view.expanded))
+            self._render(*self._shown)
+
+    def _on_wheel(self, event):
+        up = getattr(event, "delta", 0) > 0 or getattr(event, "num", None) == 4
+        self.view.scroll(-1 if up else 1)
+        self._render(*self._shown)
 
     def _on_drag_motion(self, event):
         x = self.root.winfo_x() + event.x - self._drag_x
@@ -60,90 +166,157 @@ class StatusOverlay:
     def _on_right_click(self, event):
         self.menu.tk_popup(event.x_root, event.y_root)
 
+    def _switch_source(self):
+        name = self._source_var.get()
+        if name == self._source_name:
+            return
+        from sources import make_source
+        self.source.close()
+        self.source = make_source(name)
+        self._source_name = name
+        self._live = False
+        if self.tracer is not None:
+            self.tracer.set_source(name)
+        self.settings.set("source", name)
+        self.settings.flush()
+        self.scheduler.wake()
+
+    def _close(self):
+        self.scheduler.stop()
+        self.settings.flush()
+        self.source.close()
+        if self.history is not None:
+            self.history.close()
+        if self.tracer is not None:
+            self.tracer.flush()
+        self.perf.flush()
+        self.root.destroy()
+
     def _restore_position(self):
         try:
-            with open(config.POSITION_FILE, "r") as f:
-                pos = json.load(f)
-            self.root.geometry(f"+{pos['x']}+{pos['y']}")
-        except (OSError, KeyError, json.JSONDecodeError):
+            x, y = self.settings.get("position")
+            self.root.geometry(f"+{int(x)}+{int(y)}")
+        except (TypeError, ValueError):
             # Default: top-right area
             self.root.update_idletasks()
             screen_w = self.root.winfo_screenwidth()
             self.root.geometry(f"+{screen_w - 300}+50")
 
-    def _save_position(self):
-        x = self.root.winfo_x()
-        y = self.root.winfo_y()
+    def _open_history(self):
+        if not config.HISTORY_FILE:
+            return None
+        import sqlite3
+        from history import HistoryStore
         try:
-            os.makedirs(os.path.dirname(config.POSITION_FILE), exist_ok=True)
-            with open(config.POSITION_FILE, "w") as f:
-                json.dump({"x": x, "y": y}, f)
-        except OSError:
-            pass
+            return HistoryStore()
+        except (OSError, sqlite3.Error):
+            return None  # history is optional; never block the overlay
+
+    def _load_last_state(self):
+        """Project list saved by the previous run, or []."""
+        try:
+            return [ProjectRecord(str(p["project"]), p["state"], p.get("source"))
+                    for p in self.settings.get("projects", [])
+                    if p.get("state") in config.STATE_COLORS]
+        except (KeyError, TypeError, AttributeError):
+            return []
+
+    def _save_last_state(self, projects):
+        # Only marks the store dirty; it is written once the table settles
+        if projects == self._saved_state:
+            return
+        self._saved_state = projects
+        self.settings.set("projects", [p.as_dict() for p in projects])
+
+    def _bind_row(self, widget):
+        widget.bind("<ButtonPress-1>", self._on_drag_start)
+        widget.bind("<B1-Motion>", self._on_drag_motion)
+        widget.bind("<ButtonPress-3>", self._on_right_click)
 
     def _blink(self):
-        """Toggle blink state for WAITING/IDLE labels."""
+        """Toggle blink state for WAITING/IDLE rows (scheduler blink tick)."""
         self._blink_on = not self._blink_on
-        for label, color in self._blink_labels:
-            try:
-                label.configure(fg=color if self._blink_on else config.DIM_COLOR)
-            except tk.TclError:
-                pass  # widget destroyed
-        self.root.after(config.BLINK_INTERVAL_MS, self._blink)
-
-    def _update(self):
-        projects = read_projects()
-
-        # Clear existing widgets
-        for widget in self.frame.winfo_children():
-            widget.destroy()
-        self._blink_labels = []
-
-        if not projects:
-            label = tk.Label(
-                self.frame,
-                text="No active projects",
-                font=(config.FONT_FAMILY, config.FONT_SIZE),
-                fg=config.STATE_COLORS["STALE"],
-                bg=config.BG_COLOR,
-            )
-            label.pack(anchor=tk.W)
-            label.bind("<ButtonPress-1>", self._on_drag_start)
-            label.bind("<B1-Motion>", self._on_drag_motion)
-            label.bind("<ButtonPress-3>", self._on_right_click)
+        self.renderer.blink(self._blink_on)
+
+    def _is_hidden(self):
+        return self.root.state() in ("withdrawn", "iconic") or session_locked()
+
+    def _toggle_perf(self):
+        if self._perf_visible.get():
+            self._perf_footer.configure(text=self.perf.format_summary())
+            self._perf_footer.pack(fill=tk.X, padx=config.WINDOW_PADDING,
+                                   pady=(0, config.WINDOW_PADDING))
         else:
-            for proj in projects:
-                color = config.STATE_COLORS.get(proj["state"], config.STATE_COLORS["STALE"])
-                text = f'{config.DOT_CHAR} {proj["project"]} \u2014 {proj["state"]}'
-                label = tk.Label(
-                    self.frame,
-                    text=text,
-                    font=(config.FONT_FAMILY, config.FONT_SIZE),
-                    fg=color,
-                    bg=config.BG_COLOR,
-                    anchor=tk.W,
-                )
-                label.pack(fill=tk.X, anchor=tk.W)
-                label.bind("<ButtonPress-1>", self._on_drag_start)
-                label.bind("<B1-Motion>", self._on_drag_motion)
-                label.bind("<ButtonPress-3>", self._on_right_click)
-
-                # Register blinking labels
-                if proj["state"] in config.BLINK_STATES:
-                    self._blink_labels.append((label, color))
-
-        # Resize window to fit content
-        self.root.update_idletasks()
-        req_w = max(self.frame.winfo_reqwidth() + config.WINDOW_PADDING * 2,
-                    config.WINDOW_MIN_WIDTH)
-        req_h = self.frame.winfo_reqheight() + config.WINDOW_PADDING * 2
+            self._perf_footer.pack_forget()
+        self._resize()
+
+    def _resize(self):
+        width, height = self.renderer.content_size()
+        if self._perf_visible.get():
+            self._perf_footer.update_idletasks()
+            width = max(width, self._perf_footer.winfo_reqwidth())
+            height += self._perf_footer.winfo_reqheight() + config.WINDOW_PADDING
+        req_w = max(width + config.WINDOW_PADDING * 2, config.WINDOW_MIN_WIDTH)
+        req_h = height + config.WINDOW_PADDING * 2
         self.root.geometry(f"{req_w}x{req_h}")
 
-        # Save position periodically
-        self._save_position()
+    def _render(self, projects, notice=None):
+        self._shown = (projects, notice)
+        rows = self.view.rows(projects)
+        if not rows and notice is None:
+            notice = "No active projects"
+
+        t0 = time.perf_counter()
+        changed = self.renderer.render(rows, notice)
+        t1 = time.perf_counter()
+        self.perf.record("widgets", (t1 - t0) * 1000)
+
+        # Resize window only when the content box actually changes
+        if changed:
+            self._resize()
+            self.perf.record("geometry", (time.perf_counter() - t1) * 1000)
+
+        if self.renderer.blinking:
+            if self.scheduler is not None:
+                self.scheduler.wake()
+        elif not self._blink_on:
+            self._blink_on = True
+            self.renderer.blink(True)
+
+    def _poll(self, full):
+        """Scheduler poll tick; `full` asks the source for fresh data."""
+        if full:
+            self.source.refresh()
+        projects = self.source.read()
+        notice = self.source.notice()
+        if projects is None:
+            # First scan still in flight: keep showing the cached table
+            projects = self._last_state
+            notice = notice or config.STARTUP_NOTICE
+        else:
+            self._live = True
+        timings = self.source.take_timings()
+        if timings:
+            self.perf.record_many(timings)
+        self._render(projects, notice)
+        self.scheduler.observe(projects)
+        if self._live:
+            self._mark("first live data")
+            if self.history is not None:
+                self.history.observe(projects)
+            if self.tracer is not None:
+                self.root.update_idletasks()  # issue the redraw before timing it
+                self.tracer.observe(projects)
 
-        # Schedule next update
-        self.root.after(config.POLL_INTERVAL_MS, self._update)
+        if full:
+            self.perf.end_tick()
+            if self._perf_visible.get():
+                self._perf_footer.configure(text=self.perf.format_summary())
+            if self._live:
+                self._save_last_state(projects)
+            self.settings.maybe_flush()
+            if self.history is not None:
+                self.history.maybe_flush()
 
     def run(self):
         self.root.mainloop()
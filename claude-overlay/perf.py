@@ -0,0 +1,85 @@
+# Claude Status Overlay - Hot-path Instrumentation
+#
+# PerfRecorder keeps the last PERF_RING_SIZE timings per stage in ring
+# buffers (collections.deque). Stages recorded by the overlay:
+#   scan      - directory listing (worker thread)
+#   parse     - state/activity reads + staleness (worker thread)
+#   sort      - sorting the project list (worker thread)
+#   widgets   - renderer reconcile on the Tk thread
+#   geometry  - window resize pass
+#   lag       - Tk timer lag: actual after() fire time minus scheduled time
+#
+# summary() feeds the right-click "Perf stats" footer; if PERF_DUMP_FILE is
+# set, every tick is also appended there as one JSON line (buffered).
+
+import json
+import os
+import time
+from collections import deque
+
+import config
+
+STAGES = ("scan", "parse", "sort", "widgets", "geometry", "lag")
+
+
+def _percentile(ordered, pct):
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+class PerfRecorder:
+    def __init__(self, size=None, dump_file=None):
+        size = size or config.PERF_RING_SIZE
+        self._rings = {stage: deque(maxlen=size) for stage in STAGES}
+        self._tick = {}
+        self._dump_file = dump_file
+        self._dump_buf = []
+
+    def record(self, stage, ms):
+        """Append one sample (ms). deque.append is thread-safe."""
+        ring = self._rings.get(stage)
+        if ring is None:
+            ring = self._rings[stage] = deque(maxlen=config.PERF_RING_SIZE)
+        ring.append(ms)
+        self._tick[stage] = ms
+
+    def record_many(self, timings):
+        for stage, ms in timings.items():
+            self.record(stage, ms)
+
+    def end_tick(self):
+        """Close the current tick; queue it for the JSON-lines dump."""
+        if self._dump_file and self._tick:
+            self._dump_buf.append({"ts": round(time.time(), 3),
+                                   **{k: round(v, 3) for k, v in self._tick.items()}})
+            if len(self._dump_buf) >= config.PERF_DUMP_FLUSH_TICKS:
+                self.flush()
+        self._tick = {}
+
+    def flush(self):
+        if not self._dump_buf:
+            return
+        lines = "".join(json.dumps(r) + "\n" for r in self._dump_buf)
+        self._dump_buf = []
+        try:
+            os.makedirs(os.path.dirname(self._dump_file), exist_ok=True)
+            with open(self._dump_file, "a") as f:
+                f.write(lines)
+        except OSError:
+            pass
+
+    def summary(self):
+        """{stage: (p50, p99, max)} over the ring, for stages with samples."""
+        out = {}
+        for stage, ring in self._rings.items():
+            if ring:
+                ordered = sorted(ring)
+                out[stage] = (_percentile(ordered, 50), _percentile(ordered, 99),
+                              ordered[-1])
+        return out
+
+    def format_summary(self):
+        lines = [f"{'stage':<8}{'p50':>7}{'p99':>7}{'max':>7} ms"]
+        for stage, (p50, p99, peak) in self.summary().items():
+            lines.append(f"{stage:<8}{p50:>7.1f}{p99:>7.1f}{peak:>7.1f}")
+        return "\n".join(lines)
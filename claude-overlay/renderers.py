@@ -0,0 +1,267 @@
+# Claude Status Overlay - Renderers
+#
+# Two interchangeable render backends for StatusOverlay (config.RENDERER):
+#   "labels": one tk.Label per project, reconciled by project key
+#   "canvas": every row drawn on a single tk.Canvas; blinking only toggles
+#             the fill of each row's dot item (one Tcl call per row)
+#
+# Both take the visible rows from viewport.Viewport as [(key, state, text),
+# ...] plus an optional notice line, touch only rows whose state/text
+# changed, and report whether the content box (row count / widest text)
+# changed so the overlay can skip its geometry pass. key_at(event) maps a
+# click back to the row key (e.g. to expand a group).
+
+import tkinter as tk
+
+import config
+
+
+def row_text(text):
+    return f"{config.DOT_CHAR} {text}"
+
+
+def state_color(state):
+    return config.STATE_COLORS.get(state, config.STATE_COLORS["STALE"])
+
+
+class _Renderer:
+    def __init__(self, font):
+        self._font = font
+        self._row_order = None  # [(key, state, text), ...] last rendered
+        self._notice = None     # notice text last rendered
+        self._layout = None     # (row count, widest text px) last sized for
+        self._text_widths = {}  # text -> measured px
+        self._blink_on = True
+
+    def _measure(self, text):
+        width = self._text_widths.get(text)
+        if width is None:
+            width = self._text_widths[text] = self._font.measure(text)
+        return width
+
+    def _unchanged(self, rows, notice):
+        return rows == self._row_order and notice == self._notice
+
+    def _relayout(self, rows, notice):
+        """Record the new content box; True if it differs from the last one."""
+        self._row_order = rows
+        self._notice = notice
+        texts = [row_text(text) for _, _, text in rows]
+        if notice is not None:
+            texts.append(notice)
+        layout = (len(texts), max((self._measure(t) for t in texts), default=0))
+        if layout == self._layout:
+            return False
+        self._layout = layout
+        return True
+
+
+class LabelRenderer(_Renderer):
+    """One Label per visible row; rows keyed by row key."""
+
+    def __init__(self, parent, font, bind):
+        super().__init__(font)
+        self._bind = bind
+        self.widget = tk.Frame(parent, bg=config.BG_COLOR)
+        self._rows = {}            # key -> (label, state, text)
+        self._keys = {}            # label -> key (click lookup)
+        self._blink_labels = {}    # key -> (label, color) that need blinking
+        self._notice_label = None  # "No active projects" / source status row
+
+    @property
+    def blinking(self):
+        return bool(self._blink_labels)
+
+    def _make_label(self, text, color):
+        label = tk.Label(
+            self.widget,
+            text=text,
+            font=self._font,
+            fg=color,
+            bg=config.BG_COLOR,
+            anchor=tk.W,
+        )
+        self._bind(label)
+        return label
+
+    def render(self, rows, notice=None):
+        """Reconcile labels against rows; return True if the box changed."""
+        if self._unchanged(rows, notice):
+            return False
+
+        wanted_keys = {key for key, _, _ in rows}
+        for key in [k for k in self._rows if k not in wanted_keys]:
+            label, _, _ = self._rows.pop(key)
+            self._blink_labels.pop(key, None)
+            del self._keys[label]
+            label.destroy()
+
+        repack = (self._row_order is None
+                  or [k for k, _, _ in rows] != [k for k, _, _ in self._row_order]
+                  or (notice is None) != (self._notice is None))
+
+        for key, state, text in rows:
+            row = self._rows.get(key)
+            if row is not None and row[1] == state and row[2] == text:
+                continue
+
+            color = state_color(state)
+            blinking = state in config.BLINK_STATES
+            fg = config.DIM_COLOR if blinking and not self._blink_on else color
+
+            if row is None:
+                label = self._make_label(row_text(text), fg)
+                self._keys[label] = key
+                repack = True
+            else:
+                label = row[0]
+                label.configure(text=row_text(text), fg=fg)
+            self._rows[key] = (label, state, text)
+
+            if blinking:
+                self._blink_labels[key] = (label, color)
+            else:
+                self._blink_labels.pop(key, None)
+
+        if notice is not None:
+            if self._notice_label is None:
+                self._notice_label = self._make_label(
+                    notice, config.STATE_COLORS["STALE"])
+            elif notice != self._notice:
+                self._notice_label.configure(text=notice)
+
+        if repack:
+            if self._notice_label is not None:
+                self._notice_label.pack_forget()
+            for label, _, _ in self._rows.values():
+                label.pack_forget()
+            for key, _, _ in rows:
+                self._rows[key][0].pack(fill=tk.X, anchor=tk.W)
+            if notice is not None:
+                self._notice_label.pack(anchor=tk.W)
+
+        return self._relayout(rows, notice)
+
+    def content_size(self):
+        self.widget.update_idletasks()
+        return self.widget.winfo_reqwidth(), self.widget.winfo_reqheight()
+
+    def key_at(self, event):
+        return self._keys.get(event.widget)
+
+    def blink(self, on):
+        self._blink_on = on
+        for label, color in self._blink_labels.values():
+            try:
+                label.configure(fg=color if on else config.DIM_COLOR)
+            except tk.TclError:
+                pass  # widget destroyed
+
+
+class CanvasRenderer(_Renderer):
+    """All visible rows on one Canvas; each row is a dot item + a text item."""
+
+    def __init__(self, parent, font, bind):
+        super().__init__(font)
+        self.widget = tk.Canvas(parent, bg=config.BG_COLOR, highlightthickness=0,
+                                bd=0, width=1, height=1)
+        bind(self.widget)
+        self._rows = {}         # key -> [dot_id, text_id, state, slot, text]
+        self._blink_dots = {}   # key -> (dot_id, color) that need blinking
+        self._notice_id = None
+        self._text_x = self._measure(config.DOT_CHAR + " ")
+
+    @property
+    def blinking(self):
+        return bool(self._blink_dots)
+
+    @staticmethod
+    def _row_y(slot):
+        return slot * config.ROW_HEIGHT + config.ROW_HEIGHT // 2
+
+    def render(self, rows, notice=None):
+        """Diff rows into canvas items; return True if the box changed."""
+        if self._unchanged(rows, notice):
+            return False
+        canvas = self.widget
+
+        wanted_keys = {key for key, _, _ in rows}
+        for key in [k for k in self._rows if k not in wanted_keys]:
+            dot_id, text_id, _, _, _ = self._rows.pop(key)
+            self._blink_dots.pop(key, None)
+            canvas.delete(dot_id, text_id)
+
+        for slot, (key, state, text) in enumerate(rows):
+            y = self._row_y(slot)
+            row = self._rows.get(key)
+            if row is None:
+                dot_id = canvas.create_text(0, y, anchor=tk.W, font=self._font,
+                                            text=config.DOT_CHAR)
+                text_id = canvas.create_text(self._text_x, y, anchor=tk.W,
+                                             font=self._font)
+                row = self._rows[key] = [dot_id, text_id, None, slot, None]
+            elif row[3] != slot:
+                canvas.move(row[0], 0, y - self._row_y(row[3]))
+                canvas.move(row[1], 0, y - self._row_y(row[3]))
+                row[3] = slot
+
+            if row[2] == state and row[4] == text:
+                continue
+            row[2] = state
+            row[4] = text
+            color = state_color(state)
+            blinking = state in config.BLINK_STATES
+            canvas.itemconfigure(row[1], text=text, fill=color)
+            canvas.itemconfigure(
+                row[0],
+                fill=config.DIM_COLOR if blinking and not self._blink_on else color)
+            if blinking:
+                self._blink_dots[key] = (row[0], color)
+            else:
+                self._blink_dots.pop(key, None)
+
+        if notice is None:
+            if self._notice_id is not None:
+                canvas.delete(self._notice_id)
+                self._notice_id = None
+        else:
+            y = self._row_y(len(rows))
+            if self._notice_id is None:
+                self._notice_id = canvas.create_text(
+                    0, y, anchor=tk.W, font=self._font,
+                    fill=config.STATE_COLORS["STALE"])
+            canvas.itemconfigure(self._notice_id, text=notice)
+            canvas.coords(self._notice_id, 0, y)
+
+        changed = self._relayout(rows, notice)
+        if changed:
+            width, height = self.content_size()
+            canvas.configure(width=width, height=height)
+        return changed
+
+    def content_size(self):
+        count, widest = self._layout or (0, 0)
+        return widest, max(count, 1) * config.ROW_HEIGHT
+
+    def key_at(self, event):
+        if event.widget is not self.widget:
+            return None
+        slot = int(event.y // config.ROW_HEIGHT)
+        rows = self._row_order or []
+        return rows[slot][0] if 0 <= slot < len(rows) else None
+
+    def blink(self, on):
+        self._blink_on = on
+        canvas = self.widget
+        for dot_id, color in self._blink_dots.values():
+            canvas.itemconfigure(dot_id, fill=color if on else config.DIM_COLOR)
+
+
+RENDERERS = {
+    "labels": LabelRenderer,
+    "canvas": CanvasRenderer,
+}
+
+
+def make_renderer(parent, font, bind, name=None):
+    return RENDERERS.get(name or config.RENDERER, LabelRenderer)(parent, font, bind)
@@ -0,0 +1,179 @@
+# Claude Status Overlay - Background Scan Worker
+#
+# Keeps blocking filesystem scans off the Tk thread. When WSL is booting,
+# suspended or shut down, listing \\wsl$\Ubuntu\tmp can block for seconds;
+# BackgroundSource runs the scan on a daemon worker thread, gives every scan
+# a deadline, and always answers read() with the last good snapshot.
+#
+# Repeated failures (errors or missed deadlines) open a CircuitBreaker that
+# backs off exponentially instead of hammering the UNC path; meanwhile the
+# overlay shows a "source unavailable" notice row.
+
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import config
+
+
+class CircuitBreaker:
+    """Closed until `threshold` consecutive failures, then open for
+    base_ms * 2^(extra failures), capped at max_ms."""
+
+    def __init__(self, threshold, base_ms, max_ms):
+        self.threshold = threshold
+        self.base_ms = base_ms
+        self.max_ms = max_ms
+        self.failures = 0
+        self.open_until = 0.0
+
+    @property
+    def tripped(self):
+        return self.failures >= self.threshold
+
+    def allow(self, now):
+        return now >= self.open_until
+
+    def retry_in(self, now):
+        return max(0.0, self.open_until - now)
+
+    def record_success(self):
+        self.failures = 0
+        self.open_until = 0.0
+
+    def record_failure(self, now):
+        self.failures += 1
+        if self.tripped:
+            backoff_ms = min(self.base_ms * 2 ** (self.failures - self.threshold),
+                             self.max_ms)
+            self.open_until = now + backoff_ms / 1000
+
+
+class Worker:
+    """Daemon thread(s) executing submitted callables from one queue.
+
+    Daemon so that a scan stuck in the 9P bridge never blocks process
+    exit (ThreadPoolExecutor workers are joined at interpreter shutdown).
+    """
+
+    def __init__(self, name, threads=1):
+        self._jobs = queue.Queue()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"{name}-{n}", daemon=True)
+            for n in range(threads)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn):
+        future = Future()
+        self._jobs.put((fn, future))
+        return future
+
+    def shutdown(self):
+        for _ in self._threads:
+            self._jobs.put(None)
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            fn, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn())
+            except BaseException as exc:
+                future.set_exception(exc)
+
+
+class BackgroundSource:
+    """Non-blocking overlay source around a blocking scan function.
+
+    scan_fn must raise (OSError, ...) on failure rather than returning an
+    empty list, so the breaker can tell "no projects" from "no WSL".
+    `worker` shares a pool between sources (multi_source); the caller then
+    owns its shutdown.
+    """
+
+    def __init__(self, scan_fn, timeout_ms=None, timings_fn=None, worker=None):
+        self._scan_fn = scan_fn
+        self._timings_fn = timings_fn
+        self._timings = None
+        self._timeout = (timeout_ms or config.SCAN_TIMEOUT_MS) / 1000
+        self._owns_worker = worker is None
+        self._worker = worker or Worker("state-scan")
+        self._future = None
+        self._deadline = 0.0
+        self._timed_out = False
+        self._last_good = None  # nothing until the first scan completes
+        self.breaker = CircuitBreaker(config.SCAN_FAILURE_THRESHOLD,
+                                      config.SCAN_BACKOFF_BASE_MS,
+                                      config.SCAN_BACKOFF_MAX_MS)
+
+    @property
+    def unavailable(self):
+        return self.breaker.tripped
+
+    def notice(self):
+        """Text for the overlay's notice row, or None while healthy."""
+        if not self.unavailable:
+            return None
+        retry = self.breaker.retry_in(time.monotonic())
+        if retry > 0:
+            return f"Source unavailable (retry in {math.ceil(retry)}s)"
+        return "Source unavailable"
+
+    def refresh(self):
+        """Start a scan unless one is in flight or the breaker is open."""
+        now = time.monotonic()
+        if self._future is None and self.breaker.allow(now):
+            self._future = self._worker.submit(self._scan_fn)
+            self._deadline = now + self._timeout
+            self._timed_out = False
+
+    def read(self):
+        """Collect a finished scan (never waits); return the last good one,
+        or None before any scan has succeeded."""
+        future = self._future
+        if future is None:
+            return self._last_good
+
+        now = time.monotonic()
+        if future.done():
+            self._future = None
+            try:
+                self._last_good = future.result()
+                self.breaker.record_success()
+                if self._timings_fn is not None:
+                    self._timings = self._timings_fn()
+            except Exception:
+                if not self._timed_out:
+                    self.breaker.record_failure(now)
+        elif now > self._deadline:
+            # Can't kill a thread blocked in the UNC bridge: count every
+            # missed deadline and keep waiting on the same scan rather
+            # than queueing more behind it.
+            self._timed_out = True
+            self._deadline = now + self._timeout
+            self.breaker.record_failure(now)
+
+        return self._last_good
+
+    def take_timings(self):
+        """Stage timings of the scan collected since the last call, or None."""
+        timings, self._timings = self._timings, None
+        return timings
+
+    def pending_ms(self):
+        """Check back this soon while a scan is in flight, else None."""
+        if self._future is not None:
+            return config.SCAN_CHECK_MS
+        return None
+
+    def close(self):
+        if self._owns_worker:
+            self._worker.shutdown()
@@ -0,0 +1,156 @@
+# Claude Status Overlay - Adaptive Scheduler
+#
+# One root.after chain for both poll and blink ticks. The poll rate follows
+# what the projects are doing:
+#   active  - any project in POLL_ACTIVE_STATES        → POLL_ACTIVE_MS
+#   idle    - everything IDLE/COMPLETED/STALE           → POLL_BACKOFF_CURVE
+#   hidden  - window withdrawn/iconic or session locked → POLL_HIDDEN_MS
+# Blink ticks are merged into the same chain and only exist while a row is
+# blinking and the window is visible, so a static overlay wakes up rarely.
+
+import math
+import time
+
+import config
+
+
+def session_locked():
+    """True while the Windows session is locked (input desktop unavailable)."""
+    try:
+        import ctypes
+        user32 = ctypes.windll.user32
+    except (ImportError, AttributeError):
+        return False  # not Windows
+    desk = user32.OpenInputDesktop(0, False, 0x0100)  # DESKTOP_SWITCHDESKTOP
+    if not desk:
+        return True
+    user32.CloseDesktop(desk)
+    return False
+
+
+def backoff_ms(quiet_sec, curve=None):
+    """Poll interval after `quiet_sec` seconds with nothing active."""
+    interval = None
+    for after_sec, ms in curve or config.POLL_BACKOFF_CURVE:
+        if quiet_sec >= after_sec:
+            interval = ms
+    return interval if interval is not None else config.POLL_INTERVAL_MS
+
+
+class AdaptiveScheduler:
+    """Drives on_poll(full) and on_blink() from a single timer.
+
+    on_poll(True) is a real poll (refresh + read); on_poll(False) only
+    collects what the source has ready (pending_ms() asked to check back).
+    """
+
+    def __init__(self, root, on_poll, on_blink, blinking, pending_ms,
+                 is_hidden=None, perf=None):
+        self.root = root
+        self._on_poll = on_poll
+        self._on_blink = on_blink
+        self._blinking = blinking
+        self._pending_ms = pending_ms
+        self._is_hidden = is_hidden or (lambda: False)
+        self._perf = perf
+        self._job = None
+        self._due_at = None
+        self._next_poll = 0.0
+        self._next_blink = None
+        self._quiet_since = None
+        self.mode = "active"
+        self.poll_ms = config.POLL_ACTIVE_MS
+        self.wakeups = 0
+
+    def start(self):
+        self._arm(0)
+
+    def stop(self):
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+    def observe(self, projects):
+        """Feed the rendered project list; picks active vs idle backoff."""
+        now = time.monotonic()
+        if any(p.state in config.POLL_ACTIVE_STATES for p in projects):
+            if self._quiet_since is not None:
+                self._quiet_since = None
+                # Just became active: don't sit out a long idle interval
+                self._next_poll = min(self._next_poll,
+                                      now + config.POLL_ACTIVE_MS / 1000)
+        elif self._quiet_since is None:
+            self._quiet_since = now
+
+    def wake(self):
+        """Re-arm after external changes (e.g. a row started blinking)."""
+        if self._next_blink is None and self._blinking():
+            self._next_blink = time.monotonic() + config.BLINK_INTERVAL_MS / 1000
+        self._arm(self._delay(time.monotonic()))
+
+    def stats(self):
+        """Current rate for diagnostics."""
+        return {
+            "mode": self.mode,
+            "poll_ms": self.poll_ms,
+            "blinking": self._next_blink is not None,
+            "wakeups": self.wakeups,
+        }
+
+    # ── internals ──
+
+    def _interval_ms(self, now, hidden):
+        if hidden:
+            self.mode = "hidden"
+            return config.POLL_HIDDEN_MS
+        if self._quiet_since is None:
+            self.mode = "active"
+            return config.POLL_ACTIVE_MS
+        self.mode = "idle"
+        return backoff_ms(max(0.0, now - self._quiet_since))
+
+    def _delay(self, now):
+        due = self._next_poll
+        if self._next_blink is not None:
+            due = min(due, self._next_blink)
+        if self.mode != "hidden":
+            pending = self._pending_ms()
+            if pending is not None:
+                due = min(due, now + pending / 1000)
+        return max(0.0, due - now)
+
+    def _arm(self, delay):
+        due_at = time.monotonic() + delay
+        if self._job is not None:
+            if self._due_at is not None and self._due_at <= due_at:
+                return  # already waking up soon enough
+            self.root.after_cancel(self._job)
+        self._due_at = due_at
+        self._job = self.root.after(math.ceil(delay * 1000), self._tick)
+
+    def _tick(self):
+        now = time.monotonic()
+        if self._perf is not None and self._due_at is not None:
+            self._perf.record("lag", max(0.0, now - self._due_at) * 1000)
+        self._job = None
+        self._due_at = None
+        self.wakeups += 1
+        hidden = self._is_hidden()
+        # Anything due within the slack runs in this wake-up too
+        horizon = now + config.TIMER_COALESCE_MS / 1000
+
+        full = horizon >= self._next_poll
+        self._on_poll(full)
+        if full:
+            self.poll_ms = self._interval_ms(now, hidden)
+            self._next_poll = now + self.poll_ms / 1000
+
+        if hidden or not self._blinking():
+            self._next_blink = None
+        elif self._next_blink is None:
+            self._next_blink = now + config.BLINK_INTERVAL_MS / 1000
+        elif horizon >= self._next_blink:
+            self._on_blink()
+            self._next_blink = now + config.BLINK_INTERVAL_MS / 1000
+
+        self._arm(self._delay(now))
@@ -0,0 +1,107 @@
+# Claude Status Overlay - Settings Store
+#
+# One JSON file (SETTINGS_FILE) for the overlay's runtime state: window
+# position, the last rendered project list, the source picked from the
+# menu and the expanded state groups. Loaded once at startup; after that
+# it lives in memory.
+#
+# set() only marks the store dirty when a value really changes. A dirty
+# store is written once it has been quiet for SETTINGS_QUIET_SEC (or
+# SETTINGS_MAX_DELAY_SEC after the first unsaved change, whichever comes
+# first), or right away via flush() on drag end, a source switch and
+# close. Writes go to a temp file that replaces SETTINGS_FILE, so a crash
+# never leaves half a file behind. Nothing changes → nothing is written:
+# an idle overlay does no disk I/O at all.
+#
+# The first run without SETTINGS_FILE picks up the old position.json and
+# last_state.json (POSITION_FILE / LAST_STATE_FILE); they are only read.
+
+import json
+import os
+import time
+
+import config
+
+
+class SettingsStore:
+    def __init__(self, path=None, clock=time.monotonic):
+        self.path = path or config.SETTINGS_FILE
+        self.clock = clock
+        self._data = {}
+        self._first_change = None  # clock() of the oldest unsaved change
+        self._last_change = None
+        self.writes = 0
+
+    @property
+    def dirty(self):
+        return self._first_change is not None
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self._data = data
+        except FileNotFoundError:
+            self._data = _migrate()
+        except (OSError, ValueError):
+            self._data = {}
+        return self
+
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    def set(self, key, value):
+        if self._data.get(key) == value:
+            return
+        self._data[key] = value
+        now = self.clock()
+        if self._first_change is None:
+            self._first_change = now
+        self._last_change = now
+
+    def flush_due(self):
+        if not self.dirty:
+            return False
+        now = self.clock()
+        return (now - self._last_change >= config.SETTINGS_QUIET_SEC
+                or now - self._first_change >= config.SETTINGS_MAX_DELAY_SEC)
+
+    def maybe_flush(self):
+        """Write if the quiet period (or max delay) has passed."""
+        if self.flush_due():
+            self.flush()
+
+    def flush(self):
+        """Write now if anything changed; atomic temp file + rename."""
+        if not self.dirty:
+            return
+        tmp = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except OSError:
+            return  # keep dirty; the next flush retries
+        self.writes += 1
+        self._first_change = self._last_change = None
+
+
+def _migrate():
+    """Settings from the pre-SETTINGS_FILE position/last-state files."""
+    data = {}
+    try:
+        with open(config.POSITION_FILE, "r") as f:
+            pos = json.load(f)
+        data["position"] = [int(pos["x"]), int(pos["y"])]
+    except (OSError, KeyError, TypeError, ValueError):
+        pass
+    try:
+        with open(config.LAST_STATE_FILE, "r") as f:
+            projects = json.load(f)["projects"]
+        if isinstance(projects, list):
+            data["projects"] = projects
+    except (OSError, KeyError, TypeError, ValueError):
+        pass
+    return data
@@ -0,0 +1,106 @@
+# Claude Status Overlay - Sidecar Snapshot Reader
+#
+# The Stream Deck sidecar already keeps one consolidated snapshot in
+# %LOCALAPPDATA%\claude-monitor\state.json (contract: streamdeck-plugin/
+# sidecar/sidecar.mjs, version 1):
+#   {version, updatedAt, rebuildId, projects: {project: state}, ...}
+# Reading that single local file replaces the 1 + 2N UNC opens per tick.
+#
+# Work is skipped when the file's (mtime_ns, size) is unchanged, and the
+# project list is only rebuilt when rebuildId or the projects map change
+# (a 30 s heartbeat only bumps updatedAt). Like streamdeck-plugin/src/
+# state-reader.ts, a snapshot whose updatedAt is older than
+# SNAPSHOT_STALE_SEC means the sidecar is dead or hung; then, and when the
+# file is missing, scan() falls back to the UNC scan (state_reader).
+
+import json
+import os
+import time
+from datetime import datetime
+
+import config
+from state_reader import (ProjectRecord, normalize_state, read_timings,
+                          scan_projects, sort_projects)
+
+
+def _parse_updated_at(value):
+    """ISO-8601 (JS toISOString, trailing Z) -> epoch seconds, or None."""
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except (AttributeError, ValueError):
+        return None
+
+
+class SnapshotReader:
+    """Blocking scan function for BackgroundSource (config.SOURCE="snapshot")."""
+
+    def __init__(self, path=None, fallback=scan_projects):
+        self.path = path or config.SNAPSHOT_FILE
+        self._fallback = fallback
+        self._key = None          # (mtime_ns, size) of the last read
+        self._loaded = None       # last parsed snapshot
+        self._snap = None         # last snapshot turned into records
+        self._records = []
+        self.active = "snapshot"  # or "scan" while falling back
+        self.timings = {}
+
+    def scan(self):
+        t0 = time.perf_counter()
+        snap = self._load()
+        t1 = time.perf_counter()
+
+        if snap is None or self._is_stale(snap):
+            self.active = "scan"
+            records = self._fallback()
+            self.timings = read_timings()
+            return records
+
+        if self.active != "snapshot" or snap is not self._snap:
+            prev = self._snap
+            self._snap = snap
+            if (self.active != "snapshot" or prev is None
+                    or snap.get("rebuildId") != prev.get("rebuildId")
+                    or snap.get("projects") != prev.get("projects")):
+                self._records = sort_projects([
+                    ProjectRecord(project, normalize_state(str(state)))
+                    for project, state in (snap.get("projects") or {}).items()
+                ])
+        self.active = "snapshot"
+        t2 = time.perf_counter()
+        self.timings = {"scan": (t1 - t0) * 1000, "parse": (t2 - t1) * 1000}
+        return self._records
+
+    def read_timings(self):
+        return dict(self.timings)
+
+    def _load(self):
+        """Return the current snapshot dict (cached while the stat is
+        unchanged), or None if missing/unreadable/unsupported."""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self._key = self._loaded = None
+            return None
+        key = (st.st_mtime_ns, st.st_size)
+        if key == self._key:
+            return self._loaded
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                snap = json.load(f)
+        except (OSError, ValueError):
+            return self._loaded  # caught mid-write: keep the previous one
+        self._key = key
+        if not isinstance(snap, dict) or snap.get("version") != 1:
+            self._loaded = None
+            return None
+        snap["_mtime"] = st.st_mtime
+        self._loaded = snap
+        return snap
+
+    @staticmethod
+    def _is_stale(snap):
+        updated = _parse_updated_at(snap.get("updatedAt"))
+        if updated is None:
+            updated = snap["_mtime"]
+        return time.time() - updated > config.SNAPSHOT_STALE_SEC
@@ -0,0 +1,79 @@
+# Claude Status Overlay - Sources
+#
+# Pluggable project-state sources for the overlay. A source has:
+#   refresh()    -> ask for fresh data (e.g. start a background scan)
+#   read()       -> [ProjectRecord, ...] sorted like read_projects();
+#                   never blocks, returns the latest known snapshot, or
+#                   None while nothing has been read yet
+#   pending_ms() -> check back within this many ms (work in flight / pushed
+#                   updates to drain), or None; the scheduler owns the pace
+#   notice()     -> text for a status row (e.g. source unavailable) or None
+#   take_timings() -> {stage: ms} of the last completed scan, or None
+#   close()      -> release threads / sockets
+#
+# config.SOURCE picks one:
+#   "file"     - poll \\wsl$ via state_reader
+#   "snapshot" - the sidecar's local state.json, UNC scan as fallback
+#   "mqtt"     - subscribe to claude/led/+, file polling as fallback
+#   "watch"    - inotify on WATCH_TMP_DIR (Linux side), polling as fallback
+#   "multi"    - every entry of config.SOURCES, scanned concurrently
+#   "table"    - the status table (status_table.py): mapped on the Linux
+#                side, one header read per tick over \\wsl$
+# File scans always run on scan_worker's background thread, never on the
+# Tk thread.
+
+import config
+from scan_worker import BackgroundSource
+from state_reader import StateScanner, read_timings, scan_projects
+
+
+def make_file_source():
+    return BackgroundSource(scan_projects, timings_fn=read_timings)
+
+
+def make_watch_source():
+    """inotify-driven source; plain polling where inotify is unavailable."""
+    from state_watcher import StateWatcher, WatchSource
+    scanner = StateScanner(config.WATCH_TMP_DIR)
+    fallback = BackgroundSource(lambda: scanner.scan(strict=True),
+                                timings_fn=lambda: dict(scanner.timings))
+    watcher = StateWatcher(config.WATCH_TMP_DIR)
+    try:
+        watcher.start()
+    except OSError:
+        return fallback
+    return WatchSource(watcher, fallback)
+
+
+def make_table_source():
+    """Mapped status table read on the Tk thread (a memory compare while
+    nothing changed); where it cannot be mapped, the header reads go to the
+    background worker. State files remain the fallback."""
+    from status_table import StatusTableReader, TableSource
+    reader = StatusTableReader()
+    if reader.use_mmap:
+        return TableSource(reader, make_file_source())
+    return BackgroundSource(lambda: reader.scan(strict=True),
+                            timings_fn=lambda: dict(reader.timings))
+
+
+def make_source(name=None):
+    name = name or config.SOURCE
+    if name == "snapshot":
+        from snapshot_reader import SnapshotReader
+        reader = SnapshotReader()
+        return BackgroundSource(reader.scan, timings_fn=reader.read_timings)
+    if name == "watch":
+        return make_watch_source()
+    if name == "table":
+        return make_table_source()
+    if name == "multi":
+        from multi_source import MultiSource
+        return MultiSource(config.SOURCES)
+    if name == "mqtt":
+        from mqtt_source import MqttSource
+        source = MqttSource(config.MQTT_HOST, config.MQTT_PORT,
+                            fallback=make_file_source())
+        source.start()
+        return source
+    return make_file_source()
@@ -0,0 +1,89 @@
+# Claude Status Overlay - Startup Timing
+#
+# `main.py --timing` prints how long each startup phase took:
+#   interpreter     - process creation until main.py starts running
+#   imports         - overlay modules (tkinter, renderers, ...)
+#   tk init         - tk.Tk() and the window setup
+#   first paint     - window mapped with the cached last-known table
+#   first live data - the source's first real scan/message shown
+# Kept dependency-free (time, sys) so importing it costs nothing.
+
+import sys
+import time
+
+
+def process_age_ms():
+    """ms since the OS created this process, or None if unknown."""
+    try:
+        if sys.platform == "win32":
+            return _process_age_windows()
+        return _process_age_linux()
+    except (OSError, ValueError, AttributeError, IndexError):
+        return None
+
+
+def _process_age_windows():
+    import ctypes
+    from ctypes import wintypes
+
+    kernel32 = ctypes.windll.kernel32
+    created, exited, kernel, user = (wintypes.FILETIME() for _ in range(4))
+    if not kernel32.GetProcessTimes(kernel32.GetCurrentProcess(),
+                                    ctypes.byref(created), ctypes.byref(exited),
+                                    ctypes.byref(kernel), ctypes.byref(user)):
+        return None
+    now = wintypes.FILETIME()
+    kernel32.GetSystemTimePreciseAsFileTime(ctypes.byref(now))
+
+    def ticks(ft):  # 100 ns units since 1601
+        return (ft.dwHighDateTime << 32) | ft.dwLowDateTime
+
+    return (ticks(now) - ticks(created)) / 10_000
+
+
+def _process_age_linux():
+    import os
+
+    with open("/proc/self/stat") as f:
+        # Field 22 (starttime), counted after the ")" that ends comm
+        start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+    with open("/proc/uptime") as f:
+        uptime = float(f.read().split()[0])
+    return (uptime - start_ticks / os.sysconf("SC_CLK_TCK")) * 1000
+
+
+class StartupTimer:
+    """Collects named marks; report() once the last phase is marked."""
+
+    PHASES = ("imports", "tk init", "first paint", "first live data")
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._t0 = time.perf_counter()
+        self._interpreter_ms = process_age_ms() if enabled else None
+        self._marks = {}
+
+    def mark(self, phase):
+        if not self.enabled or phase in self._marks:
+            return
+        self._marks[phase] = (time.perf_counter() - self._t0) * 1000
+        if phase == self.PHASES[-1]:
+            self.report()
+
+    def format_report(self):
+        base = self._interpreter_ms or 0.0
+        lines = ["startup           total ms  phase ms"]
+        if self._interpreter_ms is not None:
+            lines.append(f"{'interpreter':<16}{base:>10.1f}{base:>10.1f}")
+        prev = 0.0
+        for phase in self.PHASES:
+            if phase in self._marks:
+                at = self._marks[phase]
+                lines.append(f"{phase:<16}{base + at:>10.1f}{at - prev:>10.1f}")
+                prev = at
+        return "\n".join(lines)
+
+    def report(self):
+        # pythonw has no console; run `python main.py --timing` to see this
+        if sys.stdout is not None:
+            print(self.format_report(), flush=True)
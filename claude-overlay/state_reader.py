@@ -1,65 +1,311 @@
 # Claude Status Overlay - State Reader
 #
 # Scans \\wsl$\Ubuntu\tmp\claude-led-state-* and returns per-project status.
+#
+# Every open() over the 9P/UNC bridge costs milliseconds, so StateScanner
+# keeps a per-file cache keyed on (mtime_ns, size) and only re-reads a file
+# when its stat changes. One os.scandir pass per tick yields both the file
+# list and the stats (on Windows the stat comes free with the listing).
+# "RUNNING" and "WAITING" are the same size, and 9P timestamps can be
+# coarse, so a file read within STAT_RACY_NS of its mtime is not trusted
+# from cache: it is re-read until it is old enough that a later write must
+# move the mtime (git's "racy clean" rule).
+#
+# `python -m state_reader serve` shares one scan with many consumers
+# (status_server.py); `python -m state_reader hookd` is the resident
+# writer side, claude-hook.sh's state machine without the forks
+# (hook_daemon.py). `python -m state_reader table ...` manages the binary
+# status table that SOURCE = "table" reads instead of these files
+# (status_table.py).
 
-import glob
 import os
+import sys
 import time
 
 import config
 
 
-def read_projects():
-    """Return list of dicts: [{project, state, stale}, ...]
-    sorted by STATE_SORT_ORDER then project name."""
-    pattern = os.path.join(config.WSL_TMP_DIR, config.STATE_FILE_PREFIX + "*")
-    results = []
+class ProjectRecord:
+    """Live state of one project, tagged with its source name when the
+    overlay merges several sources (multi_source.py).
+
+    __slots__ keeps it to three references with no per-instance dict.
+    Records are never mutated: StateScanner hands out the same object for
+    as long as a project's state is unchanged, so a quiet tick allocates
+    nothing and list comparisons short-circuit on identity.
+    """
+
+    __slots__ = ("project", "state", "source")
+
+    def __init__(self, project, state, source=None):
+        self.project = project
+        self.state = state
+        self.source = source
+
+    @property
+    def label(self):
+        """Row name: "source/project" when tagged, else the project."""
+        if self.source is None:
+            return self.project
+        return f"{self.source}/{self.project}"
+
+    def __eq__(self, other):
+        if not isinstance(other, ProjectRecord):
+            return NotImplemented
+        return (self.project == other.project and self.state == other.state
+                and self.source == other.source)
+
+    def __hash__(self):
+        return hash((self.project, self.state, self.source))
+
+    def __repr__(self):
+        if self.source is None:
+            return f"ProjectRecord({self.project!r}, {self.state!r})"
+        return f"ProjectRecord({self.project!r}, {self.state!r}, {self.source!r})"
+
+    def as_dict(self):
+        """{project, state[, source]} for JSON (status_server, SETTINGS_FILE)."""
+        if self.source is None:
+            return {"project": self.project, "state": self.state}
+        return {"project": self.project, "state": self.state, "source": self.source}
+
+
+class StateScanner:
+    """Persistent scanner behind read_projects().
+
+    `stats` holds the counters of the last tick:
+      opened  - files actually opened and read
+      skipped - files whose cached content was reused (stat unchanged)
+    """
+
+    def __init__(self, tmp_dir=None, source=None):
+        self._tmp_dir = tmp_dir
+        self._source = source  # tag for the records (multi-source mode)
+        self._states = {}    # project -> ((mtime_ns, size), state, trusted)
+        self._activity = {}  # project -> ((mtime_ns, size), last_activity, trusted)
+        self._records = {}   # project -> ProjectRecord last handed out
+        self.stats = {"opened": 0, "skipped": 0}
+        self.timings = {}  # last tick: {scan, parse, sort} in ms
 
-    try:
-        files = glob.glob(pattern)
-    except OSError:
+    @property
+    def tmp_dir(self):
+        # Resolved per tick so callers (benchmarks) can repoint config.
+        return self._tmp_dir or config.WSL_TMP_DIR
+
+    def scan(self, strict=False):
+        """Return [ProjectRecord, ...] sorted by STATE_SORT_ORDER then
+        project name.
+
+        An unreachable tmp dir yields [] unless strict, which re-raises the
+        OSError (scan_worker needs to tell "no projects" from "no WSL").
+        """
+        tmp_dir = self.tmp_dir
+        self.stats = {"opened": 0, "skipped": 0}
+        t0 = time.perf_counter()
+        state_entries = {}
+        activity_entries = {}
+
+        state_prefix = config.STATE_FILE_PREFIX
+        activity_prefix = config.ACTIVITY_FILE_PREFIX
+        try:
+            with os.scandir(tmp_dir) as it:
+                for entry in it:
+                    name = entry.name
+                    if name.startswith(state_prefix):
+                        project = name[len(state_prefix):]
+                        if project:
+                            state_entries[project] = entry
+                    elif name.startswith(activity_prefix):
+                        project = name[len(activity_prefix):]
+                        if project:
+                            activity_entries[project] = entry
+        except OSError:
+            if strict:
+                raise
+            return []
+
+        t1 = time.perf_counter()
+        now = time.time()
+        results = []
+
+        for project, entry in state_entries.items():
+            state = self._read_state(project, entry)
+            if state is None:
+                continue
+
+            last_activity = self._read_activity(project, activity_entries.get(project))
+            stale = (last_activity is None
+                     or now - last_activity > config.STALE_TIMEOUT_SEC)
+
+            if stale and state not in ("COMPLETED", "IDLE"):
+                state = "STALE"
+
+            record = self._records.get(project)
+            if record is None or record.state != state:
+                record = self._records[project] = ProjectRecord(project, state,
+                                                                self._source)
+            results.append(record)
+
+        # Forget projects whose files are gone
+        for cache, live in ((self._states, state_entries),
+                            (self._activity, activity_entries),
+                            (self._records, state_entries)):
+            for project in [p for p in cache if p not in live]:
+                del cache[project]
+
+        t2 = time.perf_counter()
+        sort_projects(results)
+        t3 = time.perf_counter()
+        self.timings = {"scan": (t1 - t0) * 1000, "parse": (t2 - t1) * 1000,
+                        "sort": (t3 - t2) * 1000}
         return results
 
-    now = time.time()
+    def _read_state(self, project, entry):
+        try:
+            st = entry.stat()
+        except OSError:
+            return None
+        key = (st.st_mtime_ns, st.st_size)
+
+        cached = self._states.get(project)
+        if cached is not None and cached[0] == key and cached[2]:
+            self.stats["skipped"] += 1
+            return cached[1]
+
+        read_ns = time.time_ns()  # before the read: later writes land after it
+        try:
+            state = read_state_file(entry.path)
+        except OSError:
+            self._states.pop(project, None)
+            return None
+        self.stats["opened"] += 1
 
-    for path in files:
-        filename = os.path.basename(path)
-        project = filename[len(config.STATE_FILE_PREFIX):]
-        if not project:
-            continue
+        self._states[project] = (key, state, _trusted(st, read_ns))
+        return state
 
-        # Read state
+    def _read_activity(self, project, entry):
+        """Return last activity epoch, or None if unknown (→ stale)."""
+        if entry is None:
+            self._activity.pop(project, None)
+            return None
         try:
-            with open(path, "r") as f:
-                state = f.read().strip().split("\n")[0].upper()
+            st = entry.stat()
         except OSError:
-            continue
+            return None
 
-        if state not in config.STATE_COLORS:
-            state = "IDLE"
+        # The hook writes `date +%s` into the file, so its mtime carries the
+        # same timestamp and no open is needed.
+        if config.ACTIVITY_FROM_MTIME:
+            self.stats["skipped"] += 1
+            return st.st_mtime
 
-        # Check staleness via activity file
-        activity_path = os.path.join(
-            config.WSL_TMP_DIR,
-            config.ACTIVITY_FILE_PREFIX + project,
-        )
-        stale = False
+        key = (st.st_mtime_ns, st.st_size)
+        cached = self._activity.get(project)
+        if cached is not None and cached[0] == key and cached[2]:
+            self.stats["skipped"] += 1
+            return cached[1]
+
+        read_ns = time.time_ns()
         try:
-            with open(activity_path, "r") as f:
-                last_activity = int(f.read().strip())
-            if now - last_activity > config.STALE_TIMEOUT_SEC:
-                stale = True
+            last_activity = read_activity_file(entry.path)
         except (OSError, ValueError):
-            stale = True
+            self._activity.pop(project, None)
+            return None
+        self.stats["opened"] += 1
+
+        self._activity[project] = (key, last_activity, _trusted(st, read_ns))
+        return last_activity
+
 
-        if stale and state not in ("COMPLETED", "IDLE"):
-            state = "STALE"
+def _trusted(st, read_ns):
+    """True once the file's mtime is more than STAT_RACY_NS before the
+    read, so any later write gets a different (mtime_ns, size) key. A
+    write in the same coarse timestamp (or an mtime ahead of our clock)
+    would otherwise leave a same-size change unseen forever."""
+    return read_ns - st.st_mtime_ns > config.STAT_RACY_NS
 
-        results.append({"project": project, "state": state})
 
+def read_state_file(path):
+    """First line of a claude-led-state-* file, normalized. Raises OSError."""
+    with open(path, "r") as f:
+        return normalize_state(f.read().strip().split("\n")[0])
+
+
+def read_activity_file(path):
+    """Epoch written by `date +%s`. Raises OSError / ValueError."""
+    with open(path, "r") as f:
+        return int(f.read().strip())
+
+
+def normalize_state(state):
+    """Upper-case a raw state; anything unknown is shown as IDLE."""
+    state = state.upper()
+    return state if state in config.STATE_COLORS else "IDLE"
+
+
+def sort_projects(results):
+    """Sort records in place by STATE_SORT_ORDER then project name."""
     results.sort(key=lambda r: (
-        config.STATE_SORT_ORDER.get(r["state"], 99),
-        r["project"],
+        config.STATE_SORT_ORDER.get(r.state, 99),
+        r.project,
+        r.source or "",
     ))
-
     return results
+
+
+_scanner = StateScanner()
+
+
+def read_projects(sources=None):
+    """Return [ProjectRecord, ...] sorted by STATE_SORT_ORDER then
+    project name.
+
+    `sources` (a list like config.SOURCES) scans those named sources
+    concurrently instead of WSL_TMP_DIR; records are tagged by source.
+    """
+    if sources is not None:
+        from multi_source import scan_sources
+        return scan_sources(sources)
+    return _scanner.scan()
+
+
+def scan_projects():
+    """read_projects() that raises OSError when the tmp dir is unreachable."""
+    return _scanner.scan(strict=True)
+
+
+def read_stats():
+    """Per-tick {opened, skipped} counters of the last read_projects()."""
+    return dict(_scanner.stats)
+
+
+def read_timings():
+    """{scan, parse, sort} ms of the last read_projects()."""
+    return dict(_scanner.timings)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        # python -m state_reader serve [--stdout] [--port N]
+        from status_server import main
+        sys.exit(main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "hookd":
+        # python -m state_reader hookd [--socket PATH] [--no-tmux] [--no-table]
+        from hook_daemon import main
+        sys.exit(main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "table":
+        # python -m state_reader table {set,touch,rm,dump,import-legacy} ...
+        from status_table import main
+        sys.exit(main(sys.argv[2:]))
+
+    # Quick check: python state_reader.py [ticks]
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    for n in range(ticks):
+        t0 = time.perf_counter()
+        projects = read_projects()
+        ms = (time.perf_counter() - t0) * 1000
+        s = read_stats()
+        print(f"tick {n}: {len(projects)} projects, opened={s['opened']} "
+              f"skipped={s['skipped']} ({ms:.1f} ms)")
+        if n + 1 < ticks:
+            time.sleep(config.POLL_INTERVAL_MS / 1000)
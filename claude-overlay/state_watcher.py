@@ -0,0 +1,414 @@
+# Claude Status Overlay - inotify State Watcher
+#
+# Event-driven alternative to polling the tmp dir, for consumers running on
+# the Linux/WSL side. One inotify watch on WATCH_TMP_DIR (IN_CLOSE_WRITE,
+# IN_MOVED_TO, IN_MOVED_FROM, IN_DELETE) keeps an in-memory project table:
+#   - only files named STATE_FILE_PREFIX* / ACTIVITY_FILE_PREFIX* are read
+#   - events are coalesced into bursts (WATCH_COALESCE_MS of quiet, at most
+#     WATCH_COALESCE_MAX_MS), so the writes of one claude-hook.sh run give
+#     one update
+#   - staleness comes from a TimerWheel keyed on each project's last
+#     activity + STALE_TIMEOUT_SEC, not from rescanning
+# An inotify queue overflow triggers one full rescan.
+#
+# inotify is reached through ctypes (libc); StateWatcher.start() raises
+# OSError where it is unavailable (Windows / \\wsl$), and sources.py then
+# falls back to polling.
+#
+# Manual check:  python state_watcher.py [tmp_dir]
+
+import ctypes
+import ctypes.util
+import errno
+import math
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+import config
+from state_reader import (ProjectRecord, read_activity_file, read_state_file,
+                          sort_projects)
+
+IN_MODIFY = 0x00000002
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_CLOSE_WRITE = 0x00000008
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len (struct inotify_event)
+
+
+class Inotify:
+    """Minimal non-blocking inotify fd (Linux only)."""
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify is Linux-only")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6",
+                           use_errno=True)
+        try:
+            self._add_watch = libc.inotify_add_watch
+            init = libc.inotify_init1
+        except AttributeError:
+            raise OSError(errno.ENOSYS, "libc has no inotify") from None
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = init(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+    def add_watch(self, path, mask):
+        wd = self._add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def read_events(self):
+        """Drain pending events: [(mask, name), ...]."""
+        events = []
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(buf):
+                _wd, mask, _cookie, length = _EVENT.unpack_from(buf, offset)
+                offset += _EVENT.size
+                name = buf[offset:offset + length].rstrip(b"\0")
+                offset += length
+                events.append((mask, os.fsdecode(name)))
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class TimerWheel:
+    """Hashed timing wheel: O(1) schedule/cancel, advance(now) returns the
+    keys whose deadline has passed. Deadlines further out than one turn
+    simply stay in their slot until a later pass reaches them."""
+
+    def __init__(self, tick_sec, slots=64):
+        self.tick = tick_sec
+        self._slots = [{} for _ in range(slots)]  # key -> deadline
+        self._where = {}                          # key -> slot index
+        self._cursor = None                       # last tick number processed
+
+    def __len__(self):
+        return len(self._where)
+
+    def schedule(self, key, deadline):
+        self.cancel(key)
+        n = math.ceil(deadline / self.tick)
+        if self._cursor is not None and n <= self._cursor:
+            n = self._cursor + 1  # already due: next advance() picks it up
+        index = n % len(self._slots)
+        self._slots[index][key] = deadline
+        self._where[key] = index
+
+    def cancel(self, key):
+        index = self._where.pop(key, None)
+        if index is not None:
+            del self._slots[index][key]
+
+    def advance(self, now):
+        current = math.floor(now / self.tick)
+        if self._cursor is None:
+            # First pass covers a whole turn: keys scheduled before it may
+            # sit in slots whose tick has already gone by
+            self._cursor = current - len(self._slots)
+        steps = min(current - self._cursor, len(self._slots))
+        expired = []
+        if self._where:
+            for n in range(self._cursor + 1, self._cursor + 1 + steps):
+                slot = self._slots[n % len(self._slots)]
+                for key, deadline in list(slot.items()):
+                    if deadline <= now:
+                        del slot[key]
+                        del self._where[key]
+                        expired.append(key)
+        self._cursor = max(self._cursor, current)
+        return expired
+
+    def next_tick_in(self, now):
+        """Seconds until the next slot boundary, or None if empty."""
+        if not self._where:
+            return None
+        return self.tick - (now % self.tick)
+
+
+class StateWatcher:
+    """Project table kept current by inotify events on a background thread.
+
+    snapshot() returns the latest sorted [ProjectRecord, ...] (the same
+    list object until something changes); wait_for(version) blocks until
+    `version` moves past the given one, for non-Tk consumers.
+    """
+
+    def __init__(self, tmp_dir=None):
+        self.tmp_dir = tmp_dir or config.WATCH_TMP_DIR
+        self._inotify = None
+        self._thread = None
+        self._wake_r = self._wake_w = None
+        self._stopping = False
+        self._cond = threading.Condition()
+        self._wheel = TimerWheel(config.WATCH_WHEEL_TICK_MS / 1000)
+        self._states = {}    # project -> raw state
+        self._activity = {}  # project -> last activity epoch
+        self._stale = set()  # projects whose activity deadline has passed
+        self._records = []
+        self._timings = None
+        self.version = 0
+        self.failed = False  # watch lost (dir removed): consumers should poll
+        self.stats = {"events": 0, "bursts": 0, "rescans": 0}
+
+    @property
+    def alive(self):
+        return self._thread is not None and not self.failed
+
+    def start(self):
+        """Watch tmp_dir and load the current table. Raises OSError when
+        inotify or the directory is unavailable."""
+        inotify = Inotify()
+        try:
+            inotify.add_watch(self.tmp_dir, WATCH_MASK)
+        except OSError:
+            inotify.close()
+            raise
+        self._inotify = inotify
+        # Watch first, then list: nothing written in between is missed
+        self._flush(self._list_names())
+        self._wake_r, self._wake_w = os.pipe()
+        self._thread = threading.Thread(target=self._run, name="state-watcher",
+                                        daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._stopping = True
+        if self._wake_w is not None:
+            os.write(self._wake_w, b"\0")
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+        for fd in (self._wake_r, self._wake_w):
+            if fd is not None:
+                os.close(fd)
+        self._wake_r = self._wake_w = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def snapshot(self):
+        with self._cond:
+            return self._records
+
+    def take_timings(self):
+        """{parse, sort} ms of the last applied burst, once; else None."""
+        with self._cond:
+            timings, self._timings = self._timings, None
+            return timings
+
+    def wait_for(self, version, timeout=None):
+        """Block until self.version != version (or timeout); return it."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.version != version or self.failed,
+                                timeout)
+            return self.version
+
+    # ── watcher thread ──
+
+    def _run(self):
+        fd = self._inotify.fd
+        dirty = set()
+        burst_start = last_event = None
+        while not self._stopping:
+            timeout = self._wheel.next_tick_in(time.time())
+            if dirty:
+                now = time.monotonic()
+                flush_at = min(last_event + config.WATCH_COALESCE_MS / 1000,
+                               burst_start + config.WATCH_COALESCE_MAX_MS / 1000)
+                wait = max(0.0, flush_at - now)
+                timeout = wait if timeout is None else min(timeout, wait)
+
+            ready, _, _ = select.select([fd, self._wake_r], [], [], timeout)
+            if self._stopping:
+                return
+
+            if fd in ready:
+                events = self._inotify.read_events()
+                self.stats["events"] += len(events)
+                for mask, name in events:
+                    if mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                        with self._cond:
+                            self.failed = True
+                            self._cond.notify_all()
+                        return
+                    if mask & IN_Q_OVERFLOW:
+                        self.stats["rescans"] += 1
+                        dirty |= self._list_names() | self._known_names()
+                    elif self._wanted(name):
+                        dirty.add(name)
+                if dirty:
+                    last_event = time.monotonic()
+                    if burst_start is None:
+                        burst_start = last_event
+
+            if dirty:
+                now = time.monotonic()
+                if (now - last_event >= config.WATCH_COALESCE_MS / 1000
+                        or now - burst_start >= config.WATCH_COALESCE_MAX_MS / 1000):
+                    self.stats["bursts"] += 1
+                    self._flush(dirty)
+                    dirty = set()
+                    burst_start = last_event = None
+                    continue
+
+            if self._wheel.next_tick_in(time.time()) is not None:
+                expired = self._wheel.advance(time.time())
+                if expired:
+                    self._stale.update(expired)
+                    self._publish(0.0)
+
+    def _wanted(self, name):
+        return (name.startswith(config.STATE_FILE_PREFIX)
+                or name.startswith(config.ACTIVITY_FILE_PREFIX))
+
+    def _list_names(self):
+        with os.scandir(self.tmp_dir) as it:
+            return {entry.name for entry in it if self._wanted(entry.name)}
+
+    def _known_names(self):
+        return ({config.STATE_FILE_PREFIX + p for p in self._states}
+                | {config.ACTIVITY_FILE_PREFIX + p for p in self._activity})
+
+    def _flush(self, names):
+        """Re-read the files named in one burst and publish the table."""
+        t0 = time.perf_counter()
+        now = time.time()
+        state_prefix = config.STATE_FILE_PREFIX
+        activity_prefix = config.ACTIVITY_FILE_PREFIX
+        for name in names:
+            path = os.path.join(self.tmp_dir, name)
+            if name.startswith(state_prefix):
+                project = name[len(state_prefix):]
+                if not project:
+                    continue
+                try:
+                    self._states[project] = read_state_file(path)
+                except OSError:
+                    self._states.pop(project, None)
+            elif name.startswith(activity_prefix):
+                project = name[len(activity_prefix):]
+                if project:
+                    self._update_activity(project, path, now)
+        self._publish((time.perf_counter() - t0) * 1000)
+
+    def _update_activity(self, project, path, now):
+        try:
+            if config.ACTIVITY_FROM_MTIME:
+                last_activity = os.stat(path).st_mtime
+            else:
+                last_activity = read_activity_file(path)
+        except (OSError, ValueError):
+            self._activity.pop(project, None)  # unknown activity → stale
+            self._wheel.cancel(project)
+            self._stale.discard(project)
+            return
+        self._activity[project] = last_activity
+        deadline = last_activity + config.STALE_TIMEOUT_SEC
+        if deadline < now:
+            self._wheel.cancel(project)
+            self._stale.add(project)
+        else:
+            self._wheel.schedule(project, deadline)
+            self._stale.discard(project)
+
+    def _publish(self, parse_ms):
+        t0 = time.perf_counter()
+        records = []
+        for project, state in self._states.items():
+            stale = project not in self._activity or project in self._stale
+            if stale and state not in ("COMPLETED", "IDLE"):
+                state = "STALE"
+            records.append(ProjectRecord(project, state))
+        sort_projects(records)
+        sort_ms = (time.perf_counter() - t0) * 1000
+        with self._cond:
+            if records == self._records:
+                return
+            self._records = records
+            self._timings = {"parse": parse_ms, "sort": sort_ms}
+            self.version += 1
+            self._cond.notify_all()
+
+
+class WatchSource:
+    """Overlay source over a running StateWatcher; hands over to `fallback`
+    (a polling source) if the watch is lost."""
+
+    def __init__(self, watcher, fallback):
+        self.watcher = watcher
+        self.fallback = fallback
+
+    def refresh(self):
+        if not self.watcher.alive:
+            self.fallback.refresh()
+
+    def read(self):
+        if not self.watcher.alive:
+            return self.fallback.read()
+        return self.watcher.snapshot()
+
+    def notice(self):
+        if not self.watcher.alive:
+            return self.fallback.notice()
+        return None
+
+    def take_timings(self):
+        if not self.watcher.alive:
+            return self.fallback.take_timings()
+        return self.watcher.take_timings()
+
+    def pending_ms(self):
+        # The table lives on the watcher thread; check for new snapshots
+        # at WATCH_DRAIN_MS (a memory read, no filesystem access).
+        if self.watcher.alive:
+            return config.WATCH_DRAIN_MS
+        return self.fallback.pending_ms()
+
+    def close(self):
+        self.watcher.close()
+        self.fallback.close()
+
+
+if __name__ == "__main__":
+    watcher = StateWatcher(sys.argv[1] if len(sys.argv) > 1 else None)
+    try:
+        watcher.start()
+    except OSError as e:
+        sys.exit(f"inotify unavailable: {e}")
+    version = -1
+    try:
+        while not watcher.failed:
+            version = watcher.wait_for(version)
+            print(watcher.snapshot(), flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
@@ -0,0 +1,400 @@
+# Claude Status Overlay - Status Fan-out Service
+#
+# `python -m state_reader serve` runs ONE watcher (inotify, polling as
+# fallback) and pushes change-only JSON lines to any number of local
+# subscribers, so the overlay, tmux and the Stream Deck sidecar stop
+# scanning the same files independently.
+#
+# Protocol (one JSON object per line, records shaped like read_projects()):
+#   {"type": "snapshot", "seq": N, "projects": [{project, state}, ...]}
+#       first line on every connection, and after a resync
+#   {"type": "delta", "seq": N, "changed": [{project, state}, ...],
+#    "removed": [project, ...]}
+#       seq increases by one per delta
+#
+# Each line is encoded once and queued to every subscriber. A subscriber
+# whose unsent backlog exceeds SERVE_MAX_PENDING_BYTES has the backlog
+# dropped and gets a fresh snapshot once its socket drains, so a slow
+# reader never stalls the others or grows memory. The snapshot itself does
+# not count against the cap: a table larger than the cap would otherwise
+# trigger a resync on every delta.
+#
+#   python -m state_reader serve                 # TCP on SERVE_HOST:SERVE_PORT
+#   python -m state_reader serve --stdout        # one subscriber: the pipe
+#   python status_server.py subscribe            # print the live table
+#
+# Remote hosts (rpi5b, ...) can run it with --host 0.0.0.0 and be added to
+# config.SOURCES as {"kind": "serve"} entries.
+
+import argparse
+import json
+import selectors
+import socket
+import sys
+import threading
+from collections import deque
+
+import config
+from state_reader import ProjectRecord, StateScanner, sort_projects
+
+
+def watch_projects(tmp_dir=None, stop=None):
+    """Yield the project list each time it changes (first: the current one).
+
+    Uses state_watcher's inotify table when available; otherwise, or once
+    the watch is lost, scans every POLL_INTERVAL_MS.
+    """
+    from state_watcher import StateWatcher
+
+    tmp_dir = tmp_dir or config.WATCH_TMP_DIR
+    stop = stop or threading.Event()
+    last = None
+
+    watcher = StateWatcher(tmp_dir)
+    try:
+        watcher.start()
+    except OSError:
+        watcher = None
+    try:
+        if watcher is not None:
+            version = watcher.version
+            last = watcher.snapshot()
+            yield last
+            while not stop.is_set():
+                new = watcher.wait_for(version, timeout=1.0)
+                if watcher.failed:
+                    break
+                if new != version:
+                    version = new
+                    last = watcher.snapshot()
+                    yield last
+    finally:
+        if watcher is not None:
+            watcher.close()
+
+    scanner = StateScanner(tmp_dir)
+    while not stop.is_set():
+        records = scanner.scan()
+        if records != last:
+            last = records
+            yield records
+        stop.wait(config.POLL_INTERVAL_MS / 1000)
+
+
+def diff_projects(old, new):
+    """(changed records, removed project names) turning `old` into `new`."""
+    before = {r.label: r.state for r in old}
+    changed = [r for r in new if before.get(r.label) != r.state]
+    after = {r.label for r in new}
+    removed = sorted(p for p in before if p not in after)
+    return changed, removed
+
+
+def apply_message(table, msg):
+    """Fold one protocol message into `table` ({project: state}); returns
+    the sorted record list."""
+    if msg["type"] == "snapshot":
+        table.clear()
+        table.update((r["project"], r["state"]) for r in msg["projects"])
+    elif msg["type"] == "delta":
+        for record in msg["changed"]:
+            table[record["project"]] = record["state"]
+        for project in msg["removed"]:
+            table.pop(project, None)
+    return sort_projects([ProjectRecord(p, s) for p, s in table.items()])
+
+
+def _encode(msg):
+    return (json.dumps(msg, separators=(",", ":"), default=ProjectRecord.as_dict)
+            + "\n").encode()
+
+
+class _Subscriber:
+    def __init__(self, sock, addr):
+        self.sock = sock
+        self.addr = addr
+        self.out = deque()  # encoded lines, shared with other subscribers
+        self.offset = 0     # bytes of out[0] already sent
+        self.pending = 0    # unsent bytes
+        self.resync = False
+        self.snapshot = None  # the queued snapshot line while unsent
+
+    def queue_snapshot(self, line):
+        """Queue a snapshot (the queue is empty when one is due); its bytes
+        are exempt from the backlog limit."""
+        self.snapshot = line
+        self.out.append(line)
+        self.pending += len(line)
+
+    def backlog(self):
+        """Unsent bytes that count against the limit."""
+        if self.snapshot is not None and self.out and self.out[0] is self.snapshot:
+            return self.pending - (len(self.snapshot) - self.offset)
+        return self.pending
+
+    def queue(self, line, limit):
+        if self.resync:
+            return  # a snapshot follows once the socket drains
+        if self.backlog() + len(line) > limit:
+            self._drop_backlog()
+            return
+        self.out.append(line)
+        self.pending += len(line)
+
+    def _drop_backlog(self):
+        # Keep a half-sent line so the stream stays line-framed
+        head = self.out[0] if self.out and self.offset else None
+        self.out.clear()
+        self.pending = 0
+        if head is not self.snapshot:
+            self.snapshot = None
+        if head is not None:
+            self.out.append(head)
+            self.pending = len(head) - self.offset
+        else:
+            self.offset = 0
+        self.resync = True
+
+    def send(self):
+        """Write as much as the socket takes. Raises OSError if gone."""
+        while self.out:
+            head = self.out[0]
+            try:
+                n = self.sock.send(head[self.offset:])
+            except BlockingIOError:
+                return
+            self.offset += n
+            self.pending -= n
+            if self.offset < len(head):
+                return
+            if self.out.popleft() is self.snapshot:
+                self.snapshot = None
+            self.offset = 0
+
+
+class StatusServer:
+    """Single-threaded selector loop; the watcher runs on a producer thread
+    and hands over the latest list through a socketpair wake-up."""
+
+    def __init__(self, host=None, port=None, tmp_dir=None, max_pending=None):
+        self.host = host or config.SERVE_HOST
+        self.port = config.SERVE_PORT if port is None else port
+        self.tmp_dir = tmp_dir
+        self.max_pending = max_pending or config.SERVE_MAX_PENDING_BYTES
+        self._sel = selectors.DefaultSelector()
+        self._subs = {}  # socket -> _Subscriber
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._latest = None
+        self._current = []
+        self._seq = 0
+        self._snapshot_line = None  # encoded snapshot for the current seq
+        self._listener = None
+        self._wake_r, self._wake_w = socket.socketpair()
+
+    @property
+    def address(self):
+        return self._listener.getsockname() if self._listener else None
+
+    def start(self):
+        listener = socket.create_server((self.host, self.port))
+        listener.setblocking(False)
+        self._listener = listener
+        self._sel.register(listener, selectors.EVENT_READ, self._accept)
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._sel.register(self._wake_r, selectors.EVENT_READ, self._on_wake)
+        threading.Thread(target=self._produce, name="status-producer",
+                         daemon=True).start()
+
+    def serve_forever(self):
+        while not self._stop.is_set():
+            for key, events in self._sel.select(timeout=1.0):
+                key.data(key.fileobj, events)
+
+    def close(self):
+        self._stop.set()
+        for sock in list(self._subs):
+            self._drop(sock)
+        if self._listener is not None:
+            self._sel.unregister(self._listener)
+            self._listener.close()
+            self._listener = None
+        self._sel.close()
+        self._wake_r.close()
+        self._wake_w.close()
+
+    # ── producer thread ──
+
+    def _produce(self):
+        for records in watch_projects(self.tmp_dir, self._stop):
+            with self._lock:
+                self._latest = records
+            try:
+                self._wake_w.send(b"\0")
+            except (BlockingIOError, OSError):
+                pass  # a wake-up is already pending (or shutting down)
+
+    # ── selector loop ──
+
+    def _on_wake(self, sock, events):
+        try:
+            while sock.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+        with self._lock:
+            records, self._latest = self._latest, None
+        if records is None:
+            return
+        changed, removed = diff_projects(self._current, records)
+        self._current = records
+        if not changed and not removed:
+            return
+        self._seq += 1
+        self._snapshot_line = None
+        line = _encode({"type": "delta", "seq": self._seq,
+                        "changed": changed, "removed": removed})
+        for sub in list(self._subs.values()):
+            sub.queue(line, self.max_pending)
+            self._flush(sub)
+
+    def _snapshot(self):
+        if self._snapshot_line is None:
+            self._snapshot_line = _encode({"type": "snapshot", "seq": self._seq,
+                                           "projects": self._current})
+        return self._snapshot_line
+
+    def _accept(self, listener, events):
+        try:
+            sock, addr = listener.accept()
+        except BlockingIOError:
+            return
+        sock.setblocking(False)
+        sub = self._subs[sock] = _Subscriber(sock, addr)
+        self._sel.register(sock, selectors.EVENT_READ, self._on_client)
+        sub.queue_snapshot(self._snapshot())
+        self._flush(sub)
+
+    def _on_client(self, sock, events):
+        sub = self._subs.get(sock)
+        if sub is None:
+            return
+        if events & selectors.EVENT_READ:
+            try:
+                if not sock.recv(4096):  # subscribers don't talk; EOF = gone
+                    self._drop(sock)
+                    return
+            except BlockingIOError:
+                pass
+            except OSError:
+                self._drop(sock)
+                return
+        if events & selectors.EVENT_WRITE:
+            self._flush(sub)
+
+    def _flush(self, sub):
+        try:
+            sub.send()
+            if not sub.out and sub.resync:
+                sub.resync = False
+                sub.queue_snapshot(self._snapshot())
+                sub.send()
+        except OSError:
+            self._drop(sub.sock)
+            return
+        mask = selectors.EVENT_READ | (selectors.EVENT_WRITE if sub.out else 0)
+        self._sel.modify(sub.sock, mask, self._on_client)
+
+    def _drop(self, sock):
+        if self._subs.pop(sock, None) is None:
+            return
+        self._sel.unregister(sock)
+        sock.close()
+
+
+def serve_stdout(tmp_dir=None, out=None):
+    """Single subscriber on a pipe: snapshot, then deltas, blocking writes."""
+    out = out or sys.stdout.buffer
+    current, seq = None, 0
+    try:
+        for records in watch_projects(tmp_dir):
+            if current is None:
+                msg = {"type": "snapshot", "seq": seq, "projects": records}
+            else:
+                changed, removed = diff_projects(current, records)
+                if not changed and not removed:
+                    continue
+                seq += 1
+                msg = {"type": "delta", "seq": seq,
+                       "changed": changed, "removed": removed}
+            current = records
+            out.write(_encode(msg))
+            out.flush()
+    except BrokenPipeError:
+        pass
+
+
+def subscribe(host=None, port=None):
+    """Yield the sorted record list after every message from a server."""
+    host = host or config.SERVE_HOST
+    port = config.SERVE_PORT if port is None else port
+    table, seq = {}, None
+    with socket.create_connection((host, port)) as sock:
+        for raw in sock.makefile("rb"):
+            msg = json.loads(raw)
+            if msg["type"] == "delta" and seq is not None and msg["seq"] != seq + 1:
+                raise ValueError(f"sequence gap: {seq} -> {msg['seq']}")
+            seq = msg["seq"]
+            yield apply_message(table, msg)
+
+
+def fetch_snapshot(host=None, port=None, timeout=None, source=None):
+    """One-shot read of a server's table: connect, take the snapshot line.
+    Raises OSError / ValueError when the server is unreachable or garbled."""
+    host = host or config.SERVE_HOST
+    port = config.SERVE_PORT if port is None else port
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        line = sock.makefile("rb").readline()
+    msg = json.loads(line)
+    if msg.get("type") != "snapshot":
+        raise ValueError(f"expected a snapshot, got {msg.get('type')!r}")
+    return sort_projects([ProjectRecord(r["project"], r["state"], source)
+                          for r in msg["projects"]])
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="state_reader serve",
+                                 description="fan out project state changes")
+    ap.add_argument("--host", default=config.SERVE_HOST)
+    ap.add_argument("--port", type=int, default=config.SERVE_PORT)
+    ap.add_argument("--tmp-dir", default=None, help="default: WATCH_TMP_DIR")
+    ap.add_argument("--stdout", action="store_true",
+                    help="write JSON lines to stdout instead of listening")
+    args = ap.parse_args(argv)
+
+    if args.stdout:
+        serve_stdout(args.tmp_dir)
+        return 0
+    server = StatusServer(args.host, args.port, args.tmp_dir)
+    server.start()
+    print(f"serving on {server.address[0]}:{server.address[1]}",
+          file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "subscribe":
+        try:
+            for projects in subscribe():
+                print(projects, flush=True)
+        except KeyboardInterrupt:
+            pass
+    else:
+        sys.exit(main(sys.argv[1:]))
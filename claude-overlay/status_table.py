@@ -0,0 +1,501 @@
+# Claude Status Overlay - Status Table
+#
+# One fixed-size binary file (STATUS_TABLE_FILE) in place of the
+# per-project claude-led-state-* / claude-activity-* pairs:
+#
+#   header  64 bytes   magic "CLST", version, slot size, generation, slot count
+#   slots   SLOT_SIZE  seq, last activity (epoch s), state enum, name length,
+#                      project name (UTF-8, at most NAME_MAX bytes)
+#
+# Readers mmap the file and compare the header generation with the one
+# they last decoded: a quiet tick is an 8-byte load from the mapping, no
+# listing, stat or open. Only when it moved are the slots decoded.
+#
+# Writers serialise on flock(); every slot is a seqlock so that lock-free
+# readers never use a half-written slot: seq goes odd, the fields are
+# written, seq goes even again, then the generation is bumped. A reader
+# copies the slot between two seq loads and retries while they differ or
+# are odd. (x86-64 keeps stores, and loads, in program order, which is all
+# the seqlock needs from the mapping.)
+#
+# Migration: StatusTable(legacy_dir=...) also writes the legacy text files
+# so consumers still polling claude-led-state-* keep working, and
+# `import-legacy` seeds the table from them.
+#
+#   python status_table.py touch PROJECT [STATE] # claude-hook.sh: activity = now
+#   python status_table.py set PROJECT STATE
+#   python status_table.py dump
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+
+import config
+from state_reader import (ProjectRecord, normalize_state, read_activity_file,
+                          read_state_file, sort_projects)
+
+MAGIC = b"CLST"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQI")    # magic, version, slot size, generation, slots
+HEADER_SIZE = 64
+GENERATION_OFFSET = 8
+SLOT = struct.Struct("<QqBB6x")      # seq, activity, state, name length
+SLOT_SIZE = 128
+NAME_MAX = SLOT_SIZE - SLOT.size
+SEQ = struct.Struct("<Q")
+
+# Stored states (claude-hook.sh's five); 0 = no state yet (activity only),
+# skipped like a project without a state file. The reader maps them through
+# normalize_state() like the file source does (ERROR and unknown codes show
+# as IDLE). STALE is derived by the reader, never stored.
+STATES = ("", "IDLE", "RUNNING", "WAITING", "COMPLETED", "ERROR")
+STATE_CODES = {name: code for code, name in enumerate(STATES)}
+
+READ_RETRIES = 100  # a slot still odd after this many copies is skipped
+
+
+def encode_name(project):
+    """Project name as stored: UTF-8, cut to NAME_MAX on a character boundary."""
+    return project.encode("utf-8")[:NAME_MAX].decode("utf-8", "ignore").encode("utf-8")
+
+
+def table_size(slots):
+    return HEADER_SIZE + slots * SLOT_SIZE
+
+
+def _slot_offset(index):
+    return HEADER_SIZE + index * SLOT_SIZE
+
+
+def read_slot(buf, index):
+    """Consistent (name, state_code, activity) of one slot, or None when the
+    slot is free or a writer never finished it (seqlock read)."""
+    off = _slot_offset(index)
+    for _ in range(READ_RETRIES):
+        seq = SEQ.unpack_from(buf, off)[0]
+        if seq & 1:
+            continue
+        raw = bytes(buf[off:off + SLOT_SIZE])
+        if SEQ.unpack_from(buf, off)[0] != seq:
+            continue
+        _, activity, state, length = SLOT.unpack_from(raw)
+        if not length:
+            return None
+        name = raw[SLOT.size:SLOT.size + length].decode("utf-8", "replace")
+        return name, state, activity
+    return None
+
+
+class StatusTable:
+    """Writer side. Every update takes the file's flock, so any number of
+    processes (hookd, claude-hook.sh, the CLI) can share one table.
+
+    legacy_dir: also write claude-led-state-* / claude-activity-* there.
+    """
+
+    def __init__(self, path=None, slots=None, legacy_dir=None):
+        self.path = path or config.STATUS_TABLE_FILE
+        self.slots = slots or config.STATUS_TABLE_SLOTS
+        self.legacy_dir = legacy_dir
+        self._fd = None
+        self._map = None
+
+    def open(self):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            with _Locked(fd):
+                size = os.fstat(fd).st_size
+                header = os.pread(fd, HEADER.size, 0) if size >= HEADER_SIZE else b""
+                slots = 0
+                if header[:4] == MAGIC:
+                    _, version, slot_size, _, slots = HEADER.unpack(header)
+                    if version != VERSION or slot_size != SLOT_SIZE:
+                        raise OSError(f"{self.path}: unsupported table "
+                                      f"v{version}/{slot_size}")
+                if slots:
+                    self.slots = slots
+                    if size < table_size(slots):
+                        # Cut short (crash while it was created, partial
+                        # copy): the missing slots come back zeroed = free
+                        os.ftruncate(fd, table_size(slots))
+                else:
+                    # New, empty or not a table: start over from zeroed slots
+                    os.ftruncate(fd, 0)
+                    os.ftruncate(fd, table_size(self.slots))
+                    os.pwrite(fd, HEADER.pack(MAGIC, VERSION, SLOT_SIZE, 0, self.slots), 0)
+            self._map = mmap.mmap(fd, table_size(self.slots))
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+        return self
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            os.close(self._fd)
+            self._map = self._fd = None
+
+    def __enter__(self):
+        return self.open() if self._map is None else self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def generation(self):
+        return SEQ.unpack_from(self._map, GENERATION_OFFSET)[0]
+
+    def set(self, project, state=None, activity=None):
+        """Update one project; None leaves that field as it is. A new
+        project takes a free slot, or the least recently active one when
+        the table is full."""
+        code = None if state is None else STATE_CODES[state]
+        name = encode_name(project)
+        with _Locked(self._fd):
+            index, current = self._find(name)
+            if current is None:
+                current = (name, 0, 0)
+            self._write_slot(index, name,
+                             current[1] if code is None else code,
+                             current[2] if activity is None else int(activity))
+        if self.legacy_dir:
+            if state is not None:
+                self._write_legacy(config.STATE_FILE_PREFIX, project, state)
+            if activity is not None:
+                self._write_legacy(config.ACTIVITY_FILE_PREFIX, project, int(activity))
+
+    def touch(self, project, now=None):
+        self.set(project, activity=time.time() if now is None else now)
+
+    def remove(self, project):
+        name = encode_name(project)
+        with _Locked(self._fd):
+            index, current = self._find(name)
+            if current is not None:
+                self._write_slot(index, b"", 0, 0)
+        if self.legacy_dir:
+            for prefix in (config.STATE_FILE_PREFIX, config.ACTIVITY_FILE_PREFIX):
+                try:
+                    os.unlink(os.path.join(self.legacy_dir, prefix + project))
+                except OSError:
+                    pass
+
+    def rows(self):
+        """[(project, state, activity), ...] in slot order."""
+        rows = []
+        for index in range(self.slots):
+            slot = read_slot(self._map, index)
+            if slot is not None:
+                name, code, activity = slot
+                rows.append((name, STATES[code] if code < len(STATES) else "", activity))
+        return rows
+
+    def import_legacy(self, tmp_dir):
+        """Seed the table from the legacy files in tmp_dir; returns the count."""
+        count = 0
+        with os.scandir(tmp_dir) as it:
+            for entry in it:
+                if not entry.name.startswith(config.STATE_FILE_PREFIX):
+                    continue
+                project = entry.name[len(config.STATE_FILE_PREFIX):]
+                try:
+                    state = read_state_file(entry.path)
+                except OSError:
+                    continue
+                try:
+                    activity = read_activity_file(os.path.join(
+                        tmp_dir, config.ACTIVITY_FILE_PREFIX + project))
+                except (OSError, ValueError):
+                    activity = None
+                if project and state in STATE_CODES:
+                    self.set(project, state, activity)
+                    count += 1
+        return count
+
+    def _find(self, name):
+        """(slot index, (name, state, activity) or None if new). Caller
+        holds the lock, so no seqlock retries are needed here."""
+        free = oldest = None
+        oldest_activity = None
+        for index in range(self.slots):
+            off = _slot_offset(index)
+            _, activity, state, length = SLOT.unpack_from(self._map, off)
+            if not length:
+                if free is None:
+                    free = index
+                continue
+            if self._map[off + SLOT.size:off + SLOT.size + length] == name:
+                return index, (name, state, activity)
+            if oldest_activity is None or activity < oldest_activity:
+                oldest, oldest_activity = index, activity
+        return (oldest if free is None else free), None
+
+    def _write_slot(self, index, name, code, activity):
+        off = _slot_offset(index)
+        seq = SEQ.unpack_from(self._map, off)[0] | 1  # odd (stays odd after a crash)
+        SEQ.pack_into(self._map, off, seq)
+        SLOT.pack_into(self._map, off, seq, activity, code, len(name))
+        self._map[off + SLOT.size:off + SLOT_SIZE] = name.ljust(NAME_MAX, b"\0")
+        SEQ.pack_into(self._map, off, seq + 1)
+        SEQ.pack_into(self._map, GENERATION_OFFSET, self.generation + 1)
+
+    def _write_legacy(self, prefix, project, value):
+        try:
+            with open(os.path.join(self.legacy_dir, prefix + project), "w") as f:
+                f.write(f"{value}\n")
+        except OSError:
+            pass
+
+
+class _Locked:
+    """flock(LOCK_EX) for the duration of a with block."""
+
+    def __init__(self, fd):
+        self.fd = fd
+
+    def __enter__(self):
+        import fcntl
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc):
+        import fcntl
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+
+class StatusTableReader:
+    """Reader side: scan() → [ProjectRecord, ...] like StateScanner.scan().
+
+    Mapped (default on posix), an unchanged generation costs no syscall;
+    the mapping is only re-validated against the path every
+    STATUS_TABLE_RECHECK_SEC (the file may be recreated, e.g. a WSL
+    restart empties /tmp). Unmapped (Windows, where a mapping of a \\wsl$
+    file is not kept coherent with the Linux side) each scan is one open
+    and a 64-byte header read, and the slots are read only when the
+    generation moved.
+    """
+
+    def __init__(self, path=None, source=None, use_mmap=None):
+        self.path = path or config.STATUS_TABLE_FILE
+        self._source = source
+        self.use_mmap = os.name == "posix" if use_mmap is None else use_mmap
+        self._map = None
+        self._ino = None
+        self._recheck_at = 0.0
+        self._generation = None
+        self._rows = []         # decoded (name, state, activity) at _generation
+        self._records = {}      # project -> ProjectRecord last handed out
+        self._results = []
+        self._expires = None    # earliest time a record turns STALE
+        self.timings = {}
+
+    @property
+    def mapped(self):
+        return self._map is not None
+
+    def open(self):
+        """Map the table; OSError if it does not exist or is not a table."""
+        self.close()
+        with open(self.path, "rb") as f:
+            st = os.fstat(f.fileno())
+            header = f.read(HEADER.size)
+            slots = self._check_header(header, st.st_size)
+            if self.use_mmap:
+                self._map = mmap.mmap(f.fileno(), table_size(slots),
+                                      access=mmap.ACCESS_READ)
+                self._ino = (st.st_dev, st.st_ino)
+        self._generation = None
+        self._recheck_at = time.monotonic() + config.STATUS_TABLE_RECHECK_SEC
+        return self
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def _check_header(self, header, size):
+        if len(header) < HEADER.size or header[:4] != MAGIC:
+            raise OSError(f"{self.path}: not a status table")
+        _, version, slot_size, _, slots = HEADER.unpack(header)
+        if version != VERSION or slot_size != SLOT_SIZE or size < table_size(slots):
+            raise OSError(f"{self.path}: unsupported or truncated table")
+        return slots
+
+    def _recheck(self):
+        """Remap if the path now points at a different file."""
+        self._recheck_at = time.monotonic() + config.STATUS_TABLE_RECHECK_SEC
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return
+        if (st.st_dev, st.st_ino) != self._ino:
+            self.open()
+
+    def changed(self):
+        """True when the generation moved since the last scan()."""
+        if self._map is None:
+            return True
+        return SEQ.unpack_from(self._map, GENERATION_OFFSET)[0] != self._generation
+
+    def scan(self, strict=False):
+        """An unreadable table yields [] unless strict, which re-raises."""
+        t0 = time.perf_counter()
+        try:
+            if self.use_mmap:
+                if self._map is None:
+                    self.open()
+                elif time.monotonic() >= self._recheck_at:
+                    self._recheck()
+                decoded = self._decode_mapped()
+            else:
+                decoded = self._decode_read()
+        except OSError:
+            if strict:
+                raise
+            self._generation, self._rows = None, []
+            return []
+        t1 = time.perf_counter()
+        now = time.time()
+        if decoded or (self._expires is not None and now >= self._expires):
+            self._results = self._build(now)
+        self.timings = {"scan": (t1 - t0) * 1000,
+                        "parse": (time.perf_counter() - t1) * 1000}
+        return self._results
+
+    def _decode_mapped(self):
+        generation = SEQ.unpack_from(self._map, GENERATION_OFFSET)[0]
+        if generation == self._generation:
+            return False
+        slots = (len(self._map) - HEADER_SIZE) // SLOT_SIZE
+        rows = (read_slot(self._map, index) for index in range(slots))
+        self._rows = [slot for slot in rows if slot is not None]
+        self._generation = generation
+        return True
+
+    def _decode_read(self):
+        with open(self.path, "rb") as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size or header[:4] != MAGIC:
+                raise OSError(f"{self.path}: not a status table")
+            generation = HEADER.unpack(header)[3]
+            if generation == self._generation:
+                return False
+            f.seek(0)
+            buf = f.read()
+        slots = self._check_header(buf[:HEADER.size], len(buf))
+        # A plain read has no seqlock: a slot caught mid-write reads as odd
+        # and is skipped; the next generation brings it back.
+        rows = []
+        for index in range(slots):
+            off = _slot_offset(index)
+            seq, activity, state, length = SLOT.unpack_from(buf, off)
+            if length and not seq & 1:
+                rows.append((buf[off + SLOT.size:off + SLOT.size + length]
+                             .decode("utf-8", "replace"), state, activity))
+        self._rows = rows
+        self._generation = generation
+        return True
+
+    def _build(self, now):
+        results, live, expires = [], set(), None
+        timeout = config.STALE_TIMEOUT_SEC
+        for project, code, activity in self._rows:
+            if not code:
+                continue
+            state = normalize_state(STATES[code] if code < len(STATES) else "")
+            if state not in ("COMPLETED", "IDLE"):
+                if now - activity > timeout:
+                    state = "STALE"
+                elif expires is None or activity + timeout < expires:
+                    expires = activity + timeout
+            live.add(project)
+            record = self._records.get(project)
+            if record is None or record.state != state:
+                record = self._records[project] = ProjectRecord(project, state,
+                                                                self._source)
+            results.append(record)
+        for project in [p for p in self._records if p not in live]:
+            del self._records[project]
+        self._expires = expires
+        return sort_projects(results)
+
+
+class TableSource:
+    """Overlay source over a mapped StatusTableReader: read() is answered
+    from memory on the Tk thread. Hands over to `fallback` while the table
+    cannot be read."""
+
+    def __init__(self, reader, fallback):
+        self.reader = reader
+        self.fallback = fallback
+        self._ok = True
+
+    def refresh(self):
+        if not self._ok:
+            self.fallback.refresh()
+
+    def read(self):
+        try:
+            records = self.reader.scan(strict=True)
+        except OSError:
+            self._ok = False
+            return self.fallback.read()
+        self._ok = True
+        return records
+
+    def notice(self):
+        return None if self._ok else self.fallback.notice()
+
+    def take_timings(self):
+        return dict(self.reader.timings) if self._ok else self.fallback.take_timings()
+
+    def pending_ms(self):
+        return config.STATUS_TABLE_DRAIN_MS if self._ok else self.fallback.pending_ms()
+
+    def close(self):
+        self.reader.close()
+        self.fallback.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="claude status table")
+    parser.add_argument("--table", default=None, help="table file (STATUS_TABLE_FILE)")
+    parser.add_argument("--no-legacy", action="store_true",
+                        help="do not mirror into claude-led-state-* files")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("set", help="set a project's state")
+    p.add_argument("project")
+    p.add_argument("state", choices=STATES[1:])
+    p = sub.add_parser("touch", help="last activity = now (and the state, if given)")
+    p.add_argument("project")
+    p.add_argument("state", nargs="?", choices=STATES[1:])
+    p = sub.add_parser("rm", help="drop a project")
+    p.add_argument("project")
+    sub.add_parser("dump", help="print the table")
+    p = sub.add_parser("import-legacy", help="seed from claude-led-state-* files")
+    p.add_argument("dir", nargs="?", default=None)
+    args = parser.parse_args(argv)
+
+    legacy = None if args.no_legacy else config.WATCH_TMP_DIR
+    with StatusTable(args.table, legacy_dir=legacy) as table:
+        if args.cmd == "set":
+            table.set(args.project, args.state)
+        elif args.cmd == "touch":
+            table.set(args.project, args.state, time.time())
+        elif args.cmd == "rm":
+            table.remove(args.project)
+        elif args.cmd == "import-legacy":
+            table.legacy_dir = None
+            print(f"imported {table.import_legacy(args.dir or config.WATCH_TMP_DIR)}")
+        else:
+            print(f"generation {table.generation}, {table.slots} slots")
+            for project, state, activity in table.rows():
+                print(f"{project}\t{state or '-'}\t{activity}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
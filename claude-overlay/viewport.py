@@ -0,0 +1,101 @@
+# Claude Status Overlay - Viewport
+#
+# Turns the sorted project list into the rows actually drawn, so Tk work
+# per tick follows the visible row count instead of the project count:
+#   - VIEW_PINNED_STATES (WAITING/RUNNING) rows come first, never grouped
+#   - any other state with VIEW_GROUP_MIN+ rows collapses into one
+#     "▸ 12 × COMPLETED" row; clicking it expands the group in place
+#   - at most VIEW_MAX_ROWS rows; the rest scroll (mouse wheel) and are
+#     counted in a trailing "↕ N more" row
+#
+# Rows are (key, state, text): key is the project label, or a GROUP / MORE
+# tuple for the synthetic rows; text is drawn after the state dot.
+
+import config
+
+GROUP = "group"
+MORE = ("more",)
+
+
+def project_text(label, state):
+    return f"{label} \u2014 {state}"
+
+
+def group_key(state):
+    return (GROUP, state)
+
+
+def is_group(key):
+    return isinstance(key, tuple) and key[0] == GROUP
+
+
+class Viewport:
+    def __init__(self, max_rows=None, pinned=None, group_min=None):
+        self.max_rows = max_rows or config.VIEW_MAX_ROWS
+        self.pinned = config.VIEW_PINNED_STATES if pinned is None else pinned
+        self.group_min = group_min or config.VIEW_GROUP_MIN
+        self.expanded = set()  # states whose group is open
+        self.offset = 0        # first visible row of the scrollable part
+        self._projects = None  # last input list (identity)
+        self._view_state = None
+        self._rows = []
+
+    def toggle(self, state):
+        self.expanded ^= {state}
+
+    def scroll(self, step):
+        self.offset = max(0, self.offset + step)
+
+    def rows(self, projects):
+        """Visible rows for `projects`; cached while the list object,
+        expanded groups and scroll offset are unchanged."""
+        view_state = (frozenset(self.expanded), self.offset)
+        if projects is self._projects and view_state == self._view_state:
+            return self._rows
+
+        pinned, groups = [], {}
+        for p in projects:
+            if p.state in self.pinned:
+                pinned.append(p)
+            else:
+                groups.setdefault(p.state, []).append(p)  # keeps sort order
+
+        # Scrollable part as cheap references; text is built for visible rows only
+        body = []
+        for state, members in groups.items():
+            if len(members) >= self.group_min:
+                body.append((state, len(members)))
+                if state not in self.expanded:
+                    continue
+            body.extend(members)
+
+        hidden = 0
+        if len(pinned) + len(body) > self.max_rows:
+            # One slot for the "more" row; pinned rows get first claim on
+            # the rest, anything they leave scrolls
+            shown = self.max_rows - 1
+            hidden = max(len(pinned) - shown, 0)
+            pinned = pinned[:shown]
+            room = shown - len(pinned)
+            self.offset = min(self.offset, max(len(body) - room, 0))
+            visible = body[self.offset:self.offset + room]
+            hidden += len(body) - len(visible)
+            body = visible
+        else:
+            self.offset = 0
+
+        rows = [(p.label, p.state, project_text(p.label, p.state)) for p in pinned]
+        for item in body:
+            if isinstance(item, tuple):
+                state, count = item
+                arrow = "\u25be" if state in self.expanded else "\u25b8"  # ▾ / ▸
+                rows.append((group_key(state), state, f"{arrow} {count} \u00d7 {state}"))
+            else:
+                rows.append((item.label, item.state, project_text(item.label, item.state)))
+        if hidden:
+            rows.append((MORE, "STALE", f"\u2195 {hidden} more"))
+
+        self._projects = projects
+        self._view_state = (frozenset(self.expanded), self.offset)
+        self._rows = rows
+        return rows
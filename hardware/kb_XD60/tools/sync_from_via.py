@@ -3,14 +3,31 @@
 
 這支腳本把「VIA 設定 → repo 出廠預設 → 韌體」整條流程自動化，**不需要 AI**：
   1. 讀最新的 VIA .layout（VIA App → Save Current Layout 匯出的檔）
-  2. keycode 轉成現行 QMK 名、矩陣序轉成 LAYOUT_all 序
-  3. 更新 xd60_qmk_keymap.json + xd60_custom/keymap.c + xd60_via_keymap.layout
-  4. 跑 check_keymap_sync.py
-  5. qmk 編譯，.hex 複製到 Windows 桌面
-之後自己 `git commit` 即可。
+  2. keycode 轉成現行 QMK 名、矩陣序轉成 LAYOUT_all 序，並對照本機 qmk_firmware
+     的 keycode 索引（../tools/qmk_keycodes.py）驗證 —— 棄用別名自動換成現行名稱，
+     不存在的 keycode 在寫任何檔案之前就擋下來
+  3. sync check（../tools/check_keymaps.py 的 verify，同一個 process 內，
+     驗記憶體裡要寫的內容）—— 不一致就停，不寫任何檔案
+  4. 更新 xd60_qmk_keymap.json + xd60_custom/keymap.c + xd60_via_keymap.layout
+  5. qmk 編譯（輸出即時轉印），.hex 複製到 Windows 桌面
+之後自己 `git commit` 即可。結尾印各階段耗時（--timing-json 另存 JSON）。
+
+矩陣 → LAYOUT_all 順序與 VIA → QMK 名稱對照依 qmk_firmware revision 快取
+（LAYOUT_CACHE），info.json 與 keycode 索引只在 revision 變了、或遇到沒見過
+的 keycode 時才讀。三個檔案同時寫。
+
+內容沒變的檔案不重寫；編譯結果以 keymap.c + config.h + rules.mk + qmk_firmware
+revision 的 sha256 為 key 存在 BUILD_CACHE，同一份輸入直接拿快取的 .hex，
+不重跑 qmk compile（最慢的一步）。--force 無視快取、一律重寫重編。
+
+--watch：常駐監看 VIA_DIR，有新的匯出（大小/mtime 穩定 WATCH_SETTLE_SEC，
+OneDrive 寫完）就自動跑整條流程。編譯中又來新匯出 → 中止這次編譯、改編新的，
+不會兩個同時跑。Ctrl-C 結束。
 
 用法：
-  python3 sync_from_via.py [path/to/file.layout]
+  python3 sync_from_via.py [path/to/file.layout] [--no-compile] [--force]
+  python3 sync_from_via.py --watch [--no-compile]
+  python3 sync_from_via.py --timing-json timing.json
 不給路徑時，自動抓 OneDrive XD60_VIA/ 裡 mtime 最新的 .layout。
 
 注意：keymap.c 由本腳本「整檔重新產生」—— 上半 keymaps[] 是 VIA 來的鍵位，
@@ -18,22 +35,42 @@
 KEYMAP_C 模板裡的 HSV_*;別直接手改 keymap.c（會被下次同步覆蓋）。
 """
 import argparse
+import filecmp
+import hashlib
 import json
+import os
 import re
 import shutil
+import signal
 import subprocess
 import sys
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from operator import itemgetter
 from pathlib import Path
 
 KB = Path(__file__).resolve().parents[1]                         # hardware/kb_XD60
+sys.path.insert(0, str(KB.parent / "tools"))
+from check_keymaps import report, verify  # noqa: E402
+from qmk_keycodes import KeycodeIndex  # noqa: E402
+
 QMK_HOME = Path.home() / "qmk_firmware"
 QMK_INFO = QMK_HOME / "keyboards/xiudi/xd60/info.json"
 QMK_BIN = Path.home() / ".local/bin/qmk"
 QMK_HEX = QMK_HOME / "xiudi_xd60_rev2_xd60_custom.hex"
 VIA_DIR = Path("/mnt/c/Users/duofilm/OneDrive - hepei/電腦軟體/XD60鍵盤/XD60_VIA")
 DESKTOP = Path("/mnt/c/Users/duofilm/Desktop")
-
-# VIA 舊 keycode 名 → 現行 QMK 名（否則 keymap.c 編不過）
+BUILD_CACHE = Path.home() / ".cache/xd60_build"                  # <sha256>.hex
+LAYOUT_CACHE = BUILD_CACHE / "layout_index.json"                 # 見 layout_table()
+WATCH_POLL_SEC = 1.0     # --watch：多久看一次 VIA_DIR
+WATCH_SETTLE_SEC = 2.0   # 大小與 mtime 維持不變這麼久才算寫完
+
+# VIA 舊 keycode 名 → 現行 QMK 名（否則 keymap.c 編不過）。qmk_firmware 的
+# legacy header 還認得的棄用別名由 keycode 索引自動換掉，這裡只需要放 QMK
+# 已經完全移除、索引查不到的名稱。
 CONV = {
     "KC_MS_BTN1": "MS_BTN1", "KC_MS_BTN2": "MS_BTN2", "KC_MS_BTN3": "MS_BTN3",
     "KC_MS_BTN4": "MS_BTN4", "KC_MS_BTN5": "MS_BTN5",
@@ -142,6 +179,110 @@ def find_layout(arg):
     return cands[-1]
 
 
+class LayoutIndex:
+    """VIA_DIR 的 .layout 索引（--watch 用）。
+
+    /mnt/c 上每個 stat 都要跨 9P，所以 poll() 先看資料夾 mtime：沒變（沒有
+    新增/刪除/改名）就只 stat 目前最新的那一個（VIA 覆寫同名檔不會動到資料夾
+    mtime）；有變才重新列目錄、只 stat 新出現的檔名。
+    """
+
+    def __init__(self, directory):
+        self.dir = directory
+        self._dir_mtime = None
+        self._entries = {}   # name -> (size, mtime_ns, 首次看到這組值的時間)
+
+    def _stat(self, name, now):
+        try:
+            st = (self.dir / name).stat()
+        except OSError:
+            self._entries.pop(name, None)
+            return
+        sig = (st.st_size, st.st_mtime_ns)
+        old = self._entries.get(name)
+        if old is None or old[:2] != sig:
+            self._entries[name] = sig + (now,)
+
+    def poll(self):
+        now = time.monotonic()
+        try:
+            dir_mtime = self.dir.stat().st_mtime_ns
+        except OSError:
+            self._dir_mtime, self._entries = None, {}
+            return
+        if dir_mtime != self._dir_mtime:
+            try:
+                names = {e.name for e in os.scandir(self.dir)
+                         if e.name.endswith(".layout") and e.is_file()}
+            except OSError:
+                # 資料夾在 stat 之後被刪/改名（git checkout 之類）：當作沒變，
+                # _dir_mtime 不更新，下一輪 poll 重新列
+                return
+            self._dir_mtime = dir_mtime
+            for gone in set(self._entries) - names:
+                del self._entries[gone]
+            for name in names - set(self._entries):
+                self._stat(name, now)
+        newest = self.newest()
+        if newest:
+            self._stat(newest, now)
+
+    def newest(self):
+        return max(self._entries, key=lambda n: self._entries[n][1], default=None)
+
+    def stable(self, settle=WATCH_SETTLE_SEC):
+        """最新的 .layout 寫完（settle 秒內大小/mtime 沒變）後回傳 (path, (size, mtime_ns))。"""
+        name = self.newest()
+        if name is None:
+            return None
+        size, mtime, since = self._entries[name]
+        if size == 0 or time.monotonic() - since < settle:
+            return None
+        return self.dir / name, (size, mtime)
+
+
+def write_if_changed(path, text, force=False):
+    """內容相同就不寫（保留 mtime，git/qmk 都不會以為有變）。回傳是否有寫。"""
+    try:
+        if not force and path.read_text() == text:
+            return False
+    except OSError:
+        pass
+    path.write_text(text)
+    return True
+
+
+def qmk_revision():
+    """qmk_firmware 的 HEAD commit（有未提交修改則附上 diff 的 hash）;取不到回 None。"""
+    try:
+        head = subprocess.run(["git", "-C", str(QMK_HOME), "rev-parse", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+        diff = subprocess.run(["git", "-C", str(QMK_HOME), "diff", "HEAD"],
+                              capture_output=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return head + ("+" + hashlib.sha256(diff).hexdigest()[:12] if diff else "")
+
+
+def build_key(keymap_c, revision):
+    """編譯輸入的 content hash：產生的 keymap.c（= 各層鍵位 + KEYMAP_C 模板）、
+    同資料夾的 config.h / rules.mk、qmk_firmware revision。"""
+    h = hashlib.sha256()
+    for part in (revision, "xiudi/xd60/rev2:xd60_custom", keymap_c,
+                 (KB / "xd60_custom/config.h").read_text(),
+                 (KB / "xd60_custom/rules.mk").read_text()):
+        h.update(part.encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def cache_store(src, key):
+    BUILD_CACHE.mkdir(parents=True, exist_ok=True)
+    tmp = BUILD_CACHE / f".{key}.tmp"
+    shutil.copy(src, tmp)
+    os.replace(tmp, BUILD_CACHE / f"{key}.hex")
+
+
 def fmt_layer(layer):
     lines, i = [], 0
     for rl in ROW_LENS:
@@ -153,80 +294,313 @@ def fmt_layer(layer):
     return "\n".join(lines)
 
 
-def main():
-    ap = argparse.ArgumentParser(description="同步 VIA .layout 回 repo 並編譯")
-    ap.add_argument("layout", nargs="?", help="VIA .layout 路徑（省略則抓最新的）")
-    ap.add_argument("--no-compile", action="store_true", help="只同步，不編譯")
-    args = ap.parse_args()
-
-    layout_path = find_layout(args.layout)
-    print(f"• 來源 .layout：{layout_path}")
-
+class StageTimer:
+    """各階段耗時。平行跑的階段各自記錄（起點相對整次執行的開始）。"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stages = []   # (name, 起點 s, 耗時 s)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def __call__(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.stages.append((name, t0 - self.start, time.perf_counter() - t0))
+
+    @staticmethod
+    def _pad(name, width=16):
+        """中文字佔兩格，補到同樣的顯示寬度。"""
+        used = sum(2 if unicodedata.east_asian_width(c) in "WF" else 1 for c in name)
+        return name + " " * max(width - used, 0)
+
+    def report(self, json_path=None):
+        total = time.perf_counter() - self.start
+        print("• 各階段耗時：")
+        for name, at, dur in sorted(self.stages, key=lambda s: s[1]):
+            print(f"    {self._pad(name)}{dur * 1000:>10.1f} ms   @{at * 1000:>8.1f} ms")
+        print(f"    {self._pad('總計')}{total * 1000:>10.1f} ms")
+        if json_path:
+            data = json.dumps({
+                "total_ms": round(total * 1000, 1),
+                "stages": [{"name": n, "start_ms": round(a * 1000, 1), "ms": round(d * 1000, 1)}
+                           for n, a, d in self.stages]}, ensure_ascii=False, indent=2)
+            if json_path == "-":
+                print(data)
+            else:
+                Path(json_path).write_text(data + "\n")
+
+
+def layout_table(revision):
+    """矩陣 → LAYOUT_all 的取值順序 + VIA → QMK 名稱對照，依 qmk_firmware
+    revision 快取在 LAYOUT_CACHE（info.json 只在 revision 變了才重讀）。
+
+    {"key", "gather": [VIA 70 格裡的 index × 67], "translate": {VIA 名: QMK 名},
+     "deprecated": {VIA 名: 現行名}}
+    """
+    key = [revision, hashlib.sha256(json.dumps(CONV, sort_keys=True).encode()).hexdigest()]
+    if revision:
+        try:
+            table = json.loads(LAYOUT_CACHE.read_text())
+            if table["key"] == key:
+                return table
+        except (OSError, ValueError, KeyError):
+            pass
     if not QMK_INFO.is_file():
         die(f"找不到 {QMK_INFO} —— 先跑 ansible-playbook wsl.yml --tags qmk")
-
-    # LAYOUT_all 矩陣順序
     la = json.load(open(QMK_INFO))["layouts"]["LAYOUT_all"]["layout"]
-    mat_order = [(k["matrix"][0], k["matrix"][1]) for k in la]
-    if len(mat_order) != 67:
-        die(f"LAYOUT_all 應為 67 鍵，實際 {len(mat_order)}")
-
-    # VIA .layout（4 層 × 70，矩陣 row-major）
-    via = json.load(open(layout_path))["layers"]
-    if len(via) != 4 or any(len(l) != 70 for l in via):
-        die(f".layout 應為 4 層 × 70，實際 {[len(l) for l in via]}")
-
-    layers = [[CONV.get(vl[r * 14 + c], vl[r * 14 + c]) for (r, c) in mat_order]
-              for vl in via]
-
-    # 更新 xd60_qmk_keymap.json
-    jp = KB / "xd60_qmk_keymap.json"
-    j = json.load(open(jp))
-    j["notes"] = "XD60 rev2 - synced from VIA. 4 layers. Standard QMK + VIA."
-    j["layers"] = layers
-    json.dump(j, open(jp, "w"), indent=2, ensure_ascii=False)
-    open(jp, "a").write("\n")
-    print(f"• 已更新 {jp.name}")
-
-    # 更新 keymap.c
-    out = KEYMAP_C
-    for n in range(4):
-        out = out.replace("{L%d}" % n, fmt_layer(layers[n]))
-    (KB / "xd60_custom" / "keymap.c").write_text(out)
-    print("• 已更新 xd60_custom/keymap.c")
-
-    # 更新 repo 內的 .layout 備份
-    backup = KB / "xd60_via_keymap.layout"
-    if Path(layout_path).resolve() != backup.resolve():
-        shutil.copy(layout_path, backup)
-        print(f"• 已更新 {backup.name}")
-
-    # sync check
-    r = subprocess.run([sys.executable, str(KB / "tests/check_keymap_sync.py")])
-    if r.returncode != 0:
-        die("sync check 失敗")
+    gather = [k["matrix"][0] * 14 + k["matrix"][1] for k in la]
+    if len(gather) != 67:
+        die(f"LAYOUT_all 應為 67 鍵，實際 {len(gather)}")
+    return {"key": key, "gather": gather, "translate": {}, "deprecated": {}}
+
+
+def save_layout_table(table):
+    if not table["key"][0]:
+        return   # 沒有 revision 就不快取
+    try:
+        LAYOUT_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = LAYOUT_CACHE.with_suffix(".tmp")
+        tmp.write_text(json.dumps(table, ensure_ascii=False))
+        os.replace(tmp, LAYOUT_CACHE)
+    except OSError:
+        pass
+
+
+def translate_layers(via, table):
+    """VIA 4 × 70（矩陣序）→ 4 × 67（LAYOUT_all 序、現行 QMK 名）。
+
+    對照表沒見過的名稱才過 CONV + keycode 索引驗證（結果存回對照表）；
+    有查不到的 keycode 就 die，此時還沒寫任何檔案。
+    """
+    gather = itemgetter(*table["gather"])
+    raw = [gather(vl) for vl in via]
+    names = table["translate"]
+    missing = {n for layer in raw for n in layer} - names.keys()
+    if missing:
+        index = KeycodeIndex.load(QMK_HOME)
+        if index is None:
+            print("• 找不到 qmk_firmware keycode 定義，略過 keycode 驗證")
+        problems = {}
+        for name in sorted(missing):
+            conv = CONV.get(name, name)
+            new, problem = index.normalize(conv) if index else (conv, None)
+            if problem:
+                problems[name] = problem
+                continue
+            names[name] = new
+            if index and new != "".join(conv.split()):
+                table["deprecated"][name] = new
+        if problems:
+            errors = [f"Layer {n} 第 {pos} 鍵：{problems[k]}"
+                      for n, layer in enumerate(raw) for pos, k in enumerate(layer)
+                      if k in problems]
+            die("keycode 驗證失敗，未寫入任何檔案：\n  - " + "\n  - ".join(errors))
+        if index:
+            save_layout_table(table)
+    used = {n for layer in raw for n in layer}
+    for name, new in sorted(table["deprecated"].items()):
+        if name in used:
+            print(f"• {name} 已棄用 → {new}")
+    return [[names[n] for n in layer] for layer in raw]
+
+
+def compile_hex(should_cancel=None):
+    """qmk compile，輸出逐行轉印。回傳 True 成功；should_cancel() 為真時中止
+    （整個 process group，含 make/avr-gcc）並回傳 False。"""
+    proc = subprocess.Popen([str(QMK_BIN), "compile", "-kb", "xiudi/xd60/rev2",
+                             "-km", "xd60_custom"], cwd=QMK_HOME, start_new_session=True,
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            text=True, errors="replace")
+
+    def pump():
+        for line in proc.stdout:
+            print(f"  │ {line}", end="", flush=True)
+
+    reader = threading.Thread(target=pump, daemon=True)
+    reader.start()
+    try:
+        while True:
+            try:
+                proc.wait(timeout=WATCH_POLL_SEC)
+                break
+            except subprocess.TimeoutExpired:
+                if should_cancel and should_cancel():
+                    os.killpg(proc.pid, signal.SIGTERM)
+                    proc.wait()
+                    return False
+    except KeyboardInterrupt:
+        os.killpg(proc.pid, signal.SIGTERM)
+        raise
+    reader.join(1)
+    if proc.returncode != 0 or not QMK_HEX.is_file():
+        die("編譯失敗")
+    return True
+
+
+def sync(layout_path, args, should_cancel=None):
+    """.layout → repo 檔案 + sync check → 編譯 → 桌面。編譯被 should_cancel
+    中止時回傳 False。結尾印各階段耗時（--timing-json 另存 JSON）。"""
+    timer = StageTimer()
+    try:
+        return _sync(layout_path, args, should_cancel, timer)
+    finally:
+        timer.report(getattr(args, "timing_json", None))
+
+
+def _sync(layout_path, args, should_cancel, timer):
+    skipped = []
+    print(f"• 來源 .layout：{layout_path}")
+
+    def timed(name, fn, *a):
+        with timer(name):
+            return fn(*a)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        # qmk_firmware revision（git，最慢的前置）與讀 .layout 同時進行
+        revision_f = pool.submit(timed, "qmk revision", qmk_revision)
+
+        with timer("讀 .layout"):
+            # VIA .layout（4 層 × 70，矩陣 row-major）
+            via = json.load(open(layout_path))["layers"]
+            if len(via) != 4 or any(len(l) != 70 for l in via):
+                die(f".layout 應為 4 層 × 70，實際 {[len(l) for l in via]}")
+        revision = revision_f.result()
+
+        with timer("轉換 + 驗證"):
+            layers = translate_layers(via, layout_table(revision))
+
+        with timer("產生內容"):
+            jp = KB / "xd60_qmk_keymap.json"
+            j = json.load(open(jp))
+            j["notes"] = "XD60 rev2 - synced from VIA. 4 layers. Standard QMK + VIA."
+            j["layers"] = layers
+            text = json.dumps(j, indent=2, ensure_ascii=False) + "\n"
+            out = KEYMAP_C
+            for n in range(4):
+                out = out.replace("{L%d}" % n, fmt_layer(layers[n]))
+        kc = KB / "xd60_custom" / "keymap.c"
+        backup = KB / "xd60_via_keymap.layout"
+
+        def copy_backup():
+            if Path(layout_path).resolve() == backup.resolve():
+                return None
+            if args.force or not backup.is_file() or not filecmp.cmp(layout_path, backup, shallow=False):
+                shutil.copy(layout_path, backup)
+                return True
+            return False
+
+        # sync check 先跑（直接驗證記憶體裡的內容，幾毫秒）：不一致就不寫任何檔案
+        result = timed("sync check", verify, KB.name, text, out)
+        report(result)
+        if not result.ok:
+            die("sync check 失敗")
+
+        # 驗過才同時寫三個檔案
+        writes = {
+            jp.name: pool.submit(timed, "寫 JSON", write_if_changed, jp, text, args.force),
+            "xd60_custom/keymap.c": pool.submit(timed, "寫 keymap.c", write_if_changed, kc, out, args.force),
+            backup.name: pool.submit(timed, "備份 .layout", copy_backup),
+        }
+        for name, future in writes.items():
+            updated = future.result()
+            if updated:
+                print(f"• 已更新 {name}")
+            elif updated is False:
+                skipped.append(name.rsplit("/", 1)[-1])
 
     if args.no_compile:
+        if skipped:
+            print(f"• 內容未變、略過：{', '.join(skipped)}")
         print("✓ 同步完成（--no-compile，未編譯）")
-        return
-
-    # 編譯
-    if not QMK_BIN.is_file():
-        die(f"找不到 {QMK_BIN}")
-    print("• 編譯中…")
-    r = subprocess.run([str(QMK_BIN), "compile", "-kb", "xiudi/xd60/rev2",
-                        "-km", "xd60_custom"], cwd=QMK_HOME)
-    if r.returncode != 0 or not QMK_HEX.is_file():
-        die("編譯失敗")
+        return True
+
+    # 編譯（同一份輸入 → 快取的 .hex）
+    key = build_key(out, revision) if revision else None
+    cached = BUILD_CACHE / f"{key}.hex" if key else None
+    if cached and cached.is_file() and not args.force:
+        hex_path = cached
+        skipped.append(f"qmk compile（快取 {key[:12]}）")
+    else:
+        if not QMK_BIN.is_file():
+            die(f"找不到 {QMK_BIN}")
+        print("• 編譯中…")
+        with timer("qmk compile"):
+            done = compile_hex(should_cancel)
+        if not done:
+            print("• 有新的匯出，中止這次編譯")
+            return False
+        hex_path = QMK_HEX
+        if key:
+            cache_store(QMK_HEX, key)
+        else:
+            print("• 取不到 qmk_firmware revision，這次的 .hex 不進快取")
 
     # 複製 .hex 到桌面
-    if DESKTOP.is_dir():
-        shutil.copy(QMK_HEX, DESKTOP / "xd60_custom.hex")
-        print(f"• .hex 已複製到桌面：{DESKTOP / 'xd60_custom.hex'}")
-    else:
-        print(f"• .hex 在 {QMK_HEX}（找不到桌面資料夾）")
+    with timer("複製 .hex"):
+        if DESKTOP.is_dir():
+            dest = DESKTOP / "xd60_custom.hex"
+            if args.force or not dest.is_file() or not filecmp.cmp(hex_path, dest, shallow=False):
+                shutil.copy(hex_path, dest)
+                print(f"• .hex 已複製到桌面：{dest}")
+            else:
+                skipped.append("桌面 .hex（相同）")
+        else:
+            print(f"• .hex 在 {hex_path}（找不到桌面資料夾）")
+
+    if skipped:
+        print(f"• 內容未變、略過：{', '.join(skipped)}")
 
     print("✓ 全部完成。檢查無誤後 git commit;要更新韌體再用 QMK Toolbox 燒桌面的 .hex。")
+    return True
+
+
+def watch(args):
+    if not VIA_DIR.is_dir():
+        die(f"找不到 VIA 匯出資料夾：{VIA_DIR}")
+    index = LayoutIndex(VIA_DIR)
+    done = None   # 最後處理過的 (path, sig)
+    print(f"• 監看 {VIA_DIR}（Ctrl-C 結束）")
+    while True:
+        index.poll()
+        latest = index.stable()
+        if latest and latest != done:
+            done = latest
+
+            def newer():
+                index.poll()
+                return index.stable() not in (None, done)
+
+            try:
+                sync(latest[0], args, should_cancel=newer)
+            except SystemExit as e:   # die()：印出原因，繼續等下一次匯出
+                print(e.code if isinstance(e.code, str) else "✗ 同步失敗")
+            print("• 等待下一次匯出…")
+            continue   # 可能已經有更新的匯出在等，不用睡
+        time.sleep(WATCH_POLL_SEC)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="同步 VIA .layout 回 repo 並編譯")
+    ap.add_argument("layout", nargs="?", help="VIA .layout 路徑（省略則抓最新的）")
+    ap.add_argument("--no-compile", action="store_true", help="只同步，不編譯")
+    ap.add_argument("--force", action="store_true", help="無視快取：一律重寫檔案並重新編譯")
+    ap.add_argument("--watch", action="store_true", help="常駐監看 VIA_DIR，有新匯出就自動同步")
+    ap.add_argument("--timing-json", metavar="PATH", help="各階段耗時另存 JSON（- = stdout）")
+    args = ap.parse_args()
+
+    if args.watch:
+        if args.layout:
+            die("--watch 監看 VIA_DIR，不接受 .layout 路徑")
+        try:
+            watch(args)
+        except KeyboardInterrupt:
+            print()
+        return
+    sync(find_layout(args.layout), args)
 
 
 if __name__ == "__main__":
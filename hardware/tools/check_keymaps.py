@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""keymap 同步守門（所有 hardware/kb_* 鍵盤）。
+
+每個 kb_* 目錄裡找 QMK keymap JSON（頂層有 "layout" + "layers" 的 *.json），
+驗證對應 <keymap>/keymap.c 的每個 LAYOUT_xxx(...) 與 JSON 逐層逐鍵一致。
+層數、每層鍵數都取自 JSON，不寫死。
+
+- keymap.c 一次 regex 掃描切 token：註解、字串、字元常數各自成 token，
+  註解/字串裡的 LAYOUT_all( 不會被誤認；MO(1)、LT(2, KC_A) 這類巢狀
+  macro 依括號深度整顆保留（去掉空白後比對）。
+- 結果以（JSON + keymap.c + 本檔）內容的 sha256 快取在 CACHE_FILE，
+  沒改過的鍵盤不重驗 —— pre-commit 幾乎零成本。
+- 需要重驗的鍵盤超過一個時丟進 process pool 平行跑。
+
+用法：
+  python3 hardware/tools/check_keymaps.py              # 全部 kb_*
+  python3 hardware/tools/check_keymaps.py hardware/kb_XD60 --no-cache
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+HARDWARE = Path(__file__).resolve().parents[1]
+CACHE_FILE = Path.home() / ".cache/keymap_check.json"
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+      (?P<comment>//[^\n]*|/\*.*?\*/)
+    | (?P<string>"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*')
+    | (?P<word>\w+)
+    | (?P<punct>\S)
+    )
+""", re.DOTALL | re.VERBOSE)
+
+
+class Result(NamedTuple):
+    name: str
+    errors: list
+    layers: int
+    keys: int
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def lex(src: str):
+    """C 原始碼 → (kind, text) 串流，註解與空白不輸出。"""
+    for m in _TOKEN.finditer(src):
+        kind = m.lastgroup
+        if kind is not None and kind != "comment":
+            yield kind, m.group(kind)
+
+
+def layout_layers(src: str, macro: str) -> list[list[str]]:
+    """每個 macro( ... ) 呼叫的參數（深度 0 的逗號切開，token 直接相接）。"""
+    layers, keys, cur = [], None, []
+    depth, prev = 0, None
+    for kind, text in lex(src):
+        if keys is None:                       # 找 macro(
+            if text == "(" and prev == macro:
+                keys, cur, depth = [], [], 0
+            prev = text if kind == "word" else None
+            continue
+        if text == "(":
+            depth += 1
+        elif text == ")":
+            if depth == 0:
+                if cur:
+                    keys.append("".join(cur))
+                layers.append(keys)
+                keys, prev = None, None
+                continue
+            depth -= 1
+        elif text == "," and depth == 0:
+            keys.append("".join(cur))
+            cur = []
+            continue
+        cur.append(text)
+    return layers
+
+
+def find_keymap(kb_dir: Path):
+    """(QMK keymap JSON, keymap.c)；找不到回 (None, None)。"""
+    for jp in sorted(kb_dir.glob("*.json")):
+        try:
+            data = json.loads(jp.read_text())
+        except (OSError, ValueError):
+            continue
+        if isinstance(data, dict) and "layout" in data and isinstance(data.get("layers"), list):
+            kc = kb_dir / str(data.get("keymap", "")) / "keymap.c"
+            if not kc.is_file():
+                kc = next(iter(sorted(kb_dir.glob("*/keymap.c"))), None)
+            return jp, kc
+    return None, None
+
+
+def discover(root: Path = HARDWARE) -> list[Path]:
+    return sorted(p for p in root.glob("kb_*") if p.is_dir())
+
+
+def verify(name: str, json_text: str, c_text: str) -> Result:
+    data = json.loads(json_text)
+    macro = data["layout"]
+    json_layers = [["".join(k.split()) for k in layer] for layer in data["layers"]]
+    layer_count = len(json_layers)
+    keys = len(json_layers[0]) if json_layers else 0
+    c_layers = layout_layers(c_text, macro)
+
+    errors = []
+    if any(len(layer) != keys for layer in json_layers):
+        errors.append(f"JSON 各層鍵數不一：{[len(l) for l in json_layers]}")
+    if len(c_layers) != layer_count:
+        errors.append(f"keymap.c 有 {len(c_layers)} 個 {macro}，JSON 為 {layer_count} 層")
+    for n, (cl, jl) in enumerate(zip(c_layers, json_layers)):
+        if len(cl) != len(jl):
+            errors.append(f"Layer {n}: keymap.c 有 {len(cl)} 鍵，JSON 為 {len(jl)}")
+        for pos, (c, j) in enumerate(zip(cl, jl)):
+            if c != j:
+                errors.append(f"Layer {n} 第 {pos} 鍵不符：keymap.c={c!r} JSON={j!r}")
+    return Result(name, errors, layer_count, keys)
+
+
+def _self_hash() -> str:
+    return hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+
+
+def _load_cache() -> dict:
+    try:
+        return json.loads(CACHE_FILE.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache: dict) -> None:
+    try:
+        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = CACHE_FILE.with_suffix(".tmp")
+        tmp.write_text(json.dumps(cache))
+        os.replace(tmp, CACHE_FILE)
+    except OSError:
+        pass
+
+
+def _verify_job(job):
+    return verify(*job)
+
+
+def check(kb_dirs=None, use_cache=True, jobs=None) -> list[Result]:
+    kb_dirs = discover() if kb_dirs is None else [Path(d) for d in kb_dirs]
+    cache = _load_cache() if use_cache else {}
+    version = _self_hash()
+    results, pending = {}, []
+    for kb in kb_dirs:
+        name = kb.name
+        jp, kc = find_keymap(kb)
+        if jp is None or kc is None:
+            results[name] = Result(name, [f"{kb} 找不到 QMK keymap JSON 或 keymap.c"], 0, 0)
+            continue
+        json_text, c_text = jp.read_text(), kc.read_text()
+        key = hashlib.sha256("\0".join((version, json_text, c_text)).encode()).hexdigest()
+        hit = cache.get(name)
+        if hit and hit["key"] == key:
+            results[name] = Result(name, hit["errors"], hit["layers"], hit["keys"], cached=True)
+        else:
+            pending.append((key, (name, json_text, c_text)))
+
+    if len(pending) > 1 and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            fresh = list(pool.map(_verify_job, [job for _, job in pending]))
+    else:
+        fresh = [_verify_job(job) for _, job in pending]
+    for (key, _), r in zip(pending, fresh):
+        results[r.name] = r
+        cache[r.name] = {"key": key, "errors": r.errors, "layers": r.layers, "keys": r.keys}
+    if use_cache and pending:
+        _save_cache(cache)
+    return [results[kb.name] for kb in kb_dirs]
+
+
+def report(result: Result) -> None:
+    if result.ok:
+        note = "（快取）" if result.cached else ""
+        print(f"OK: {result.name} keymap.c 與 JSON 同步"
+              f"（{result.layers} 層 × {result.keys} 鍵）{note}")
+    else:
+        print(f"FAIL: {result.name} keymap.c 與 JSON 不同步", file=sys.stderr)
+        for e in result.errors:
+            print(f"  - {e}", file=sys.stderr)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="驗證所有 kb_* 的 keymap.c 與 QMK JSON 一致")
+    ap.add_argument("keyboards", nargs="*", help="kb_* 目錄（省略 = hardware/ 下全部）")
+    ap.add_argument("--no-cache", action="store_true", help="忽略快取，全部重驗")
+    ap.add_argument("-j", "--jobs", type=int, default=None, help="平行 process 數")
+    args = ap.parse_args(argv)
+
+    results = check(args.keyboards or None, use_cache=not args.no_cache, jobs=args.jobs)
+    if not results:
+        print(f"FAIL: {HARDWARE} 下沒有 kb_* 鍵盤", file=sys.stderr)
+        return 1
+    for r in results:
+        report(r)
+    return 0 if all(r.ok for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""QMK keycode 索引 —— 編譯前先驗證 keymap 裡的每個 keycode。
+
+從本機 ~/qmk_firmware 建一次索引，之後從快取讀：
+  - quantum/*.h（含 keycodes.h 產生的 enum）：合法的 keycode 名、#define 別名、
+    MO()/LT()/S() 這類 function-like macro
+  - quantum/quantum_keycodes_legacy.h：棄用別名 → 現行名稱
+  - data/constants/keycodes/*.hjson：key / aliases
+快取在 CACHE_FILE，以上述檔案的 (mtime, size) 當失效 key —— qmk_firmware
+更新後自動重建。
+
+validate_layers() 只花幾毫秒：棄用別名直接換成現行名稱（並列出來），
+不存在的 keycode 附上最可能的正確名稱 —— 不用等 qmk compile 跑完才發現，
+sync_from_via.py 的 CONV 表也不必手動追 QMK 的改名。
+
+用法：
+  python3 hardware/tools/qmk_keycodes.py KC_MS_BTN1 RGB_TOG "LT(2, KC_A)"
+"""
+
+import difflib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+QMK_HOME = Path.home() / "qmk_firmware"
+CACHE_FILE = Path.home() / ".cache/qmk_keycode_index.json"
+INDEX_VERSION = 1
+
+_ENUM = re.compile(r"^\s*([A-Z][A-Z0-9_]*)\s*=\s*0x[0-9A-Fa-f]+", re.M)
+_DEFINE = re.compile(r"^\s*#\s*define\s+([A-Z][A-Z0-9_]*)(\()?[ \t]*([A-Za-z_]\w*)?", re.M)
+_HJSON_NAMES = re.compile(r"\"?(?:key|aliases)\"?\s*:\s*(\[[^\]]*\]|\"[^\"]*\")")
+_IDENT = re.compile(r"[A-Za-z_]\w*")
+_NUMBER = re.compile(r"^(?:0[xX][0-9A-Fa-f]+|\d+)[uUlL]*$")
+_CALL = re.compile(r"^([A-Za-z_]\w*)\((.*)\)$", re.S)
+
+
+def _sources(qmk_home: Path) -> list[Path]:
+    files = sorted((qmk_home / "quantum").glob("*.h"))
+    files += sorted((qmk_home / "data/constants/keycodes").glob("*.hjson"))
+    return files
+
+
+def _source_key(files: list[Path]) -> list:
+    key = [INDEX_VERSION]
+    for f in files:
+        st = f.stat()
+        key.append([str(f), st.st_mtime_ns, st.st_size])
+    return key
+
+
+def _split_args(text: str) -> list[str]:
+    """逗號切參數（只切深度 0 的逗號）。"""
+    args, depth, start = [], 0, 0
+    for i, c in enumerate(text):
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "," and depth == 0:
+            args.append(text[start:i])
+            start = i + 1
+    args.append(text[start:])
+    return [a.strip() for a in args]
+
+
+class KeycodeIndex:
+    def __init__(self, names, functions, deprecated):
+        self.names = set(names)            # 合法 keycode / 別名
+        self.functions = set(functions)    # MO、LT、S … function-like macro
+        self.deprecated = dict(deprecated)  # 棄用別名 → 指向的名稱
+
+    @classmethod
+    def build(cls, qmk_home: Path = QMK_HOME) -> "KeycodeIndex":
+        names, functions, deprecated = set(), set(), {}
+        for f in _sources(qmk_home):
+            text = f.read_text(errors="replace")
+            if f.suffix == ".hjson":
+                for group in _HJSON_NAMES.findall(text):
+                    names.update(_IDENT.findall(group))
+                continue
+            names.update(_ENUM.findall(text))
+            legacy = "legacy" in f.name
+            for name, call, target in _DEFINE.findall(text):
+                if call:
+                    functions.add(name)
+                elif legacy and target:
+                    deprecated[name] = target
+                else:
+                    names.add(name)
+        names.update(deprecated)
+        return cls(names, functions, deprecated)
+
+    @classmethod
+    def load(cls, qmk_home: Path = QMK_HOME, cache_file: Path = CACHE_FILE):
+        """快取有效就讀快取，否則重建並寫回。qmk_firmware 不在回 None。"""
+        files = _sources(qmk_home)
+        if not files:
+            return None
+        key = _source_key(files)
+        try:
+            data = json.loads(cache_file.read_text())
+            if data["key"] == key:
+                return cls(data["names"], data["functions"], data["deprecated"])
+        except (OSError, ValueError, KeyError):
+            pass
+        index = cls.build(qmk_home)
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cache_file.with_suffix(".tmp")
+            tmp.write_text(json.dumps({
+                "key": key, "names": sorted(index.names),
+                "functions": sorted(index.functions), "deprecated": index.deprecated}))
+            os.replace(tmp, cache_file)
+        except OSError:
+            pass
+        return index
+
+    def current(self, name: str) -> str:
+        """棄用別名一路解到現行名稱（不是別名就原樣回傳）。"""
+        seen = set()
+        while name in self.deprecated and name not in seen:
+            seen.add(name)
+            name = self.deprecated[name]
+        return name
+
+    def suggest(self, name: str) -> str | None:
+        """不存在的 keycode → 最可能的現行名稱。"""
+        bare = name[3:] if name.startswith(("KC_", "QK_")) else name
+        for cand in (bare, "KC_" + bare, "QK_" + bare, "MS_" + bare):
+            if cand != name and cand in self.names:
+                return self.current(cand)
+        close = difflib.get_close_matches(name, self.names, n=1, cutoff=0.75)
+        return self.current(close[0]) if close else None
+
+    def normalize(self, key: str):
+        """(換成現行名稱後的 key, 問題描述或 None)。"""
+        key = "".join(key.split())
+        if _NUMBER.match(key):
+            return key, None
+        m = _CALL.match(key)
+        if m:
+            func, args = m.groups()
+            if func not in self.functions:
+                return key, f"{func}() 不是 QMK macro"
+            fixed = []
+            for arg in _split_args(args):
+                arg, problem = self.normalize(arg)
+                if problem:
+                    return key, problem
+                fixed.append(arg)
+            return f"{func}({','.join(fixed)})", None
+        if key not in self.names:
+            hint = self.suggest(key)
+            return key, f"{key} 不存在" + (f"，是不是 {hint}？" if hint else "")
+        return self.current(key), None
+
+    def validate_layers(self, layers):
+        """→ (換過名稱的 layers, [棄用提示], [錯誤])。"""
+        fixed_layers, renamed, errors = [], {}, []
+        for n, layer in enumerate(layers):
+            fixed = []
+            for pos, key in enumerate(layer):
+                new, problem = self.normalize(key)
+                if problem:
+                    errors.append(f"Layer {n} 第 {pos} 鍵：{problem}")
+                elif new != "".join(key.split()):
+                    renamed[key] = new
+                fixed.append(new if not problem else key)
+            fixed_layers.append(fixed)
+        notes = [f"{old} 已棄用 → {new}" for old, new in sorted(renamed.items())]
+        return fixed_layers, notes, errors
+
+
+def main(argv=None) -> int:
+    keys = sys.argv[1:] if argv is None else argv
+    index = KeycodeIndex.load()
+    if index is None:
+        print(f"找不到 {QMK_HOME}", file=sys.stderr)
+        return 1
+    print(f"索引：{len(index.names)} 個 keycode、{len(index.functions)} 個 macro、"
+          f"{len(index.deprecated)} 個棄用別名")
+    status = 0
+    for key in keys:
+        new, problem = index.normalize(key)
+        if problem:
+            status = 1
+        print(f"{key}: {problem or ('OK' if new == ''.join(key.split()) else f'→ {new}')}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
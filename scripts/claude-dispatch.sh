@@ -30,8 +30,15 @@ fi
 # 從 stdin 讀取 hook JSON（非阻塞，可能為空）
 INPUT=$(timeout 1 cat 2>/dev/null || true)
 
-# ── LED 狀態機（背景） ──
-echo "$INPUT" | (timeout 5 "$SCRIPT_DIR/claude-hook.sh" "$EVENT" "$MATCHER" "$PROJECT" "$WINDOW_IDX" || true) &>/dev/null &
+# ── LED 狀態機 ──
+# 常駐 daemon（python -m state_reader hookd）在跑 → 送一個 datagram 即返回；
+# 沒有 daemon / socat 或送失敗 → 照舊背景 fork claude-hook.sh
+HOOKD_SOCKET="${CLAUDE_HOOKD_SOCKET:-/tmp/claude-hookd.sock}"
+if ! { [ -S "$HOOKD_SOCKET" ] && command -v socat >/dev/null 2>&1 \
+        && printf '%s\t%s\t%s\t%s\t%s\n' "$EVENT" "$MATCHER" "$PROJECT" "$WINDOW_IDX" "${TMUX:-}" \
+           | socat -u - "UNIX-SENDTO:$HOOKD_SOCKET" 2>/dev/null; }; then
+    echo "$INPUT" | (timeout 5 "$SCRIPT_DIR/claude-hook.sh" "$EVENT" "$MATCHER" "$PROJECT" "$WINDOW_IDX" || true) &>/dev/null &
+fi
 
 # ── 音效決策（所有音效邏輯集中於此） ──
 MELODY=""
@@ -16,20 +16,34 @@ MATCHER="${2:-}"
 PROJECT="${3:-default}"
 WINDOW_IDX="${4:-}"
 
-ACTIVITY_FILE="/tmp/claude-activity-${PROJECT}"
+# 狀態檔目錄（benchmark 指到暫存目錄，避免假專案出現在 overlay / history）
+TMP_DIR="${CLAUDE_TMP_DIR:-/tmp}"
+ACTIVITY_FILE="${TMP_DIR}/claude-activity-${PROJECT}"
 
 # 記錄活動時間戳（在鎖之前，確保 catch-all hook 搶到鎖也能更新）
 date +%s > "$ACTIVITY_FILE"
 
+# 二進位狀態表（claude-overlay/status_table.py，overlay SOURCE="table" 讀它）
+# 平常由常駐 hookd 在行程內寫；這裡只是沒有 daemon 時的備援，CLAUDE_STATUS_TABLE=1 才寫。
+# 每個事件只在結束時跑一次 python（活動時間 + 新狀態一起寫），背景執行不拖慢 hook，
+# 且關掉 fd 200 以免占住 flock。背景計時器的 subshell 不繼承 EXIT trap
+STATUS_TABLE_PY="$(dirname "$0")/../claude-overlay/status_table.py"
+status_table() {
+    [ "${CLAUDE_STATUS_TABLE:-}" = 1 ] || return 0
+    python3 "$STATUS_TABLE_PY" --no-legacy "$@" >/dev/null 2>&1 200>&- &
+}
+TABLE_STATE=""
+trap 'status_table touch "$PROJECT" $TABLE_STATE' EXIT
+
 # 從 stdin 讀取 JSON（非阻塞，可能為空）
 INPUT=$(cat)
 
 # 檔案鎖：防止多個 Hook 同時讀寫狀態檔造成競爭（per-project）
-exec 200>/tmp/claude-led-${PROJECT}.lock
+exec 200>"${TMP_DIR}/claude-led-${PROJECT}.lock"
 flock -n 200 || exit 0
 
-STATE_FILE="/tmp/claude-led-state-${PROJECT}"
-IDLE_PENDING="/tmp/claude-idle-pending-${PROJECT}"
+STATE_FILE="${TMP_DIR}/claude-led-state-${PROJECT}"
+IDLE_PENDING="${TMP_DIR}/claude-idle-pending-${PROJECT}"
 
 # ─── 事件→狀態映射 ───────────────────────────────────
 
@@ -87,7 +101,7 @@ fi
 
 # ─── 2 秒去重 ─────────────────────────────────────────
 
-DEDUP_FILE="/tmp/claude-led-dedup-${PROJECT}"
+DEDUP_FILE="${TMP_DIR}/claude-led-dedup-${PROJECT}"
 NOW=$(date +%s)
 
 if [ "$CURRENT_STATE" = "$NEW_STATE" ] && [ -f "$DEDUP_FILE" ]; then
@@ -106,6 +120,7 @@ echo "$NOW" > "$DEDUP_FILE"
 # ─── 狀態切換 ─────────────────────────────────────────
 
 echo "$NEW_STATE" > "$STATE_FILE"
+TABLE_STATE="$NEW_STATE"
 
 # RUNNING 時清除 idle-pending（新訊息進來，取消回 idle 計時）
 if [ "$NEW_STATE" = "RUNNING" ]; then
@@ -121,6 +136,7 @@ if [ "$NEW_STATE" = "RUNNING" ]; then
             NOW=$(date +%s)
             if [ $((NOW - ${LAST:-0})) -ge 60 ]; then
                 echo "IDLE" > "$STATE_FILE"
+                status_table set "$PROJECT" IDLE
                 [ -n "$WINDOW_IDX" ] && tmux set-window-option -t ":$WINDOW_IDX" @claude_state "idle" 2>/dev/null || true
                 exit 0
             fi
@@ -145,6 +161,7 @@ if [ "$EVENT" = "Stop" ]; then
         sleep 22
         if [ -f "$IDLE_PENDING" ]; then
             echo "IDLE" > "$STATE_FILE"
+            status_table set "$PROJECT" IDLE
             if [ -n "$WINDOW_IDX" ]; then
                 tmux set-window-option -t ":$WINDOW_IDX" @claude_state "idle" 2>/dev/null || true
             fi
@@ -9,6 +9,13 @@ TARGET_CWD="${1:?missing cwd}"
 PROJECT_KEY="${2:?missing project key}"
 START_EPOCH="${3:-$(date +%s)}"
 SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+
+# Python 版（增量索引 + byte offset tail，不隨 sessions 目錄變大而變慢）優先
+CODEX_WATCH_PY="$SCRIPT_DIR/../claude-overlay/codex_watch.py"
+if [ -z "${CODEX_WATCH_BASH:-}" ] && command -v python3 >/dev/null 2>&1 && [ -f "$CODEX_WATCH_PY" ]; then
+    exec python3 "$CODEX_WATCH_PY" "$TARGET_CWD" "$PROJECT_KEY" "$START_EPOCH"
+fi
+
 SESSIONS_DIR="${CODEX_HOME:-$HOME/.codex}/sessions"
 DISCOVERY_WINDOW="${CODEX_DISCOVERY_WINDOW:-180}"
 DISCOVERY_TIMEOUT="${CODEX_DISCOVERY_TIMEOUT:-20}"
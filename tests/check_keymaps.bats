@@ -0,0 +1,84 @@
+#!/usr/bin/env bats
+# check_keymaps.bats - K1-K5: keymap.c ↔ QMK JSON 守門（hardware/tools/check_keymaps.py）
+#
+# 每個 @test 在暫存目錄做一個假鍵盤 kb_test：kb_test.json + default/keymap.c
+
+CHECK="$(cd "$(dirname "$BATS_TEST_FILENAME")/../hardware/tools" && pwd)/check_keymaps.py"
+
+setup() {
+    KB="$(mktemp -d)/kb_test"
+    mkdir -p "$KB/default"
+    cat > "$KB/kb_test.json" <<'EOF'
+{
+  "keyboard": "test",
+  "keymap": "default",
+  "layout": "LAYOUT_all",
+  "layers": [
+    ["KC_ESC", "LT(2, KC_A)", "MO(1)", "KC_B"],
+    ["KC_TRNS", "LCTL(KC_C)", "KC_TRNS", "LT(2,LSFT(KC_D))"]
+  ]
+}
+EOF
+}
+
+teardown() {
+    rm -rf "$(dirname "$KB")"
+}
+
+# keymap <layer 1 的內容> → default/keymap.c（layer 0 固定，前面帶註解/字串陷阱）
+keymap() {
+    cat > "$KB/default/keymap.c" <<EOF
+#include QMK_KEYBOARD_H
+// 舊版：LAYOUT_all(KC_NO, KC_NO)
+/* 多行註解裡也有
+   LAYOUT_all(KC_X, KC_Y, KC_Z) */
+static const char *help = "LAYOUT_all(KC_Q, \"(\", KC_W)";
+static const char paren = ')';
+
+const uint16_t PROGMEM keymaps[][MATRIX_ROWS][MATRIX_COLS] = {
+    [0] = LAYOUT_all(
+        KC_ESC,  LT(2, KC_A), /* 行內註解, 有逗號 */ MO(1),
+        KC_B
+    ),
+$1
+};
+EOF
+}
+
+check() {
+    python3 "$CHECK" "$KB" --no-cache
+}
+
+@test "K1: 註解/字串裡的 LAYOUT_all( 不算，巢狀 macro 整顆比對" {
+    keymap '    [1] = LAYOUT_all(KC_TRNS, LCTL( KC_C ), KC_TRNS, LT(2, LSFT(KC_D)))'
+    run check
+    [ "$status" -eq 0 ]
+    [ "$output" = "OK: kb_test keymap.c 與 JSON 同步（2 層 × 4 鍵）" ]
+}
+
+@test "K2: 層數不符 → 報錯" {
+    keymap ''
+    run check
+    [ "$status" -eq 1 ]
+    [ "${lines[0]}" = "FAIL: kb_test keymap.c 與 JSON 不同步" ]
+    [ "${lines[1]}" = "  - keymap.c 有 1 個 LAYOUT_all，JSON 為 2 層" ]
+}
+
+@test "K3: 鍵數不符 → 報錯" {
+    keymap '    [1] = LAYOUT_all(KC_TRNS, LCTL(KC_C), LT(2, LSFT(KC_D)))'
+    run check
+    [ "$status" -eq 1 ]
+    [ "${lines[1]}" = "  - Layer 1: keymap.c 有 3 鍵，JSON 為 4" ]
+}
+
+@test "K4: 巢狀 macro 參數不同 → 指出哪一鍵" {
+    keymap '    [1] = LAYOUT_all(KC_TRNS, LCTL(KC_C), KC_TRNS, LT(3, LSFT(KC_D)))'
+    run check
+    [ "$status" -eq 1 ]
+    [ "${lines[1]}" = "  - Layer 1 第 3 鍵不符：keymap.c='LT(3,LSFT(KC_D))' JSON='LT(2,LSFT(KC_D))'" ]
+}
+
+@test "K5: repo 裡的鍵盤都同步" {
+    run python3 "$CHECK" --no-cache
+    [ "$status" -eq 0 ]
+}
@@ -0,0 +1,118 @@
+#!/usr/bin/env bats
+# overlay_codex_watch.bats - X1-X2: codex_watch.py 對齊 codex-session-watch.sh
+#
+# X1: line_events() 和 bash 版 handle_line 對同一批 JSONL 送出相同事件
+# X2: JsonlTailer 半行、截斷、輪替（新 inode）
+
+OVERLAY_DIR="$(cd "$(dirname "$BATS_TEST_FILENAME")/../claude-overlay" && pwd)"
+WATCH_SH="$(cd "$(dirname "$BATS_TEST_FILENAME")/../scripts" && pwd)/codex-session-watch.sh"
+
+setup() {
+    TMP="$(mktemp -d)"
+    cat > "$TMP/lines.jsonl" <<'EOF'
+{"type":"session_meta","payload":{"cwd":"/work/x","timestamp":"2025-01-01T00:00:00Z"}}
+{"type":"event_msg","payload":{"type":"task_started"}}
+{"type":"event_msg","payload":{"type":"user_message","message":"hi"}}
+{"type":"event_msg","payload":{"type":"agent_message","message":"ok"}}
+{"type":"response_item","payload":{"type":"function_call","arguments":"{\"cmd\":[\"rm\"],\"sandbox_permissions\":\"require_escalated\"}"}}
+{"type":"response_item","payload":{"type":"function_call","arguments":"{\"cmd\":[\"ls\"]}"}}
+{"type":"response_item","payload":{"type":"function_call","arguments":"not json"}}
+{"type":"response_item","payload":{"type":"function_call_output","output":"..."}}
+{"type":"response_item","payload":{"type":"message"}}
+{"type":"event_msg","payload":{"type":"task_complete"}}
+not json at all
+{"type":"event_msg"}
+EOF
+}
+
+teardown() {
+    rm -rf "$TMP"
+}
+
+# 每行輸入印一行事件（"Event/matcher" 以空白分隔，沒有就印 -）
+events_bash() {
+    eval "$(sed -n '/^handle_line() {/,/^}/p' "$WATCH_SH")"
+    dispatch() { printf '%s/%s ' "$1" "${2:-}"; }
+    local line out
+    while IFS= read -r line; do
+        out=$(handle_line "$line")
+        out="${out% }"
+        echo "${out:--}"
+    done < "$1"
+}
+
+events_py() {
+    (cd "$OVERLAY_DIR" && python3 - "$1" <<'EOF'
+import sys
+from codex_watch import line_events
+
+with open(sys.argv[1]) as f:
+    for line in f:
+        out = " ".join(f"{event}/{matcher}" for event, matcher in line_events(line))
+        print(out or "-")
+EOF
+    )
+}
+
+# tail_session <tmp> → 每次 read_lines() 的事件
+tail_session() {
+    (cd "$OVERLAY_DIR" && python3 - "$1" <<'EOF'
+import os, sys
+from codex_watch import JsonlTailer, line_events
+
+path = os.path.join(sys.argv[1], "rollout.jsonl")
+START = b'{"type":"event_msg","payload":{"type":"task_started"}}\n'
+DONE = b'{"type":"event_msg","payload":{"type":"task_complete"}}\n'
+TOOL = b'{"type":"response_item","payload":{"type":"function_call_output"}}\n'
+
+
+def append(data):
+    with open(path, "ab") as f:
+        f.write(data)
+
+
+def read():
+    events = [e for line in tailer.read_lines() for e in line_events(line)]
+    print(" ".join(f"{event}/{matcher}" for event, matcher in events) or "-")
+
+
+tailer = JsonlTailer(path)
+read()                      # 檔案還不存在
+append(START + DONE[:20])   # 後一行只寫了一半
+read()
+read()                      # 沒有新 bytes
+append(DONE[20:] + TOOL)    # 補完 + 下一行
+read()
+with open(path, "wb") as f:  # 截斷後重寫（比 offset 短）
+    f.write(DONE)
+read()
+os.rename(path, path + ".1")  # 輪替：新檔案（新 inode），比舊 offset 長
+append(START + TOOL + TOOL + DONE)
+read()
+EOF
+    )
+}
+
+@test "X1: line_events 和 handle_line 送出相同事件" {
+    run events_bash "$TMP/lines.jsonl"
+    [ "$status" -eq 0 ]
+    expected="$output"
+    [ "${lines[1]}" = "UserPromptSubmit/" ]
+    [ "${lines[4]}" = "PermissionRequest/" ]
+    [ "${lines[7]}" = "PostToolUse/AskUserQuestion" ]
+    [ "${lines[9]}" = "Stop/" ]
+    run events_py "$TMP/lines.jsonl"
+    [ "$status" -eq 0 ]
+    [ "$output" = "$expected" ]
+}
+
+@test "X2: JsonlTailer 只吐完整行，截斷/輪替後從頭讀" {
+    run tail_session "$TMP"
+    [ "$status" -eq 0 ]
+    [ "${lines[0]}" = "-" ]
+    [ "${lines[1]}" = "UserPromptSubmit/" ]
+    [ "${lines[2]}" = "-" ]
+    [ "${lines[3]}" = "Stop/ PostToolUse/AskUserQuestion" ]
+    [ "${lines[4]}" = "Stop/" ]
+    [ "${lines[5]}" = "UserPromptSubmit/ PostToolUse/AskUserQuestion PostToolUse/AskUserQuestion Stop/" ]
+}
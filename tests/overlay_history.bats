@@ -0,0 +1,53 @@
+#!/usr/bin/env bats
+# overlay_history.bats - H1-H2: overlay 重啟不把停機時間算給上一個狀態
+#
+# HistoryStore.close() 為每個專案寫結束列；下次啟動從 "appeared" 重新計時
+
+OVERLAY_DIR="$(cd "$(dirname "$BATS_TEST_FILENAME")/../claude-overlay" && pwd)"
+
+setup() {
+    DB="$(mktemp -d)/history.sqlite3"
+}
+
+teardown() {
+    rm -rf "$(dirname "$DB")"
+}
+
+# restart <db> → 印出 "秒數 進入次數"：COMPLETED 10 s，關閉 3000 s，再 COMPLETED 10 s
+restart() {
+    (cd "$OVERLAY_DIR" && python3 - "$1" <<'EOF'
+import sys, time
+from history import HistoryStore
+from state_reader import ProjectRecord
+
+t0 = time.time() - 4000
+projects = [ProjectRecord("bats", "COMPLETED")]
+store = HistoryStore(sys.argv[1])
+store.observe(projects, ts=t0)
+store.close(ts=t0 + 10)
+
+store = HistoryStore(sys.argv[1])
+store.observe([ProjectRecord("bats", "COMPLETED")], ts=t0 + 3010)
+store.flush()
+seconds, entries = store.time_in_state(t0, until=t0 + 3020)["bats"]["COMPLETED"]
+store.close(ts=t0 + 3020)
+print(round(seconds), entries)
+EOF
+    )
+}
+
+@test "H1: 停機時間不計入 COMPLETED" {
+    run restart "$DB"
+    [ "$status" -eq 0 ]
+    [ "$output" = "20 2" ]
+}
+
+@test "H2: close() 後每個專案的最後一列是結束列" {
+    restart "$DB"
+    run python3 -c "
+import sqlite3, sys
+rows = sqlite3.connect(sys.argv[1]).execute(
+    'SELECT new_state FROM transitions ORDER BY ts DESC LIMIT 1').fetchall()
+print(rows)" "$DB"
+    [ "$output" = "[(None,)]" ]
+}
@@ -0,0 +1,174 @@
+#!/usr/bin/env bats
+# overlay_hook_daemon.bats - D1-D16: hookd 的 HookStateMachine 對齊 claude-hook.sh
+#
+# D1-D9 是 state_machine.bats T1-T7 + dedup.bats T8-T9 的同一組情境；
+# D10-D16 是計時器和「狀態檔被 daemon 以外的人改寫」。時鐘是注入的假時鐘
+
+OVERLAY_DIR="$(cd "$(dirname "$BATS_TEST_FILENAME")/../claude-overlay" && pwd)"
+
+setup() {
+    TMP="$(mktemp -d)"
+}
+
+teardown() {
+    rm -rf "$TMP"
+}
+
+# hookd <步驟...> → "狀態 dedup秒數(相對起點) idle-pending(P/-)"；每次呼叫一個新目錄
+#   Event[/matcher]     送事件給 daemon
+#   +N                  假時鐘前進 N 秒，途中每 0.5 s 跑一次計時器（同 serve_forever）
+#   =STATE              daemon 以外直接改寫狀態檔（watchdog subshell 的 echo IDLE）
+#   sh:Event[/matcher]  這個事件改走 claude-hook.sh（dispatcher 的 fallback）
+hookd() {
+    local dir
+    dir="$(mktemp -d -p "$TMP")"
+    (cd "$OVERLAY_DIR" && python3 - "$dir" "$@" <<'EOF'
+import os, subprocess, sys, time
+import config
+from hook_daemon import DEDUP_FILE_PREFIX, IDLE_PENDING_PREFIX, HookStateMachine
+
+tmp, steps = sys.argv[1], sys.argv[2:]
+HOOK_SH = os.path.join(os.path.dirname(os.getcwd()), "scripts", "claude-hook.sh")
+t0 = float(int(time.time()))  # 和 claude-hook.sh 的 date +%s 對齊
+now = t0
+machine = HookStateMachine(tmp, tmux=False, clock=lambda: now)
+
+
+def path(prefix):
+    return os.path.join(tmp, prefix + "bats")
+
+
+def read(prefix):
+    try:
+        with open(path(prefix)) as f:
+            return f.readline().strip()
+    except OSError:
+        return None
+
+
+for step in steps:
+    if step.startswith("+"):
+        end = now + float(step[1:])
+        while now < end:
+            now = min(end, now + 0.5)
+            machine.fire_timers()
+    elif step.startswith("="):
+        with open(path(config.STATE_FILE_PREFIX), "w") as f:
+            f.write(step[1:] + "\n")
+    elif step.startswith("sh:"):
+        event, _, matcher = step[3:].partition("/")
+        subprocess.run([HOOK_SH, event, matcher, "bats", ""],
+                       env=dict(os.environ, CLAUDE_TMP_DIR=tmp, CLAUDE_STATUS_TABLE=""),
+                       stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=True)
+        # idle-pending 是 script 背景 subshell touch 的：等它出現
+        for _ in range(200):
+            if event != "Stop" or os.path.exists(path(IDLE_PENDING_PREFIX)):
+                break
+            time.sleep(0.01)
+    else:
+        event, _, matcher = step.partition("/")
+        machine.handle(event, matcher, "bats")
+
+dedup = read(DEDUP_FILE_PREFIX)
+print(read(config.STATE_FILE_PREFIX),
+      "-" if dedup is None else int(dedup) - int(t0),
+      "P" if os.path.exists(path(IDLE_PENDING_PREFIX)) else "-")
+EOF
+    )
+}
+
+# 只比狀態（第一個欄位）
+assert_hookd_state() {
+    [ "$status" -eq 0 ]
+    [ "${output%% *}" = "$1" ]
+}
+
+@test "D1: UserPromptSubmit → RUNNING" {
+    run hookd UserPromptSubmit
+    assert_hookd_state RUNNING
+}
+
+@test "D2: PreToolUse AskUserQuestion → WAITING" {
+    run hookd UserPromptSubmit PreToolUse/AskUserQuestion
+    assert_hookd_state WAITING
+}
+
+@test "D3: PostToolUse AskUserQuestion → RUNNING" {
+    run hookd PreToolUse/AskUserQuestion PostToolUse/AskUserQuestion
+    assert_hookd_state RUNNING
+}
+
+@test "D4: Notification idle_prompt → IDLE" {
+    run hookd UserPromptSubmit Notification/idle_prompt
+    assert_hookd_state IDLE
+}
+
+@test "D5: Notification permission_prompt → WAITING" {
+    run hookd UserPromptSubmit Notification/permission_prompt
+    assert_hookd_state WAITING
+}
+
+@test "D6: Stop → COMPLETED" {
+    run hookd UserPromptSubmit Stop
+    assert_hookd_state COMPLETED
+}
+
+@test "D7: WAITING 中收 Stop → 狀態被抑制" {
+    run hookd PreToolUse/AskUserQuestion Stop
+    assert_hookd_state WAITING
+}
+
+@test "D8: 2 秒內重複狀態被去重（dedup 時間戳不更新）" {
+    run hookd UserPromptSubmit +1 UserPromptSubmit
+    [ "$output" = "RUNNING 0 -" ]
+}
+
+@test "D9: 超過 2 秒後 dedup 放行（時間戳更新）" {
+    run hookd UserPromptSubmit +2.5 UserPromptSubmit
+    [ "$output" = "RUNNING 2 -" ]
+}
+
+@test "D10: Stop 後 22 秒自動回 IDLE" {
+    run hookd UserPromptSubmit Stop +21
+    [ "$output" = "COMPLETED 0 P" ]
+    run hookd UserPromptSubmit Stop +22
+    assert_hookd_state IDLE
+}
+
+@test "D11: Stop 後 22 秒內 RUNNING → 取消回 IDLE" {
+    run hookd UserPromptSubmit Stop +5 UserPromptSubmit +20
+    [ "$output" = "RUNNING 5 -" ]
+}
+
+@test "D12: RUNNING 60 秒無活動 → IDLE；中途有活動就延後" {
+    run hookd UserPromptSubmit +59.5
+    assert_hookd_state RUNNING
+    run hookd UserPromptSubmit +60
+    assert_hookd_state IDLE
+    run hookd UserPromptSubmit +50 PreToolUse/Bash +59.5
+    assert_hookd_state RUNNING
+    run hookd UserPromptSubmit +50 PreToolUse/Bash +60
+    assert_hookd_state IDLE
+}
+
+@test "D13: 狀態檔被外部改成 IDLE 後，2 秒內的 RUNNING 不被去重" {
+    run hookd UserPromptSubmit +1 =IDLE UserPromptSubmit
+    [ "$output" = "RUNNING 1 -" ]
+}
+
+@test "D14: 外部改寫成 WAITING 後，Stop 照樣被抑制" {
+    run hookd UserPromptSubmit =WAITING Stop
+    assert_hookd_state WAITING
+}
+
+@test "D15: fallback 的 claude-hook.sh 送 RUNNING → daemon 的 Stop 計時器不再切 IDLE" {
+    run hookd UserPromptSubmit Stop +3 sh:UserPromptSubmit +25
+    assert_hookd_state RUNNING
+    [ "${output##* }" = "-" ]
+}
+
+@test "D16: daemon 的 RUNNING 清掉 claude-hook.sh 留下的 idle-pending" {
+    run hookd sh:UserPromptSubmit sh:Stop UserPromptSubmit
+    [ "$output" = "RUNNING 0 -" ]
+}
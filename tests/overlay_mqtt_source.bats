@@ -0,0 +1,116 @@
+#!/usr/bin/env bats
+# overlay_mqtt_source.bats - M1-M2: MqttSource 配 in-process 假 broker
+#
+# client_factory 換掉 paho；連不上時 read() 改讀 state 檔（make_file_source）
+
+OVERLAY_DIR="$(cd "$(dirname "$BATS_TEST_FILENAME")/../claude-overlay" && pwd)"
+
+setup() {
+    TMP="$(mktemp -d)"
+}
+
+teardown() {
+    rm -rf "$TMP"
+}
+
+# mqtt <tmp> <場景> → 每個 read() 印一行 "project=STATE ..."
+mqtt() {
+    (cd "$OVERLAY_DIR" && python3 - "$@" <<'EOF'
+import json, os, sys, time
+from types import SimpleNamespace
+import config
+from mqtt_source import MqttSource
+from sources import make_file_source
+
+tmp, scenario = sys.argv[1:]
+config.WSL_TMP_DIR = tmp
+for project, state in (("file-a", "RUNNING"), ("file-b", "IDLE")):
+    with open(os.path.join(tmp, config.STATE_FILE_PREFIX + project), "w") as f:
+        f.write(state + "\n")
+    with open(os.path.join(tmp, config.ACTIVITY_FILE_PREFIX + project), "w") as f:
+        f.write(f"{int(time.time())}\n")
+
+
+class FakeClient:
+    """paho 介面的最小子集；connect_async 依 rc 回呼 on_connect"""
+
+    def __init__(self, rc):
+        self.rc = rc
+        self.subscribed = []
+
+    def connect_async(self, host, port, keepalive=60):
+        self.on_connect(self, None, {}, self.rc)
+
+    def subscribe(self, topic):
+        self.subscribed.append(topic)
+
+    def loop_start(self):
+        pass
+
+    def loop_stop(self):
+        pass
+
+    def disconnect(self):
+        self.on_disconnect(self, None, 0)
+
+    def publish(self, project, state):
+        payload = b"" if state is None else json.dumps(
+            {"domain": "claude", "state": state, "project": project}).encode()
+        self.on_message(self, None, SimpleNamespace(
+            topic=f"claude/led/{project}", payload=payload))
+
+
+def show(projects):
+    print(" ".join(f"{p.project}={p.state}" for p in projects or []))
+
+
+def read_fallback(source):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        source.refresh()
+        projects = source.read()
+        if projects:
+            return projects
+        time.sleep(0.02)
+    return None
+
+
+client = FakeClient(rc=0 if scenario == "up" else 5)
+source = MqttSource("fake", 1883, fallback=make_file_source(),
+                    client_factory=lambda: client)
+source.start()
+if scenario == "up":
+    assert client.subscribed == [config.MQTT_TOPIC]
+    client.publish("proj-b", "completed")
+    client.publish("proj-a", "WAITING")
+    client.publish("proj-c", "RUNNING")
+    show(source.read())
+    client.publish("proj-c", None)  # retained 清掉 → 專案消失
+    client.publish("proj-a", "RUNNING")
+    show(source.read())
+else:
+    show(read_fallback(source))            # broker 拒絕連線 → state 檔
+    client.on_connect(client, None, {}, 0)  # broker 回來
+    client.publish("proj-a", "WAITING")
+    show(source.read())
+    client.on_disconnect(client, None, 0)  # 斷線 → 回到 state 檔
+    show(source.read())
+source.close()
+EOF
+    )
+}
+
+@test "M1: claude/led/<project> payload 進 read()，空 payload 移除專案" {
+    run mqtt "$TMP" up
+    [ "$status" -eq 0 ]
+    [ "${lines[0]}" = "proj-a=WAITING proj-c=RUNNING proj-b=COMPLETED" ]
+    [ "${lines[1]}" = "proj-a=RUNNING proj-b=COMPLETED" ]
+}
+
+@test "M2: 連線失敗改讀 state 檔，連上後切回 MQTT，斷線再回退" {
+    run mqtt "$TMP" down
+    [ "$status" -eq 0 ]
+    [ "${lines[0]}" = "file-a=RUNNING file-b=IDLE" ]
+    [ "${lines[1]}" = "proj-a=WAITING" ]
+    [ "${lines[2]}" = "file-a=RUNNING file-b=IDLE" ]
+}
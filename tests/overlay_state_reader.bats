@@ -0,0 +1,54 @@
+#!/usr/bin/env bats
+# overlay_state_reader.bats - R1-R2: 同大小、同 mtime 的狀態改寫不能被快取吃掉
+#
+# 9P（\\wsl$）時間戳粗，RUNNING→WAITING 可能 (mtime_ns, size) 完全相同
+
+OVERLAY_DIR="$(cd "$(dirname "$BATS_TEST_FILENAME")/../claude-overlay" && pwd)"
+
+setup() {
+    TMP="$(mktemp -d)"
+}
+
+teardown() {
+    rm -rf "$TMP"
+}
+
+# rewrite <tmp> <age 秒> → 印出改寫前後兩次 scan 的狀態
+rewrite() {
+    (cd "$OVERLAY_DIR" && python3 - "$@" <<'EOF'
+import os, sys, time
+import config
+from state_reader import StateScanner
+
+tmp, age = sys.argv[1], int(sys.argv[2])
+state = os.path.join(tmp, config.STATE_FILE_PREFIX + "bats")
+activity = os.path.join(tmp, config.ACTIVITY_FILE_PREFIX + "bats")
+with open(activity, "w") as f:
+    f.write(f"{int(time.time())}\n")
+
+def write(text, mtime_ns):
+    with open(state, "w") as f:
+        f.write(text + "\n")
+    os.utime(state, ns=(mtime_ns, mtime_ns))
+
+mtime_ns = time.time_ns() - age * 1_000_000_000
+scanner = StateScanner(tmp)
+write("RUNNING", mtime_ns)
+before = scanner.scan()[0].state
+write("WAITING", mtime_ns)  # 同一個時間戳內改寫
+print(before, scanner.scan()[0].state, scanner.stats["opened"])
+EOF
+    )
+}
+
+@test "R1: 剛寫入的檔案不信任快取，同 key 改寫仍讀到新狀態" {
+    run rewrite "$TMP" 0
+    [ "$status" -eq 0 ]
+    [ "$output" = "RUNNING WAITING 1" ]
+}
+
+@test "R2: 夠舊的檔案 stat 沒變就不重讀" {
+    run rewrite "$TMP" 60
+    [ "$status" -eq 0 ]
+    [ "$output" = "RUNNING RUNNING 0" ]
+}
@@ -0,0 +1,109 @@
+#!/usr/bin/env bats
+# overlay_state_watcher.bats - W1-W2: inotify 合併 burst + TimerWheel 到期/繞圈
+#
+# W1 在暫存目錄上跑真的 StateWatcher（需要 Linux inotify）
+
+OVERLAY_DIR="$(cd "$(dirname "$BATS_TEST_FILENAME")/../claude-overlay" && pwd)"
+
+setup() {
+    TMP="$(mktemp -d)"
+}
+
+teardown() {
+    rm -rf "$TMP"
+}
+
+# watch <tmp> → 每次發布的快照印一行 "版本差 bursts: project=STATE ..."
+watch() {
+    (cd "$OVERLAY_DIR" && python3 - "$1" <<'EOF'
+import os, sys, time
+import config
+config.STALE_TIMEOUT_SEC = 2
+config.WATCH_WHEEL_TICK_MS = 100
+from state_watcher import StateWatcher
+
+tmp = sys.argv[1]
+
+def hook(project, state):
+    # 一次 claude-hook.sh：activity + state 連續寫，應合併成一次發布
+    with open(os.path.join(tmp, config.ACTIVITY_FILE_PREFIX + project), "w") as f:
+        f.write(f"{int(time.time())}\n")
+    with open(os.path.join(tmp, config.STATE_FILE_PREFIX + project), "w") as f:
+        f.write(state + "\n")
+
+hook("old", "COMPLETED")
+watcher = StateWatcher(tmp)
+watcher.start()
+version = watcher.version
+
+def step(action):
+    global version
+    action()
+    watcher.wait_for(version, timeout=5)
+    time.sleep(config.WATCH_COALESCE_MAX_MS / 1000)  # 同一 burst 不該再發布
+    new = watcher.version
+    print(new - version, watcher.stats["bursts"], " ".join(
+        f"{p.project}={p.state}" for p in watcher.snapshot()))
+    version = new
+
+print(0, 0, " ".join(f"{p.project}={p.state}" for p in watcher.snapshot()))
+step(lambda: hook("a", "RUNNING"))
+step(lambda: hook("a", "WAITING"))
+step(lambda: os.remove(os.path.join(tmp, config.STATE_FILE_PREFIX + "old")))
+step(lambda: None)  # 活動超過 STALE_TIMEOUT_SEC：計時輪把 a 標成 STALE
+watcher.close()
+EOF
+    )
+}
+
+# wheel → TimerWheel 的到期紀錄
+wheel() {
+    (cd "$OVERLAY_DIR" && python3 - <<'EOF'
+from state_watcher import TimerWheel
+
+# 逐 tick 推進 200 tick（繞三圈多）：每個 key 剛好在自己的 deadline 那一 tick 到期
+w = TimerWheel(1.0)
+deadlines = {"k5": 5.5, "k63": 63.0, "k64": 64.0, "k100": 100.2, "k190": 190.0}
+for key, deadline in deadlines.items():
+    w.schedule(key, deadline)
+w.schedule("gone", 70.0)
+w.cancel("gone")
+fired = {}
+for t in range(0, 201):
+    for key in w.advance(float(t)):
+        fired[key] = t
+print(" ".join(f"{k}@{fired.get(k)}" for k in deadlines), len(w))
+
+# 一次跳過 > 64 tick（行程被暫停）：到期的全部出來，還沒到的留著
+w = TimerWheel(1.0)
+w.advance(0.0)
+for n in range(10):
+    w.schedule(f"due{n}", 3.0 + n * 7)
+w.schedule("later", 150.0)
+print(len(w.advance(100.0)), len(w), w.advance(149.0), w.advance(150.0))
+
+# 第一次 advance 前排好、tick 已經過去的 key 不能等一整圈
+w = TimerWheel(1.0)
+w.schedule("early", 100.5)
+print(w.advance(103.0))
+EOF
+    )
+}
+
+@test "W1: 一次 hook 的寫入合併成一個快照；改寫/刪除/過期都有發布" {
+    run watch "$TMP"
+    [ "$status" -eq 0 ]
+    [ "${lines[0]}" = "0 0 old=COMPLETED" ]
+    [ "${lines[1]}" = "1 1 a=RUNNING old=COMPLETED" ]
+    [ "${lines[2]}" = "1 2 a=WAITING old=COMPLETED" ]
+    [ "${lines[3]}" = "1 3 a=WAITING" ]
+    [ "${lines[4]}" = "1 3 a=STALE" ]
+}
+
+@test "W2: TimerWheel 跨 64 tick 仍準時到期，cancel 的不出來" {
+    run wheel
+    [ "$status" -eq 0 ]
+    [ "${lines[0]}" = "k5@6 k63@63 k64@64 k100@101 k190@190 0" ]
+    [ "${lines[1]}" = "10 1 [] ['later']" ]
+    [ "${lines[2]}" = "['early']" ]
+}
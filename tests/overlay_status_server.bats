@@ -0,0 +1,157 @@
+#!/usr/bin/env bats
+# overlay_status_server.bats - S1-S2: 慢 subscriber 不拖累快的，改收新快照重新同步
+#
+# 快照比 max_pending 大（d02fa7c：快照不算進 backlog 上限，否則每個 delta 都重送）
+
+OVERLAY_DIR="$(cd "$(dirname "$BATS_TEST_FILENAME")/../claude-overlay" && pwd)"
+
+setup() {
+    TMP="$(mktemp -d)"
+}
+
+teardown() {
+    rm -rf "$TMP"
+}
+
+# fanout <tmp> → "fast ..." 和 "slow ..." 兩行摘要
+fanout() {
+    (cd "$OVERLAY_DIR" && python3 - "$1" <<'EOF'
+import json, os, socket, sys, threading, time
+import config
+from status_server import StatusServer, apply_message
+
+tmp = sys.argv[1]
+PROJECTS = [f"p{n:03d}-" + "x" * 150 for n in range(300)]  # 快照約 60 KB
+
+
+def write(projects, state):
+    for project in projects:
+        with open(os.path.join(tmp, config.STATE_FILE_PREFIX + project), "w") as f:
+            f.write(state + "\n")
+        with open(os.path.join(tmp, config.ACTIVITY_FILE_PREFIX + project), "w") as f:
+            f.write(f"{int(time.time())}\n")
+
+
+def expected():
+    return {p: open(os.path.join(tmp, config.STATE_FILE_PREFIX + p)).read().strip()
+            for p in PROJECTS}
+
+
+def wait(cond, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        if time.monotonic() > deadline:
+            raise SystemExit("timeout")
+        time.sleep(0.01)
+
+
+class Client:
+    def __init__(self, address, rcvbuf=None):
+        self.sock = socket.socket()
+        if rcvbuf:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+        self.sock.connect(address)
+        self.msgs, self.table = [], {}
+
+    def start(self):
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        for raw in self.sock.makefile("rb"):
+            msg = json.loads(raw)
+            apply_message(self.table, msg)
+            self.msgs.append(msg)
+
+    @property
+    def seq(self):
+        return self.msgs[-1]["seq"] if self.msgs else None
+
+
+write(PROJECTS, "RUNNING")
+server = StatusServer("127.0.0.1", 0, tmp_dir=tmp, max_pending=40 * 1024)
+server.start()
+# 小的 send buffer（accept 出來的 socket 繼承），不讓 kernel 緩衝吃掉 backlog
+server._listener.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 8192)
+loop = threading.Thread(target=server.serve_forever, daemon=True)
+loop.start()
+wait(lambda: len(server._current) == len(PROJECTS))
+
+slow = Client(server.address, rcvbuf=4096)  # 連上但先不讀
+fast = Client(server.address)
+fast.start()
+wait(lambda: fast.msgs)
+
+# 每輪改 100 個專案（delta 約 20 KB）；慢的那個很快就超過 40 KB 上限
+for n in range(15):
+    write(PROJECTS[n % 3::3], "WAITING" if n % 2 else "COMPLETED")
+    time.sleep(0.3)
+wait(lambda: fast.seq == server._seq and fast.table == expected())
+types = [m["type"] for m in fast.msgs]
+seqs = [m["seq"] for m in fast.msgs]
+print("fast", types.count("snapshot"), seqs == list(range(seqs[0], server._seq + 1)),
+      server._seq - seqs[0] >= 15)
+
+# 慢的開始讀：收到的最後一行是目前 seq 的新快照（不是補送的 delta），之後恢復正常 delta
+slow.start()
+wait(lambda: slow.msgs and slow.msgs[-1]["type"] == "snapshot"
+     and slow.seq == server._seq)
+resynced = slow.table == expected()
+resync_at, before = len(slow.msgs), server._seq
+write(PROJECTS[:5], "IDLE")
+wait(lambda: server._seq > before and slow.seq == fast.seq == server._seq)
+print("slow", resynced, {m["type"] for m in slow.msgs[resync_at:]},
+      slow.table == fast.table == expected())
+
+server._stop.set()
+loop.join(2)
+server.close()
+EOF
+    )
+}
+
+# backlog → 快照送一半時進來 delta：是排隊還是 resync（假 socket 每次只收 300 bytes）
+backlog() {
+    (cd "$OVERLAY_DIR" && python3 - <<'EOF'
+from status_server import _Subscriber
+
+
+class TrickleSocket:
+    def __init__(self, chunk):
+        self.chunk, self.sent = chunk, b""
+
+    def send(self, data):
+        self.sent += data[:self.chunk]
+        return min(len(data), self.chunk)
+
+
+limit = 1000
+sock = TrickleSocket(300)
+sub = _Subscriber(sock, None)
+sub.queue_snapshot(b"S" * 4999 + b"\n")  # 比上限大的快照
+sub.send()
+sub.queue(b"d" * 399 + b"\n", limit)
+sub.queue(b"e" * 399 + b"\n", limit)
+print(sub.resync, sub.backlog(), len(sub.out))
+sub.queue(b"f" * 399 + b"\n", limit)  # 真的超過上限
+print(sub.resync, len(sub.out))
+while sub.out:
+    sub.send()
+print(sock.sent.count(b"\n"), sock.sent.endswith(b"S\n"))
+EOF
+    )
+}
+
+@test "S1: 不讀的 subscriber 被丟 backlog 改送快照，讀的照常收每個 delta" {
+    run fanout "$TMP"
+    [ "$status" -eq 0 ]
+    [ "${lines[0]}" = "fast 1 True True" ]
+    [ "${lines[1]}" = "slow True {'delta'} True" ]
+}
+
+@test "S2: 還沒送完的快照不算進 backlog 上限；超過上限才 resync" {
+    run backlog
+    [ "$status" -eq 0 ]
+    [ "${lines[0]}" = "False 800 3" ]
+    [ "${lines[1]}" = "True 1" ]
+    [ "${lines[2]}" = "1 True" ]
+}
@@ -0,0 +1,215 @@
+#!/usr/bin/env bats
+# overlay_status_table.bats - T1-T6: status_table.py 的 seqlock、generation、slot、舊檔、修復
+#
+# T1: 兩個 writer process 搶同一個 slot，reader 一直讀，不能讀到撕裂的 slot
+# T5: 被截短的表（c58c542）；T6: ERROR/未知狀態正規化（5c4b260）
+
+OVERLAY_DIR="$(cd "$(dirname "$BATS_TEST_FILENAME")/../claude-overlay" && pwd)"
+
+setup() {
+    TMP="$(mktemp -d)"
+}
+
+teardown() {
+    rm -rf "$TMP"
+}
+
+# table_py <tmp> <<'EOF' ... EOF → 在 claude-overlay 下跑一段 python，TABLE = <tmp>/t.tbl
+table_py() {
+    local script
+    script="$(cat)"
+    (cd "$OVERLAY_DIR" && python3 -c "
+import os, sys
+TMP = sys.argv[1]
+TABLE = os.path.join(TMP, 't.tbl')
+$script" "$1")
+}
+
+@test "T1: 兩個 writer 搶同一個 slot，reader 不會讀到撕裂的 slot" {
+    run table_py "$TMP" <<'EOF'
+import mmap, multiprocessing
+from status_table import SEQ, STATES, StatusTable, _slot_offset, read_slot
+
+ROUNDS = 50000
+EXPECTED = {"short": 2, "a-much-longer-project-name": 3}  # 名稱 ↔ 狀態碼
+
+
+def writer(phase):
+    # 只有 1 個 slot，writer 每次 set 都換 project（flock 不公平，一個 writer 常連續拿到鎖）。
+    # 名稱和狀態是分開寫的：名稱配錯狀態（或長度不符讀出半個名稱）就是撕裂
+    projects = list(EXPECTED.items())
+    with StatusTable(TABLE, slots=1) as table:
+        for i in range(ROUNDS):
+            project, code = projects[(i + phase) % 2]
+            table.set(project, STATES[code], i)
+
+
+with StatusTable(TABLE, slots=1) as table:
+    table.set("short", "RUNNING", 0)
+    start = table.generation
+
+ctx = multiprocessing.get_context("fork")
+writers = [ctx.Process(target=writer, args=(phase,)) for phase in (0, 1)]
+for p in writers:
+    p.start()
+
+reads = torn = 0
+with open(TABLE, "rb") as f:
+    buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    while any(p.is_alive() for p in writers):
+        slot = read_slot(buf, 0)
+        if slot is None:
+            continue
+        name, code, _ = slot
+        reads += 1
+        if EXPECTED.get(name) != code:
+            torn += 1
+    for p in writers:
+        p.join()
+    print("torn", torn)
+    print("reads", reads > 0)
+    with StatusTable(TABLE) as table:
+        # flock：兩邊的更新一個都沒掉
+        print("generation", table.generation - start)
+        print("seq", SEQ.unpack_from(buf, _slot_offset(0))[0])
+        print("rows", len(table.rows()))
+    buf.close()
+print("exit", [p.exitcode for p in writers])
+EOF
+    [ "$status" -eq 0 ]
+    [ "${lines[0]}" = "torn 0" ]
+    [ "${lines[1]}" = "reads True" ]
+    [ "${lines[2]}" = "generation 100000" ]
+    [ "${lines[3]}" = "seq 200002" ]
+    [ "${lines[4]}" = "rows 1" ]
+    [ "${lines[5]}" = "exit [0, 0]" ]
+}
+
+@test "T2: 每次 set/remove generation +1，reader 只在 generation 動了才重讀" {
+    run table_py "$TMP" <<'EOF'
+from status_table import StatusTable, StatusTableReader
+
+with StatusTable(TABLE, slots=4) as table:
+    reader = StatusTableReader(TABLE)
+    print(table.generation, [r.project for r in reader.scan(strict=True)])
+    table.set("a", "RUNNING", 2e9)
+    table.set("b", "COMPLETED", 2e9)
+    print(table.generation, reader.changed(), [r.project for r in reader.scan()])
+    print(reader.changed())
+    table.remove("b")
+    table.remove("missing")  # 沒這個 project：不動
+    print(table.generation, [r.project for r in reader.scan()])
+    reader.close()
+EOF
+    [ "$status" -eq 0 ]
+    [ "${lines[0]}" = "0 []" ]
+    [ "${lines[1]}" = "2 True ['a', 'b']" ]
+    [ "${lines[2]}" = "False" ]
+    [ "${lines[3]}" = "3 ['a']" ]
+}
+
+@test "T3: 空出的 slot 先用，滿了換掉最久沒活動的" {
+    run table_py "$TMP" <<'EOF'
+from status_table import StatusTable
+
+with StatusTable(TABLE, slots=3) as table:
+    table.set("a", "RUNNING", 30)
+    table.set("b", "RUNNING", 10)
+    table.set("c", "RUNNING", 20)
+    table.remove("a")
+    table.set("d", "IDLE", 40)     # a 的空位
+    print([row[0] for row in table.rows()])
+    table.set("e", "IDLE", 50)     # 滿了：b 最舊
+    print([row[0] for row in table.rows()])
+    table.set("c", activity=60)    # 只動 activity，狀態不變
+    table.set("f", "WAITING", 70)  # 換掉 d（40）
+    print(table.rows())
+EOF
+    [ "$status" -eq 0 ]
+    [ "${lines[0]}" = "['d', 'b', 'c']" ]
+    [ "${lines[1]}" = "['d', 'e', 'c']" ]
+    [ "${lines[2]}" = "[('f', 'WAITING', 70), ('e', 'IDLE', 50), ('c', 'RUNNING', 60)]" ]
+}
+
+@test "T4: legacy_dir 同步寫 claude-led-state-* / claude-activity-*" {
+    run table_py "$TMP" <<'EOF'
+import config
+from status_table import StatusTable
+
+
+def legacy(prefix):
+    try:
+        with open(os.path.join(TMP, prefix + "proj")) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+with StatusTable(TABLE, legacy_dir=TMP) as table:
+    table.set("proj", "RUNNING", 123.9)
+    print(legacy(config.STATE_FILE_PREFIX), legacy(config.ACTIVITY_FILE_PREFIX))
+    table.set("proj", "WAITING")
+    table.touch("proj", now=456)
+    print(legacy(config.STATE_FILE_PREFIX), legacy(config.ACTIVITY_FILE_PREFIX))
+    table.remove("proj")
+    print(legacy(config.STATE_FILE_PREFIX), legacy(config.ACTIVITY_FILE_PREFIX))
+EOF
+    [ "$status" -eq 0 ]
+    [ "${lines[0]}" = "RUNNING 123" ]
+    [ "${lines[1]}" = "WAITING 456" ]
+    [ "${lines[2]}" = "None None" ]
+}
+
+@test "T5: 被截短或不是表的檔案，open() 修好而不是 crash" {
+    run table_py "$TMP" <<'EOF'
+from status_table import StatusTable, StatusTableReader, table_size
+
+with StatusTable(TABLE, slots=8) as table:
+    table.set("kept", "RUNNING", 2e9)
+with open(TABLE, "r+b") as f:
+    f.truncate(table_size(2) + 10)   # 第 1 個 slot 只剩一半
+try:
+    StatusTableReader(TABLE).open()
+except OSError:
+    print("reader refuses")
+with StatusTable(TABLE, slots=4) as table:  # 用檔頭的 8，不是參數的 4
+    print(table.slots, os.path.getsize(TABLE) == table_size(8), table.rows())
+    table.set("new", "IDLE", 1)
+    print([row[0] for row in table.rows()])
+
+for junk in (b"", b"CLST", b"not a table" * 20):
+    with open(TABLE, "wb") as f:
+        f.write(junk)
+    with StatusTable(TABLE, slots=4) as table:
+        print(table.slots, os.path.getsize(TABLE) == table_size(4), table.rows())
+EOF
+    [ "$status" -eq 0 ]
+    [ "${lines[0]}" = "reader refuses" ]
+    [ "${lines[1]}" = "8 True [('kept', 'RUNNING', 2000000000)]" ]
+    [ "${lines[2]}" = "['kept', 'new']" ]
+    [ "${lines[3]}" = "4 True []" ]
+    [ "${lines[4]}" = "4 True []" ]
+    [ "${lines[5]}" = "4 True []" ]
+}
+
+@test "T6: ERROR 和未知狀態碼跟檔案來源一樣顯示成 IDLE" {
+    run table_py "$TMP" <<'EOF'
+import time
+from status_table import StatusTable, StatusTableReader, encode_name
+
+now = time.time()
+with StatusTable(TABLE, slots=4) as table:
+    table.set("err", "ERROR", now)
+    table.set("run", "RUNNING", now)
+    table.set("old", "RUNNING", now - 3600)
+    index, _ = table._find(encode_name("odd"))
+    table._write_slot(index, encode_name("odd"), 9, int(now))  # 新版本的狀態碼
+for use_mmap in (True, False):
+    reader = StatusTableReader(TABLE, use_mmap=use_mmap)
+    print(sorted((r.project, r.state) for r in reader.scan(strict=True)))
+    reader.close()
+EOF
+    [ "$status" -eq 0 ]
+    [ "${lines[0]}" = "[('err', 'IDLE'), ('odd', 'IDLE'), ('old', 'STALE'), ('run', 'RUNNING')]" ]
+    [ "${lines[1]}" = "${lines[0]}" ]
+}
@@ -0,0 +1,50 @@
+#!/usr/bin/env bats
+# overlay_viewport.bats - V1-V4: Viewport 可見列數不超過 max_rows
+#
+# 釘選列（WAITING/RUNNING）也算進 max_rows；超出的計入 "↕ N more"
+
+OVERLAY_DIR="$(cd "$(dirname "$BATS_TEST_FILENAME")/../claude-overlay" && pwd)"
+
+# rows <max_rows> <STATE:count>... → 印出列數與最後一列文字
+rows() {
+    local max_rows="$1"; shift
+    (cd "$OVERLAY_DIR" && python3 - "$max_rows" "$@" <<'EOF'
+import sys
+from state_reader import ProjectRecord
+from viewport import Viewport
+
+max_rows = int(sys.argv[1])
+projects = []
+for spec in sys.argv[2:]:
+    state, count = spec.split(":")
+    projects += [ProjectRecord(f"{state.lower()}{n:02d}", state) for n in range(int(count))]
+rows = Viewport(max_rows=max_rows).rows(projects)
+assert len(rows) <= max_rows, (len(rows), max_rows)
+print(len(rows), rows[-1][2])
+EOF
+    )
+}
+
+@test "V1: 只有釘選列且超出 → max_rows 列，含 more" {
+    run rows 15 RUNNING:20
+    [ "$status" -eq 0 ]
+    [ "$output" = "15 ↕ 6 more" ]
+}
+
+@test "V2: 釘選列剛好佔滿 + 一列一般 → 不超出" {
+    run rows 15 RUNNING:15 IDLE:1
+    [ "$status" -eq 0 ]
+    [ "$output" = "15 ↕ 2 more" ]
+}
+
+@test "V3: 釘選列與一般列混合" {
+    run rows 6 RUNNING:5 IDLE:3
+    [ "$status" -eq 0 ]
+    [ "$output" = "6 ↕ 3 more" ]
+}
+
+@test "V4: 沒超出 → 沒有 more 列" {
+    run rows 6 RUNNING:3 IDLE:2
+    [ "$status" -eq 0 ]
+    [ "$output" = "5 idle01 — IDLE" ]
+}
@@ -0,0 +1,56 @@
+#!/usr/bin/env bats
+# qmk_keycodes.bats - Q1-Q3: KeycodeIndex 的棄用改名、建議、巢狀 macro
+#
+# 直接建 KeycodeIndex(names, functions, deprecated)，不需要 ~/qmk_firmware
+
+TOOLS_DIR="$(cd "$(dirname "$BATS_TEST_FILENAME")/../hardware/tools" && pwd)"
+
+# validate <key...> → 一層 layer 的 validate_layers()：換過的 layer、棄用提示、錯誤 各一段
+validate() {
+    (cd "$TOOLS_DIR" && python3 - "$@" <<'EOF'
+import sys
+from qmk_keycodes import KeycodeIndex
+
+deprecated = {"KC_BTN1": "KC_MS_BTN1", "KC_MS_BTN1": "MS_BTN1",
+              "RGB_TOG": "UG_TOGG", "LOOP_A": "LOOP_B", "LOOP_B": "LOOP_A"}
+names = {"KC_A", "KC_ESC", "KC_TRNS", "KC_LSFT", "MS_BTN1", "UG_TOGG", "QK_BOOT",
+         *deprecated}  # build() 也把棄用別名算成合法名稱
+index = KeycodeIndex(names, {"LT", "MO", "LSFT", "S"}, deprecated)
+
+layers, notes, errors = index.validate_layers([sys.argv[1:]])
+print(" ".join(layers[0]))
+for line in notes + errors:
+    print(line)
+EOF
+    )
+}
+
+@test "Q1: 棄用別名一路換成現行名稱，巢狀參數也換" {
+    run validate KC_A KC_BTN1 RGB_TOG "LT(2, KC_MS_BTN1)" "S(LT(1,KC_BTN1))" 0x7C00 LOOP_A
+    [ "$status" -eq 0 ]
+    [ "${lines[0]}" = "KC_A MS_BTN1 UG_TOGG LT(2,MS_BTN1) S(LT(1,MS_BTN1)) 0x7C00 LOOP_A" ]
+    [ "${lines[1]}" = "KC_BTN1 已棄用 → MS_BTN1" ]
+    [ "${lines[2]}" = "LT(2, KC_MS_BTN1) 已棄用 → LT(2,MS_BTN1)" ]
+    [ "${lines[3]}" = "RGB_TOG 已棄用 → UG_TOGG" ]
+    [ "${lines[4]}" = "S(LT(1,KC_BTN1)) 已棄用 → S(LT(1,MS_BTN1))" ]
+    [ "${#lines[@]}" -eq 5 ]
+}
+
+@test "Q2: 不存在的 keycode 附上最可能的名稱" {
+    run validate KC_BOOT KC_ESCC FOO_BAR
+    [ "$status" -eq 0 ]
+    [ "${lines[0]}" = "KC_BOOT KC_ESCC FOO_BAR" ]
+    [ "${lines[1]}" = "Layer 0 第 0 鍵：KC_BOOT 不存在，是不是 QK_BOOT？" ]
+    [ "${lines[2]}" = "Layer 0 第 1 鍵：KC_ESCC 不存在，是不是 KC_ESC？" ]
+    [ "${lines[3]}" = "Layer 0 第 2 鍵：FOO_BAR 不存在" ]
+}
+
+@test "Q3: 巢狀 macro 的參數錯誤和未知 macro 都報出來，原 key 保留" {
+    run validate "MO(1)" "LT(2, KC_ESCC)" "LT(2, LSFT(KC_AA))" "XX(1)" "LT(2,KC_A)"
+    [ "$status" -eq 0 ]
+    [ "${lines[0]}" = "MO(1) LT(2, KC_ESCC) LT(2, LSFT(KC_AA)) XX(1) LT(2,KC_A)" ]
+    [ "${lines[1]}" = "Layer 0 第 1 鍵：KC_ESCC 不存在，是不是 KC_ESC？" ]
+    [ "${lines[2]}" = "Layer 0 第 2 鍵：KC_AA 不存在，是不是 KC_A？" ]
+    [ "${lines[3]}" = "Layer 0 第 3 鍵：XX() 不是 QMK macro" ]
+    [ "${#lines[@]}" -eq 4 ]
+}